@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+Benchmark of the processing of synthetic cases of growing size.
+
+A case of each size is generated by synthetic_case (once for each version of
+the generator, kept in the work directory), and processed by a process of its own as by the viewer, without
+the snapshot cache: the wall time, the CPU time (of the child processes too,
+with --jobs), the peak resident set size and the wall time of each stage of
+the profile (see --profile) are measured.  The times of each stage from a
+size to the next tell how it scales, e.g. a time growing as the square of the
+number of objects.
+
+The results are compared with those of a baseline, a JSON file written by
+--update-baseline; a time or a peak memory above the baseline by more than the
+tolerance is a regression, and the benchmark exits with an error.  The
+baselines depend on the machine, so each machine keeps its own.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Any, Optional
+
+from synthetic_case import GENERATOR_VERSION, parse_mix, write_case
+
+# The checked-out tree is benchmarked, rather than an installed copy.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+SIZES = (1000, 10000, 100000)
+MAX_SIZE = 10 ** 7
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+DEFAULT_WORK_DIR = Path(__file__).with_name("cases")
+
+# Relative increase over the baseline counted as a regression, and the
+# increase of the wall time below which it is taken for noise, in seconds.
+TOLERANCE = 0.25
+NOISE = 0.05
+
+# Growth exponent of the time of a stage, between two sizes, above which the
+# stage is reported as superlinear.  Only the stages taking at least
+# SCALING_MIN_SHARE of the wall time at the largest size are considered: the
+# times of the shorter ones are dominated by the pauses of the garbage
+# collector that happen to fall in them.
+SUPERLINEAR = 1.5
+SCALING_MIN_SHARE = 0.02
+
+
+def parse_sizes(text: str) -> list[int]:
+	"""
+	This method returns the sizes given as comma-separated numbers of objects, in increasing order.
+
+	>>> parse_sizes("1e4, 1000,1e5")
+	[1000, 10000, 100000]
+	"""
+	sizes = sorted(int(float(size)) for size in text.split(",") if size.strip())
+	if not sizes or sizes[0] < 1 or sizes[-1] > MAX_SIZE:
+		raise ValueError("The sizes must be between 1 and %d objects." % MAX_SIZE)
+	return sizes
+
+
+def case_file(workDir: Path, size: int, mix: str, seed: int) -> Path:
+	# The case of a size, generated unless already in the work directory by
+	# the same version of the generator
+	name = "case-g%d-%d-%d%s.json" % (GENERATOR_VERSION, size, seed, "-" + mix.replace("=", "").replace(",", "-") if mix else "")
+	path = workDir / name
+	if not path.exists():
+		workDir.mkdir(parents=True, exist_ok=True)
+		print("Generating %s ..." % path, file=sys.stderr)
+		partial = path.with_suffix(".tmp")
+		with open(partial, "w", encoding="utf-8") as f:
+			write_case(f, size, parse_mix(mix), seed)
+		partial.replace(path)
+	return path
+
+
+def ingest(path: str, stream: bool, jobs: int, traceMemory: bool) -> dict[str, Any]:
+	"""
+	This method processes the case in this process, and returns its measures.
+	"""
+	from case_viewer import case_viewer
+	from case_viewer.profiling import Profiler
+
+	case_viewer.profiler = profiler = Profiler(memory=traceMemory)
+	profiler.start()
+	session = case_viewer.CaseSession(jobs=jobs)
+	before, start = os.times(), time.perf_counter()
+	# The progress of the processing is not shown.
+	with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+		objects = session.load(path, stream)
+	wall, after = time.perf_counter() - start, os.times()
+	profiler.stop()
+	report = profiler.report()
+	return {
+		"objects": objects,
+		"wall": round(wall, 4),
+		"cpu": round(sum(after[:4]) - sum(before[:4]), 4),
+		"peak_rss": report["memory"]["peak_rss"],
+		"peak_rss_children": report["memory"]["peak_rss_children"],
+		"traced_peak": report["memory"]["traced_peak"],
+		"stages": {stage["name"]: stage["wall"] for stage in report["stages"]}}
+
+
+def run_ingest(path: Path, stream: bool, jobs: int, traceMemory: bool) -> dict[str, Any]:
+	# The case is processed by a new process, so that its peak memory is its own.
+	command = [sys.executable, __file__, "--ingest", str(path), "--jobs", str(jobs)]
+	if stream:
+		command.append("--stream")
+	if traceMemory:
+		command.append("--trace-memory")
+	output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True).stdout
+	result: dict[str, Any] = json.loads(output.splitlines()[-1])
+	return result
+
+
+def growth(smaller: dict[str, Any], larger: dict[str, Any], key: Optional[str] = None) -> Optional[float]:
+	"""
+	This method returns the exponent of the growth of the wall time, or of the wall time of a stage, from a result to one with more objects: 1 for a time proportional to the number of objects, 2 for its square.
+
+	>>> growth({"objects": 1000, "wall": 0.5}, {"objects": 10000, "wall": 50.0})
+	2.0
+	>>> growth({"objects": 1000, "stages": {}}, {"objects": 10000, "stages": {"x": 1.0}}, "x") is None
+	True
+	"""
+	a = smaller["wall"] if key is None else smaller["stages"].get(key, 0.0)
+	b = larger["wall"] if key is None else larger["stages"].get(key, 0.0)
+	if a <= 0 or b <= 0 or larger["objects"] <= smaller["objects"]:
+		return None
+	return round(math.log(b / a) / math.log(larger["objects"] / smaller["objects"]), 2)
+
+
+def regressions(results: list[dict[str, Any]], baseline: list[dict[str, Any]], tolerance: float) -> list[str]:
+	"""
+	This method returns the regressions of the results over the baseline, of the same sizes.
+
+	>>> baseline = [{"size": 1000, "wall": 1.0, "peak_rss": 100, "stages": {"json.load": 0.5}}]
+	>>> results = [{"size": 1000, "wall": 1.5, "peak_rss": 110, "stages": {"json.load": 0.9}}]
+	>>> regressions(results, baseline, 0.25)
+	['1000 objects: wall time 1.500 s, +50% over 1.000 s', '1000 objects: json.load 0.900 s, +80% over 0.500 s']
+	"""
+	found = []
+	bySize = {result["size"]: result for result in baseline}
+	for result in results:
+		base = bySize.get(result["size"])
+		if base is None:
+			continue
+		label = "%d objects: " % result["size"]
+		measures = [("wall time", result["wall"], base["wall"])]
+		measures += [(name, wall, base["stages"][name]) for name, wall in result["stages"].items()
+			if name in base["stages"] and base["stages"][name] >= NOISE]
+		for name, value, reference in measures:
+			if value > reference * (1 + tolerance) and value - reference > NOISE:
+				found.append(label + "%s %.3f s, %+d%% over %.3f s" % (name, value, round(100 * (value / reference - 1)), reference))
+		if result["peak_rss"] and base["peak_rss"] and result["peak_rss"] > base["peak_rss"] * (1 + tolerance):
+			found.append(label + "peak RSS %.1f MB, %+d%% over %.1f MB" % (result["peak_rss"] / (1 << 20),
+				round(100 * (result["peak_rss"] / base["peak_rss"] - 1)), base["peak_rss"] / (1 << 20)))
+	return found
+
+
+def _change(value: float, reference: Optional[float]) -> str:
+	if not reference:
+		return "-"
+	return "%+d%%" % round(100 * (value / reference - 1))
+
+
+def format_results(results: list[dict[str, Any]], baseline: list[dict[str, Any]]) -> str:
+	# The table of the results, compared with the baseline, followed by the
+	# stages growing faster than the number of objects.
+	bySize = {result["size"]: result for result in baseline}
+	lines = ["%10s %10s %10s %12s %10s %12s %8s %8s" % ("Objects", "Wall s", "CPU s", "Peak RSS", "us/object", "Baseline s", "Wall", "RSS")]
+	for result in results:
+		base = bySize.get(result["size"], {})
+		lines.append("%10d %10.3f %10.3f %9.1f MB %10.1f %12s %8s %8s" % (result["objects"], result["wall"], result["cpu"],
+			(result["peak_rss"] or 0) / (1 << 20), 1e6 * result["wall"] / max(result["objects"], 1),
+			"%.3f" % base["wall"] if base else "-", _change(result["wall"], base.get("wall")),
+			_change(result["peak_rss"] or 0, base.get("peak_rss"))))
+	if len(results) > 1:
+		largest = results[-1]
+		stages = [name for name, wall in largest["stages"].items() if wall >= SCALING_MIN_SHARE * largest["wall"]]
+		lines.append("")
+		lines.append("Growth exponent of the wall time (1: linear, 2: quadratic)")
+		lines.append("%-44s" % "Stage" + "".join("%16s" % ("%d>%d" % (a["size"], b["size"])) for a, b in zip(results, results[1:])))
+		for name in [None] + stages:
+			exponents = [growth(a, b, name) for a, b in zip(results, results[1:])]
+			flag = "  superlinear" if any(e is not None and e > SUPERLINEAR for e in exponents[-1:]) else ""
+			lines.append("%-44s" % (name or "total") + "".join("%16s" % ("-" if e is None else "%.2f" % e) for e in exponents) + flag)
+	return "\n".join(lines)
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description="Benchmark the processing of synthetic cases of growing size.")
+	parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="Numbers of objects of the cases, up to %d (default: %%(default)s)." % MAX_SIZE)
+	parser.add_argument("--mix", default="", help="Weights of the kinds of objects of the cases (see synthetic_case.py).")
+	parser.add_argument("--seed", type=int, default=0, help="Seed of the cases (default: %(default)s).")
+	parser.add_argument("--stream", action="store_true", help="Process the cases with --stream.")
+	parser.add_argument("--jobs", type=int, default=1, help="Process the cases with --jobs (default: %(default)s).")
+	parser.add_argument("--repeat", type=int, default=1, help="Runs of each size, the fastest being kept (default: %(default)s).")
+	parser.add_argument("--trace-memory", action="store_true", help="Trace the memory with tracemalloc, reporting its peak; the processing is slower.")
+	parser.add_argument("--work-dir", default=str(DEFAULT_WORK_DIR), help="Directory of the generated cases (default: %(default)s).")
+	parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline of the results (default: %(default)s).")
+	parser.add_argument("--update-baseline", action="store_true", help="Write the results to the baseline instead of comparing them.")
+	parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="Increase over the baseline counted as a regression (default: %(default)s).")
+	parser.add_argument("--output", default=None, help="Write the results to a JSON file.")
+	parser.add_argument("--ingest", metavar="CASE", default=None, help=argparse.SUPPRESS)
+	args = parser.parse_args()
+
+	if args.ingest:
+		print(json.dumps(ingest(args.ingest, args.stream, args.jobs, args.trace_memory)))
+		return
+	try:
+		sizes = parse_sizes(args.sizes)
+		parse_mix(args.mix)
+	except ValueError as e:
+		parser.error(str(e))
+
+	options = {"generator": GENERATOR_VERSION, "mix": args.mix, "seed": args.seed, "stream": args.stream, "jobs": args.jobs, "trace_memory": args.trace_memory}
+	results = []
+	for size in sizes:
+		path = case_file(Path(args.work_dir), size, args.mix, args.seed)
+		runs = [run_ingest(path, args.stream, args.jobs, args.trace_memory) for _ in range(max(args.repeat, 1))]
+		result = dict(min(runs, key=lambda run: run["wall"]), size=size, bytes=path.stat().st_size)
+		print("%10d objects %8.3f s" % (result["objects"], result["wall"]), file=sys.stderr)
+		results.append(result)
+
+	report = {"machine": {"platform": platform.platform(), "processor": platform.processor() or platform.machine(),
+		"cpus": os.cpu_count(), "python": platform.python_version()}, "options": options, "results": results}
+	if args.output:
+		with open(args.output, "w", encoding="utf-8") as f:
+			json.dump(report, f, indent=2)
+
+	baseline: dict[str, Any] = {}
+	if not args.update_baseline and os.path.exists(args.baseline):
+		with open(args.baseline, encoding="utf-8") as f:
+			baseline = json.load(f)
+		if baseline.get("options") != options:
+			print("The options of the baseline differ, the results are not compared: %s" % baseline.get("options"))
+			baseline = {}
+		elif baseline.get("machine") != report["machine"]:
+			print("The baseline comes from another machine: %s" % baseline.get("machine"))
+	print(format_results(results, baseline.get("results", [])))
+
+	if args.update_baseline:
+		with open(args.baseline, "w", encoding="utf-8") as f:
+			json.dump(report, f, indent=2)
+		print("\nBaseline written to " + args.baseline)
+		return
+	found = regressions(results, baseline.get("results", []), args.tolerance)
+	if found:
+		print("\nRegressions over the baseline:")
+		for line in found:
+			print("  " + line)
+		sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
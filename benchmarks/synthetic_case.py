@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+Generator of synthetic UCO/CASE bundles, of any size.
+
+The bundle holds the objects of every kind processed by the viewer: the
+observables with the facets of each type (messages and SMS, chat threads,
+accounts, applications, files of every category, calls, ...), the
+relationships (Attached_To, Mapped_By, Connected_To) and objects the viewer
+ignores, e.g. identities.  The number of objects of each kind is the share of
+its weight in the mix, and the references between the objects, e.g. from a
+message to its sender account or from an attachment to its file and message,
+are drawn at random among the objects generated, with a seed.  The optional
+references, e.g. the sender or the recipients of a message, the participants
+of a thread or the application of a call, are left out of a share of the
+objects, as in the extractions where they are not known.
+
+The objects are written one at a time, one per line, so the bundles of
+millions of objects are generated with little memory.
+"""
+
+import argparse
+import json
+import random
+import sys
+from typing import Any, Iterator, Mapping, TextIO
+
+# Weights of the kinds of objects, by the name of the artifact table they end
+# in; "others" are the objects ignored by the viewer.  The default mix is
+# the one of the extractions of a mobile phone: mostly chat messages, files
+# and their attachments.
+DEFAULT_MIX: dict[str, int] = {
+	"applications": 2,
+	"accounts": 20,
+	"digitalAccounts": 1,
+	"emailAddresses": 2,
+	"emailAccounts": 2,
+	"geo_coordinates": 5,
+	"webURLs": 5,
+	"files": 175,
+	"chatMessages": 440,
+	"smsMessages": 80,
+	"chatThreads": 5,
+	"phoneCalls": 50,
+	"calendars": 5,
+	"cookies": 5,
+	"bluetooths": 2,
+	"cell_sites": 5,
+	"events": 10,
+	"wireless_net": 2,
+	"social_media_activities": 5,
+	"searched_items": 5,
+	"webBookmark": 3,
+	"webURLHistory": 5,
+	"webSearchTerm": 3,
+	"emailMessages": 5,
+	"relationAttachmentsTo": 150,
+	"relationMappedBy": 5,
+	"relationConnectedTo": 2,
+	"others": 1,
+}
+
+# Kinds referred to by each kind, of which at least an object is generated
+# when an object refers to them.
+REFERENCED_KINDS: dict[str, tuple[str, ...]] = {
+	"accounts": ("applications",),
+	"emailAccounts": ("emailAddresses",),
+	"chatMessages": ("applications", "accounts"),
+	"smsMessages": ("accounts",),
+	"chatThreads": ("accounts", "chatMessages"),
+	"phoneCalls": ("applications", "accounts"),
+	"cookies": ("applications",),
+	"social_media_activities": ("applications",),
+	"searched_items": ("applications",),
+	"webBookmark": ("applications", "webURLs"),
+	"webURLHistory": ("applications", "webURLs"),
+	"emailMessages": ("emailAccounts",),
+	"relationAttachmentsTo": ("files", "chatMessages"),
+	"relationMappedBy": ("geo_coordinates",),
+	"relationConnectedTo": ("bluetooths",),
+}
+
+# Version of the generator, to be increased whenever the bundles generated
+# from the same arguments change, so that the cases kept by the benchmark are
+# generated again.
+GENERATOR_VERSION = 2
+
+# Share of the objects left without each of their optional references
+MISSING_SHARE = 0.05
+
+# MIME types of the files, one for each category of the tree
+FILE_MIME_TYPES = ("image", "audio", "text/plain", "application/pdf", "application/msword", "application/rtf",
+	"video/mp4", "archives", "database", "application", "application/octet-stream")
+
+CONTEXT = {
+	"kb": "http://example.org/kb/",
+	"drafting": "http://example.org/ontology/drafting/",
+	"uco-core": "https://ontology.unifiedcyberontology.org/uco/core/",
+	"uco-identity": "https://ontology.unifiedcyberontology.org/uco/identity/",
+	"uco-location": "https://ontology.unifiedcyberontology.org/uco/location/",
+	"uco-observable": "https://ontology.unifiedcyberontology.org/uco/observable/",
+	"co": "http://purl.org/co/",
+	"xsd": "http://www.w3.org/2001/XMLSchema#",
+}
+
+
+def parse_mix(text: str) -> dict[str, int]:
+	"""
+	This method returns the mix given as comma-separated weights of kinds, replacing those of the default mix; a kind missing from the default mix is an error.
+
+	>>> mix = parse_mix("chatMessages=10, files=0")
+	>>> mix["chatMessages"], mix["files"], mix["accounts"]
+	(10, 0, 20)
+	>>> parse_mix("pictures=3")
+	Traceback (most recent call last):
+	...
+	ValueError: Unknown kind of object: 'pictures'.
+	"""
+	mix = dict(DEFAULT_MIX)
+	for item in text.split(","):
+		if not item.strip():
+			continue
+		kind, _, weight = item.partition("=")
+		kind = kind.strip()
+		if kind not in DEFAULT_MIX:
+			raise ValueError("Unknown kind of object: %r." % kind)
+		mix[kind] = int(weight)
+	return mix
+
+
+def object_counts(objects: int, mix: Mapping[str, int] = DEFAULT_MIX) -> dict[str, int]:
+	"""
+	This method returns the number of objects of each kind of the mix, for about the given number of objects in all: at least an object of each kind with a weight, and of each kind it refers to.
+
+	>>> counts = object_counts(1000)
+	>>> counts["chatMessages"], counts["files"], counts["applications"], sum(counts.values())
+	(440, 175, 2, 1000)
+	>>> object_counts(10, {"chatThreads": 1})
+	{'applications': 1, 'accounts': 1, 'chatMessages': 1, 'chatThreads': 10}
+	"""
+	total = sum(mix.values())
+	shares = {kind: divmod(objects * weight, total) for kind, weight in mix.items() if weight > 0}
+	counts = {kind: share for kind, (share, _) in shares.items()}
+	# The objects left by the rounding down go to the largest remainders.
+	left = objects - sum(counts.values())
+	for kind in sorted(shares, key=lambda kind: -shares[kind][1])[:left]:
+		counts[kind] += 1
+	kinds = list(counts)
+	while kinds:
+		kind = kinds.pop()
+		counts[kind] = max(counts.get(kind, 0), 1)
+		kinds.extend(referenced for referenced in REFERENCED_KINDS.get(kind, ()) if referenced not in counts)
+	return {kind: counts[kind] for kind in DEFAULT_MIX if kind in counts}
+
+
+def iri(kind: str, n: int) -> str:
+	"""
+	This method returns the @id of the n-th object of a kind, shaped as the UUIDs of the converted extractions.
+
+	>>> iri("chatMessages", 10)
+	'kb:chatMessages-00000008-0000-4000-8000-00000000000a'
+	"""
+	return "kb:%s-%08x-0000-4000-8000-%012x" % (kind, list(DEFAULT_MIX).index(kind), n)
+
+
+def _time(n: int) -> dict[str, str]:
+	# A timestamp for the n-th object of a kind, a minute after the previous one
+	days, minutes = divmod(n, 24 * 60)
+	return {"@type": "xsd:dateTime", "@value": "20%02d-%02d-%02dT%02d:%02d:00Z" % (
+		20 + days // 336 % 10, days // 28 % 12 + 1, days % 28 + 1, minutes // 60, minutes % 60)}
+
+
+def _observable(kind: str, n: int, *facets: dict[str, Any]) -> dict[str, Any]:
+	objectId = iri(kind, n)
+	for m, facet in enumerate(facets):
+		facet_type = facet["@type"] if isinstance(facet["@type"], str) else facet["@type"][0]
+		facet["@id"] = objectId.replace(kind, facet_type.split(":")[-1], 1) + "-%d" % m
+	return {"@id": objectId, "@type": "uco-observable:ObservableObject", "uco-core:hasFacet": list(facets)}
+
+
+def _relationship(kind: str, n: int, name: str, source: str, target: str, **properties: Any) -> dict[str, Any]:
+	return dict({"@id": iri(kind, n), "@type": "uco-observable:ObservableRelationship",
+		"uco-core:kindOfRelationship": name, "uco-core:isDirectional": True,
+		"uco-core:source": {"@id": source}, "uco-core:target": {"@id": target}}, **properties)
+
+
+class _Objects:
+	# The objects of a bundle, generated kind after kind in the order of the
+	# mix, so that most references are to objects generated before.
+
+	def __init__(self, counts: Mapping[str, int], seed: int, text_size: int, missing: float) -> None:
+		self.counts = counts
+		self.random = random.Random(seed)
+		self.text = ("lorem ipsum dolor sit amet " * (text_size // 27 + 1))[:text_size]
+		self.missing = missing
+
+	def ref(self, kind: str) -> dict[str, str]:
+		return {"@id": iri(kind, self.random.randrange(self.counts[kind]))}
+
+	def optional(self, facet: dict[str, Any], properties: Mapping[str, Any]) -> dict[str, Any]:
+		# Each optional property is left out of the share missing of the facets.
+		for key, value in properties.items():
+			if self.random.random() >= self.missing:
+				facet[key] = value
+		return facet
+
+	def __iter__(self) -> Iterator[dict[str, Any]]:
+		for kind, count in self.counts.items():
+			make = getattr(self, "make_" + kind)
+			for n in range(count):
+				yield make(n)
+
+	def make_applications(self, n: int) -> dict[str, Any]:
+		return _observable("applications", n, {"@type": "uco-observable:ApplicationFacet",
+			"uco-core:name": "Application %d" % n, "uco-observable:applicationIdentifier": "com.example.app%d" % n})
+
+	def make_accounts(self, n: int) -> dict[str, Any]:
+		# An account of an application, with a phone number
+		return _observable("accounts", n,
+			{"@type": "uco-observable:AccountFacet", "uco-observable:accountIdentifier": "user%d" % n},
+			{"@type": "uco-observable:PhoneAccountFacet", "uco-observable:phoneNumber": "+39%09d" % n,
+				"uco-observable:accountIdentifier": "Contact %d" % n},
+			self.optional({"@type": "uco-observable:ApplicationAccountFacet"}, {"uco-observable:application": self.ref("applications")}))
+
+	def make_digitalAccounts(self, n: int) -> dict[str, Any]:
+		return _observable("digitalAccounts", n, {"@type": "uco-observable:DigitalAccountFacet",
+			"uco-observable:displayName": "Digital account %d" % n})
+
+	def make_emailAddresses(self, n: int) -> dict[str, Any]:
+		return _observable("emailAddresses", n, {"@type": "uco-observable:EmailAddressFacet",
+			"uco-observable:addressValue": "user%d@example.org" % n})
+
+	def make_emailAccounts(self, n: int) -> dict[str, Any]:
+		return _observable("emailAccounts", n, {"@type": "uco-observable:EmailAccountFacet",
+			"uco-observable:emailAddress": self.ref("emailAddresses")})
+
+	def make_geo_coordinates(self, n: int) -> dict[str, Any]:
+		return _observable("geo_coordinates", n, {"@type": "uco-location:LatLongCoordinatesFacet",
+			"uco-location:latitude": {"@type": "xsd:decimal", "@value": "%.6f" % self.random.uniform(-90, 90)},
+			"uco-location:longitude": {"@type": "xsd:decimal", "@value": "%.6f" % self.random.uniform(-180, 180)}})
+
+	def make_webURLs(self, n: int) -> dict[str, Any]:
+		return _observable("webURLs", n, {"@type": "uco-observable:URLFacet",
+			"uco-observable:fullValue": "https://www.example.org/page/%d" % n})
+
+	def make_files(self, n: int) -> dict[str, Any]:
+		return _observable("files", n, {"@type": "uco-observable:FileFacet",
+			"uco-observable:mimeType": FILE_MIME_TYPES[n % len(FILE_MIME_TYPES)],
+			"uco-observable:fileName": "file%d.bin" % n, "uco-observable:filePath": "/data/media/file%d.bin" % n,
+			"uco-observable:sizeInBytes": {"@type": "xsd:integer", "@value": str(self.random.randrange(1 << 24))}})
+
+	def _message(self, kind: str, n: int, messageType: str) -> dict[str, Any]:
+		facet_type = "uco-observable:SMSMessageFacet" if kind == "smsMessages" else "uco-observable:MessageFacet"
+		facet = self.optional({"@type": facet_type, "uco-observable:messageText": self.text,
+			"uco-observable:sentTime": _time(n), "uco-observable:messageType": messageType},
+			{"uco-observable:from": self.ref("accounts"), "uco-observable:to": [self.ref("accounts")]})
+		if kind == "chatMessages":
+			self.optional(facet, {"uco-observable:application": self.ref("applications")})
+		return _observable(kind, n, facet)
+
+	def make_chatMessages(self, n: int) -> dict[str, Any]:
+		return self._message("chatMessages", n, "WhatsApp")
+
+	def make_smsMessages(self, n: int) -> dict[str, Any]:
+		return self._message("smsMessages", n, "SMS/Native Message")
+
+	def make_chatThreads(self, n: int) -> dict[str, Any]:
+		# The chat messages are dealt among the threads.
+		elements = [{"@id": iri("chatMessages", m)} for m in range(n, self.counts["chatMessages"], self.counts["chatThreads"])]
+		return _observable("chatThreads", n, self.optional({"@type": "uco-observable:MessageThreadFacet",
+			"uco-observable:messageThread": {"co:size": {"@type": "xsd:nonNegativeInteger", "@value": str(len(elements))},
+				"co:element": elements}},
+			{"uco-observable:participant": [self.ref("accounts"), self.ref("accounts")]}))
+
+	def make_phoneCalls(self, n: int) -> dict[str, Any]:
+		return _observable("phoneCalls", n, self.optional({"@type": "uco-observable:CallFacet",
+			"uco-observable:startTime": _time(n),
+			"uco-observable:duration": {"@type": "xsd:long", "@value": str(self.random.randrange(3600))}},
+			{"uco-observable:application": self.ref("applications"), "uco-observable:from": self.ref("accounts"),
+				"uco-observable:to": [self.ref("accounts")]}))
+
+	def make_calendars(self, n: int) -> dict[str, Any]:
+		return _observable("calendars", n, {"@type": "uco-observable:CalendarEntryFacet",
+			"uco-observable:subject": "Meeting %d" % n, "uco-observable:eventStatus": "Confirmed",
+			"uco-observable:startTime": _time(n), "uco-observable:endTime": _time(n + 60)})
+
+	def make_cookies(self, n: int) -> dict[str, Any]:
+		return _observable("cookies", n, self.optional({"@type": "uco-observable:BrowserCookieFacet",
+			"uco-observable:cookieName": "cookie%d" % n,
+			"uco-observable:cookiePath": "/", "uco-observable:observableCreatedTime": _time(n),
+			"uco-observable:accessedTime": _time(n + 1), "uco-observable:expirationTime": _time(n + 525600)},
+			{"uco-observable:application": self.ref("applications")}))
+
+	def make_bluetooths(self, n: int) -> dict[str, Any]:
+		return _observable("bluetooths", n, {"@type": "uco-observable:BluetoothAddressFacet",
+			"uco-observable:addressValue": ":".join("%02X" % b for b in n.to_bytes(6, "big"))})
+
+	def make_cell_sites(self, n: int) -> dict[str, Any]:
+		return _observable("cell_sites", n, {"@type": "uco-observable:CellSiteFacet",
+			"uco-observable:cellSiteCountryCode": "222", "uco-observable:cellSiteNetworkCode": "10",
+			"uco-observable:cellSiteLocationAreaCode": str(n % 1000), "uco-observable:cellSiteIdentifier": str(n),
+			"uco-observable:cellSiteType": ("GSM", "UMTS", "LTE")[n % 3]})
+
+	def make_events(self, n: int) -> dict[str, Any]:
+		return _observable("events", n, {"@type": "uco-observable:EventRecordFacet",
+			"uco-observable:eventType": ("Power on", "Power off", "Airplane mode")[n % 3],
+			"uco-observable:eventText": self.text, "uco-observable:observableCreatedTime": _time(n)})
+
+	def make_wireless_net(self, n: int) -> dict[str, Any]:
+		return _observable("wireless_net", n, {"@type": "uco-observable:WirelessNetworkConnectionFacet",
+			"uco-observable:ssid": "Network %d" % n, "uco-observable:baseStation": "00:1A:2B:%02X:%02X:%02X" % tuple(n.to_bytes(3, "big"))})
+
+	def make_social_media_activities(self, n: int) -> dict[str, Any]:
+		return _observable("social_media_activities", n, self.optional({"@type": ["drafting:SocialMediaActivityFacet"],
+			"uco-observable:body": self.text,
+			"uco-observable:pageTitle": "Post %d" % n, "uco-observable:observableCreatedTime": _time(n),
+			"drafting:authorIdentifier": "author%d" % n, "drafting:authorName": "Author %d" % n},
+			{"uco-observable:application": self.ref("applications")}))
+
+	def make_searched_items(self, n: int) -> dict[str, Any]:
+		return _observable("searched_items", n, self.optional({"@type": "drafting:SearchedItemFacet",
+			"drafting:searchLaunchedTime": _time(n), "drafting:searchValue": "search %d" % n},
+			{"uco-observable:application": self.ref("applications")}))
+
+	def make_webBookmark(self, n: int) -> dict[str, Any]:
+		return _observable("webBookmark", n, self.optional({"@type": "uco-observable:BrowserBookmarkFacet",
+			"uco-observable:bookmarkPath": "/Bookmarks/%d" % n, "uco-observable:observableCreatedTime": _time(n)},
+			{"uco-observable:application": self.ref("applications"), "uco-observable:urlTargeted": self.ref("webURLs")}))
+
+	def make_webURLHistory(self, n: int) -> dict[str, Any]:
+		return _observable("webURLHistory", n, self.optional({"@type": "uco-observable:URLHistoryFacet",
+			"uco-observable:urlHistoryEntry": [self.optional({
+				"uco-observable:pageTitle": "Page %d" % n, "uco-observable:firstVisit": _time(n),
+				"uco-observable:lastVisit": _time(n + 1)}, {"uco-observable:url": self.ref("webURLs")})]},
+			{"uco-observable:browserInformation": self.ref("applications")}))
+
+	def make_webSearchTerm(self, n: int) -> dict[str, Any]:
+		# A URL history entry of a keyword search
+		return _observable("webSearchTerm", n, {"@type": "uco-observable:URLHistoryFacet",
+			"uco-observable:urlHistoryEntry": [{"uco-observable:keywordSearchTerm": "search term %d" % n}]})
+
+	def make_emailMessages(self, n: int) -> dict[str, Any]:
+		return _observable("emailMessages", n, self.optional({"@type": "uco-observable:EmailMessageFacet",
+			"uco-observable:sentTime": _time(n), "uco-observable:subject": "Subject %d" % n, "uco-observable:body": self.text},
+			{"uco-observable:from": self.ref("emailAccounts"), "uco-observable:to": [self.ref("emailAccounts")],
+				"uco-observable:cc": [self.ref("emailAccounts")], "uco-observable:bcc": [self.ref("emailAccounts")]}))
+
+	def make_relationAttachmentsTo(self, n: int) -> dict[str, Any]:
+		return _relationship("relationAttachmentsTo", n, "Attached_To", self.ref("files")["@id"], self.ref("chatMessages")["@id"])
+
+	def make_relationMappedBy(self, n: int) -> dict[str, Any]:
+		return _relationship("relationMappedBy", n, "Mapped_By", iri("others", 0), self.ref("geo_coordinates")["@id"],
+			**{"uco-observable:startTime": _time(n)})
+
+	def make_relationConnectedTo(self, n: int) -> dict[str, Any]:
+		return _relationship("relationConnectedTo", n, "Connected_To", iri("others", 0), self.ref("bluetooths")["@id"],
+			**{"uco-observable:startTime": _time(n), "uco-observable:endTime": _time(n + 10)})
+
+	def make_others(self, n: int) -> dict[str, Any]:
+		return {"@id": iri("others", n), "@type": "uco-identity:Identity"}
+
+
+def generate_objects(objects: int, mix: Mapping[str, int] = DEFAULT_MIX, seed: int = 0, text_size: int = 40, missing: float = MISSING_SHARE) -> Iterator[dict[str, Any]]:
+	"""
+	This method yields the objects of a bundle of about the given number of objects, with the mix of kinds, the random references drawn with the seed, texts of text_size characters, and each optional reference left out of the share missing of the objects.
+
+	>>> objects = list(generate_objects(1000, seed=1))
+	>>> len(objects), objects[0]["@id"]
+	(1000, 'kb:applications-00000000-0000-4000-8000-000000000000')
+	>>> facets = [facet["@type"] for o in objects for facet in o.get("uco-core:hasFacet", [])]
+	>>> len(set(map(str, facets))), facets.count("uco-observable:MessageFacet")
+	(25, 440)
+	>>> objects == list(generate_objects(1000, seed=1))
+	True
+	>>> messages = [facet for o in objects for facet in o.get("uco-core:hasFacet", []) if facet["@type"] == "uco-observable:MessageFacet"]
+	>>> sum("uco-observable:from" not in facet for facet in messages)
+	32
+	>>> all("uco-observable:from" in facet for o in generate_objects(1000, seed=1, missing=0) for facet in o.get("uco-core:hasFacet", [])
+	...     if facet["@type"] == "uco-observable:MessageFacet")
+	True
+	"""
+	return iter(_Objects(object_counts(objects, mix), seed, text_size, missing))
+
+
+def write_case(f: TextIO, objects: int, mix: Mapping[str, int] = DEFAULT_MIX, seed: int = 0, text_size: int = 40, missing: float = MISSING_SHARE) -> int:
+	"""
+	This method writes a bundle of about the given number of objects (see generate_objects), one object per line, and returns the number of objects written.
+
+	>>> import io
+	>>> f = io.StringIO()
+	>>> write_case(f, 1000)
+	1000
+	>>> bundle = json.loads(f.getvalue())
+	>>> bundle["@type"], len(bundle["uco-core:object"])
+	('uco-core:Bundle', 1000)
+	"""
+	f.write('{\n"@context": %s,\n"@id": "kb:bundle-%08x",\n"@type": "uco-core:Bundle",\n"uco-core:object": [\n'
+		% (json.dumps(CONTEXT), seed))
+	n = 0
+	for obj in generate_objects(objects, mix, seed, text_size, missing):
+		if n:
+			f.write(",\n")
+		f.write(json.dumps(obj, separators=(",", ":")))
+		n += 1
+	f.write("\n]\n}\n")
+	return n
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description="Generate a synthetic UCO/CASE bundle.")
+	parser.add_argument("--objects", type=int, default=10000, help="Number of objects, about (default: %(default)s).")
+	parser.add_argument("--mix", default="", help="Weights of the kinds of objects, replacing the default ones, e.g. chatMessages=600,files=50; the kinds are: " + ", ".join(DEFAULT_MIX) + ".")
+	parser.add_argument("--seed", type=int, default=0, help="Seed of the random references (default: %(default)s).")
+	parser.add_argument("--text-size", type=int, default=40, help="Length of the texts of the messages (default: %(default)s).")
+	parser.add_argument("--missing", type=float, default=MISSING_SHARE, help="Share of the objects left without each of their optional references, e.g. the sender of a message (default: %(default)s).")
+	parser.add_argument("output", help="File of the bundle, - for the standard output.")
+	args = parser.parse_args()
+	try:
+		mix = parse_mix(args.mix)
+	except ValueError as e:
+		parser.error(str(e))
+	if args.output == "-":
+		write_case(sys.stdout, args.objects, mix, args.seed, args.text_size, args.missing)
+	else:
+		with open(args.output, "w", encoding="utf-8") as f:
+			write_case(f, args.objects, mix, args.seed, args.text_size, args.missing)
+
+
+if __name__ == "__main__":
+	main()
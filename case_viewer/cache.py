@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+Cache of the processed cases.
+
+A snapshot holds the artifact tables computed from an input file, in the
+columnar format of the columnar module, so that it is opened through mmap
+without being loaded in memory, or in an SQLite database of the database
+module, told apart by the suffix of the file.  It is stored under the SHA-256 digest of the
+input content and the schema version of the tables, so a snapshot is reused
+only for the very same file processed by a compatible version of the
+application.  The least recently used snapshots are evicted when the cache
+grows beyond its size cap.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Any, Mapping, Optional, Sequence, Union
+
+from .columnar import ColumnarStore, SupportsItems, write_store
+from .database import SqliteStore
+
+# To be increased whenever the content of the artifact tables changes.
+SCHEMA_VERSION = 4
+
+DEFAULT_MAX_SIZE = 2 << 30
+
+SNAPSHOT_SUFFIX = ".snapshot"
+DATABASE_SUFFIX = ".sqlite"
+
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+def default_cache_dir() -> Path:
+	"""
+	This method returns the cache directory used when none is given, following the XDG convention.
+
+	>>> saved = os.environ.get("XDG_CACHE_HOME")
+	>>> os.environ["XDG_CACHE_HOME"] = "/tmp/xdg"
+	>>> default_cache_dir().as_posix()
+	'/tmp/xdg/case_viewer'
+	>>> if saved is None: del os.environ["XDG_CACHE_HOME"]
+	... else: os.environ["XDG_CACHE_HOME"] = saved
+	"""
+	base = os.environ.get("XDG_CACHE_HOME") or os.path.join(Path.home(), ".cache")
+	return Path(base) / "case_viewer"
+
+
+def file_digest(path: str) -> str:
+	"""
+	This method returns the hexadecimal SHA-256 digest of the content of a file, read in chunks.
+
+	>>> import tempfile
+	>>> with tempfile.NamedTemporaryFile(delete=False) as fp:
+	...     _ = fp.write(b"{}")
+	>>> file_digest(fp.name)[:16]
+	'44136fa355b3678a'
+	>>> os.remove(fp.name)
+	"""
+	digest = hashlib.sha256()
+	with open(path, "rb") as fp:
+		while True:
+			chunk = fp.read(_HASH_CHUNK_SIZE)
+			if not chunk:
+				break
+			digest.update(chunk)
+	return digest.hexdigest()
+
+
+def snapshot_path(cache_dir: Path, digest: str, suffix: str = SNAPSHOT_SUFFIX) -> Path:
+	"""
+	>>> snapshot_path(Path("/tmp/cache"), "abc").as_posix(), snapshot_path(Path("/tmp/cache"), "abc", DATABASE_SUFFIX).name
+	('/tmp/cache/abc-v4.snapshot', 'abc-v4.sqlite')
+	"""
+	return cache_dir / ("%s-v%d%s" % (digest, SCHEMA_VERSION, suffix))
+
+
+def temporary_path(path: Path) -> Path:
+	"""
+	This method returns the path a snapshot is written to before being moved to its path, unique to the process.
+	"""
+	return path.with_name(path.name + ".%d.tmp" % os.getpid())
+
+
+def load_snapshot(cache_dir: Path, digest: str, suffix: str = SNAPSHOT_SUFFIX) -> Optional[Union[ColumnarStore, SqliteStore]]:
+	"""
+	This method opens the snapshot stored for a digest, or returns None.  A snapshot that cannot be read is removed.
+
+	>>> import tempfile
+	>>> cache_dir = Path(tempfile.mkdtemp())
+	>>> load_snapshot(cache_dir, "abc") is None
+	True
+	>>> save_snapshot(cache_dir, "abc", {"calls": [{"id": "kb:call"}]}, {"nObjects": 1}).name
+	'abc-v4.snapshot'
+	>>> store = load_snapshot(cache_dir, "abc")
+	>>> store.meta, dict(store.table("calls")[0])
+	({'nObjects': 1}, {'id': 'kb:call'})
+	>>> store.close()
+	>>> _ = snapshot_path(cache_dir, "abc").write_bytes(b"garbage")
+	>>> load_snapshot(cache_dir, "abc") is None
+	True
+	>>> snapshot_path(cache_dir, "abc").exists()
+	False
+	"""
+	path = snapshot_path(cache_dir, digest, suffix)
+	if not path.exists():
+		return None
+	try:
+		store: Union[ColumnarStore, SqliteStore] = SqliteStore(str(path)) if suffix == DATABASE_SUFFIX else ColumnarStore(str(path))
+	except Exception:
+		path.unlink(missing_ok=True)
+		return None
+	# The modification time records the last use, for the LRU eviction.
+	os.utime(path)
+	return store
+
+
+def save_snapshot(cache_dir: Path, digest: str, tables: Mapping[str, Sequence[SupportsItems]], meta: Mapping[str, Any], max_size: int = DEFAULT_MAX_SIZE) -> Path:
+	"""
+	This method stores the tables of a digest and evicts the least recently used snapshots beyond max_size bytes.  The snapshot is written to a temporary file first, so a reader never sees it half written.
+	"""
+	cache_dir.mkdir(parents=True, exist_ok=True)
+	tmp_path = temporary_path(snapshot_path(cache_dir, digest))
+	try:
+		with open(tmp_path, "wb") as fp:
+			write_store(fp, tables, meta)
+		return add_snapshot(cache_dir, digest, tmp_path, SNAPSHOT_SUFFIX, max_size)
+	finally:
+		tmp_path.unlink(missing_ok=True)
+
+
+def add_snapshot(cache_dir: Path, digest: str, written_path: Path, suffix: str, max_size: int = DEFAULT_MAX_SIZE) -> Path:
+	"""
+	This method moves a snapshot written to written_path, on the file system of the cache, to the path of the digest, and evicts the least recently used snapshots beyond max_size bytes.  The snapshot just added is kept, even when larger than max_size, so that it can be opened; it is evicted by the next addition.
+
+	>>> import tempfile
+	>>> cache_dir = Path(tempfile.mkdtemp())
+	>>> written_path = temporary_path(snapshot_path(cache_dir, "abc", DATABASE_SUFFIX))
+	>>> from .database import write_database
+	>>> write_database(written_path, {"calls": [{"id": 1}]}, {"nObjects": 1})
+	>>> add_snapshot(cache_dir, "abc", written_path, DATABASE_SUFFIX).name, written_path.exists()
+	('abc-v4.sqlite', False)
+	>>> store = load_snapshot(cache_dir, "abc", DATABASE_SUFFIX)
+	>>> store.meta, dict(store.table("calls")[0]), load_snapshot(cache_dir, "abc") is None
+	({'nObjects': 1}, {'id': 1}, True)
+	>>> store.close()
+	>>> write_database(written_path, {"calls": [{"id": 2}]}, {"nObjects": 1})
+	>>> add_snapshot(cache_dir, "def", written_path, DATABASE_SUFFIX, 0).name, sorted(p.name for p in cache_dir.iterdir())
+	('def-v4.sqlite', ['def-v4.sqlite'])
+	"""
+	path = snapshot_path(cache_dir, digest, suffix)
+	os.replace(written_path, path)
+	evict_snapshots(cache_dir, max_size, keep=path)
+	return path
+
+
+def evict_snapshots(cache_dir: Path, max_size: int, keep: Optional[Path] = None) -> list[Path]:
+	"""
+	This method removes the least recently used snapshots, but keep, until the total size of the cache is within max_size bytes, and returns the removed paths.
+
+	>>> import tempfile
+	>>> cache_dir = Path(tempfile.mkdtemp())
+	>>> for n, digest in enumerate(["old", "mid", "new"]):
+	...     _ = snapshot_path(cache_dir, digest).write_bytes(b"x" * 10)
+	...     os.utime(snapshot_path(cache_dir, digest), (n, n))
+	>>> [p.name for p in evict_snapshots(cache_dir, 25)]
+	['old-v4.snapshot']
+	>>> sorted(p.name for p in cache_dir.iterdir())
+	['mid-v4.snapshot', 'new-v4.snapshot']
+	>>> [p.name for p in evict_snapshots(cache_dir, 0, keep=snapshot_path(cache_dir, "mid"))]
+	['new-v4.snapshot']
+	"""
+	snapshots = []
+	for path in [*cache_dir.glob("*" + SNAPSHOT_SUFFIX), *cache_dir.glob("*" + DATABASE_SUFFIX)]:
+		try:
+			stat = path.stat()
+		except FileNotFoundError:
+			continue
+		snapshots.append((stat.st_mtime, stat.st_size, path))
+	snapshots.sort()
+	total = sum(size for _, size, _ in snapshots)
+	removed = []
+	for _, size, path in snapshots:
+		if total <= max_size:
+			break
+		if path == keep:
+			continue
+		try:
+			path.unlink(missing_ok=True)
+		except OSError:
+			# e.g. a snapshot mapped by another process on Windows
+			continue
+		total -= size
+		removed.append(path)
+	return removed
@@ -13,1008 +13,780 @@
 # We would appreciate acknowledgement if the software is used.
 
 import argparse
+import atexit
+import functools
 import json
+import os
+import tempfile
 import codecs
+import weakref
+import io
 import sys
-from collections import deque
-from typing import Optional, Union, List, Dict
-from PyQt6.QtWidgets import *
-from PyQt6.QtGui import *
-from PyQt6 import QtCore
-from PyQt6.QtCore import Qt, QTimer
-
-#from PyQt5.QtWidgets import *
-#from PyQt5.QtGui import *
-#from PyQt5 import QtCore
+from contextlib import closing, contextmanager, nullcontext
+from pathlib import Path
+from collections import Counter, deque
+from itertools import islice
+from typing import Any, Callable, Optional, Union, List, Dict, Mapping, Sequence, cast
 import logging
 
 from .lib import JSONLD, get_attribute, get_optional_integer_attribute, \
 						get_optional_string_attribute, get_optional_dict_attribute, \
 						get_optional_list_attribute
-
-
-class TableModel(QtCore.QAbstractTableModel):
-	def __init__(self, data, headers):
-		super(TableModel, self).__init__()
-		self._data = data
-		self._headers = headers  # Memorizziamo qui i nomi delle colonne
-
-	def data(self, index, role):
-		if role == QtCore.Qt.ItemDataRole.DisplayRole:
-			# See below for the nested-list data structure.
-			# .row() indexes into the outer list,
-			# .column() indexes into the sub-list
-			return self._data[index.row()][index.column()]
-
-	def rowCount(self, index):
-		# The length of the outer list.
-		return len(self._data)
-
-	def columnCount(self, index):
-		# The following takes the first sub-list, and returns
-		# the length (only works if all rows are of equal length)
-		if len(self._data) == 0:
-			return 0
-		else:
-			return len(self._data[0])
-
-	# QUESTO METODO CREA L'INTESTAZIONE FISSA
-	def headerData(self, section, orientation, role):
-		if role == QtCore.Qt.ItemDataRole.DisplayRole:
-			if orientation == QtCore.Qt.Orientation.Horizontal:
-				# Restituisce il nome dalla nostra lista headers
-				return self._headers[section]
-		return None
-
-
-class view(QWidget):
-	def __init__(self, treeData, tableData):
-		super(view, self).__init__()
-		self.tree = QTreeView(self)
-
-		self.tree_cyber_item = ''
-
-		self.table = QTableView(self)
-		# ottengo l'header della  QTableView
-		header = self.table.horizontalHeader()
-
-
-		# tutte le colonne si divideranno equamente lo spazio disponibile
-		header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-		header.setVisible(True)
-		header.setStretchLastSection(True)
-
-		self.table.setVisible(True)
-		self.tableData = tableData
-		self.treeData = treeData
-		self.font = QFont("Helvetica", pointSize=12, weight=QFont.Weight.Medium)
-		self.textEdit = QTextEdit()
-		self.textEdit.setFont(self.font)
-		self.textEdit.setDocumentTitle("Details")
-		self.textEdit.setHtml('<h2>Here the details will be displayed</h2>')
-		self.modelTable = TableModel(tableData, [])
-		self.table.setModel(self.modelTable)
-		self.table.headers = []
-
-		grid = QGridLayout()
-		grid.setSpacing(10)
-		# grid.addWidget(widget, riga, colonna, rowSpan, colSpan)
-		grid.addWidget(self.tree, 1, 0, 10, 4)
-		grid.addWidget(self.table, 1, 4, 10, 7)
-		grid.addWidget(self.textEdit, 1, 14, 10, 9)
-
-		self.setLayout(grid)
-		self.model = QStandardItemModel()
-		self.model.setHorizontalHeaderLabels(['Cyber item'])
-		self.tree.setModel(self.model)
-		self.importData(self.treeData)
-		self.tree.clicked.connect(self.select_left_bar)
-		self.tree.collapseAll()
-		self.table.clicked.connect(self.select_main_panel)
-
-	# Function to save populate treeview with a dictionary
-	def importData(self, data, root=None):
-		self.model.setRowCount(0)
-		if root is None:
-			root = self.model.invisibleRootItem()
-		seen = {}   # List of  QStandardItem
-		values = deque(data)
-		while values:
-			value = values.popleft()
-			if value['unique_id'] == ':00000000':
-				parent = root
-			else:
-				pid = value['parent_id']
-				if pid not in seen:
-					values.append(value)
-					continue
-				parent = seen[pid]
-			unique_id = value['unique_id']
-			parent.appendRow([
-				QStandardItem(value['short_name']),
-			])
-			seen[unique_id] = parent.child(parent.rowCount() - 1)
-
-	# Function to transverse treeview and derive tree_list
-	def transverse_tree(self):
-		tree_list = []
-		for i in range(self.model.rowCount()):
-			item = self.model.item(i)
-			level = 0
-			self.GetItem(item, level, tree_list)
-		return tree_list
-
-	def GetItem(self, item, level, tree_list):
-		if item is not None:
-			if item.hasChildren():
-				level = level + 1
-				short_name = ' '
-				height = ' '
-				weight = ' '
-				id = 0
-				for i in range(item.rowCount()):
-					id = id + 1
-					for j in reversed([0, 1, 2]):
-						childitem = item.child(i, j)
-						if childitem is not None:
-							if j == 0:
-								short_name = childitem.data(0)
-							else:
-								short_name = short_name
-							if j == 1:
-								height = childitem.data(0)
-							else:
-								height = height
-							if j == 2:
-								weight = childitem.data(0)
-							else:
-								weight = weight
-
-							if j == 0:
-								dic = {}
-								dic['level'] = level
-								dic['id'] = id
-								dic['short_name'] = short_name
-								tree_list.append(dic)
-							self.GetItem(childitem, level, tree_list)
-				return tree_list
-
-	def buildTableData(self, idObject: str) -> list:
-		self.headers: list[str] = []
-		tData = self.buildDataChatMessages(idObject)
-		if len(tData) == 0:
-			tData = self.buildDataPhoneCalls(idObject)
-		if len(tData) == 0:
-			tData = self.buildDataCalendars(idObject)
-		if len(tData) == 0:
-			tData = self.buildDataBluetooths(idObject)
-		if len(tData) == 0:
-			tData = self.buildDataSms(idObject)
-		if len(tData) == 0:
-			tData = self.buildDataContacts(idObject)
-		if len(tData) == 0:
-			tData = self.buildDataCellSites(idObject)
-		if len(tData) == 0:
-			tData = self.buildDataWirelessNet(idObject)
-		if len(tData) == 0:
-			tData = self.buildDataSearchedItems(idObject)
-		if len(tData) == 0:
-			tData = self.buildDataSocialMediaActivities(idObject)
-		if len(tData) == 0:
-			tData = self.buildDataEvents(idObject)
-		if len(tData) == 0:
-			tData = self.buildDataCookies(idObject)
-		if len(tData) == 0:
-			tData = self.buildDataEmailMessages(idObject)
-		if len(tData) == 0:
-			tData = self.buildDataFiles(idObject)
-		if len(tData) == 0:
-			tData = self.buildDataWebBookmarks(idObject)
-		if len(tData) == 0:
-			tData = self.buildDataWebHistories(idObject)
-		if len(tData) == 0:
-			tData = self.buildDataWebSearchTerm(idObject)
-		if len(tData) == 0:
-			tData = self.buildDataLocationDevice(idObject)
-		return tData
-
-	def buildDataChatMessages(self, idObject):
-		tData = []
-		threadFound = False
-		threadSlot = []
-
-		for t in chatThreads:
-			if t["@id"] == idObject:
-				threadFound = True
-				threadSlot = t["thread:messages"]
-				break
-
-		if not threadFound:
-			print('Thread not found')
-			return tData
-		#print(f"threadSlot=\n{threadSlot}")
-		self.headers = [" ● Date ● ", " ● Attachments ● "]
-
-		for idMsg in threadSlot:
-			for m in chatMessages:
-				if idMsg == m["@id"]:
-					msgDate = m["uco-observable:sentTime"]
-					msgAttachments = m["uco-observable:attachedFiles"]
-					tData.append([msgDate, msgAttachments])
-		return tData
-
-	def buildDataContacts(self, idObject):
-		tData = []
-		if idObject == ':Accounts':
-			self.headers = [" ● Identifier ● ", " ● Phone ● "]
-			for a in accounts:
-				accountIdentifier = a["uco-observable:accountIdentifier"]
-				accountPhone = a["uco-observable:phoneAccount"]
-				#accountApplication = a["uco-observable:application"]
-				#accountDiplayName = a["uco-observable:displayName"]
-				tData.append([accountIdentifier, accountPhone])
-		return tData
-
-	def buildDataBluetooths(self, idObject):
-		tData = []
-		if idObject == ':Bluetooths':
-			self.headers = [" ● Address ● "]
-			for b in bluetooths:
-				tData.append([b["uco-observable:addressValue"]])
-		return tData
-
-	def buildDataCalendars(self, idObject):
-		tData = []
-		if idObject != ':Calendars':
-			print('Calendar not found')
-			return tData
-		else:
-			self.headers = [" ● Subject ● ", " ● Start time ● ", " ● End time ● "]
-			for c in calendars:
-				calendarSubject = c["uco-observable:subject"]
-				#calendarRepeatInterval = c["uco-observable:recurrence"]
-				calendarStartDate = c["uco-observable:startTime"]
-				calendarEndDate = c["uco-observable:endTime"]
-				#calendarStatus = c["uco-observable:eventStatus"]
-				tData.append([calendarSubject, calendarStartDate, calendarEndDate])
-		return tData
-
-	def buildDataPhoneCalls(self, idObject):
-		tData = []
-		if idObject == ':Calls':
-			self.headers = [" ● From ● ", " ● To ● ", " ● Date ● "]
-			for c in phoneCalls:
-				callDate = c["uco-observable:startTime"]
-				#callDuration = c["uco-observable:duration"]
-				callFrom = c["uco-observable:from"]
-				callTo = c["uco-observable:to"]
-				tData.append([callFrom, callTo, callDate])
-		return tData
-
-	def buildDataCellSites(self, idObject):
-		tData = []
-		if idObject == ':CellSites':
-			self.headers = [" ● MCC ● ", " ● LAC ● ", " ● Type ● "]
-			for c in cell_sites:
-				cellMCC = c["uco-observable:cellSiteCountryCode"]
-				#cellMNC = c["uco-observable:cellSiteNetworkCode"]
-				cellLAC = c["uco-observable:cellSiteLocationAreaCode"]
-				#cellCID = c["uco-observable:cellSiteIdentifier"]
-				cellType = c["uco-observable:cellSiteType"]
-				tData.append([cellMCC, cellLAC, cellType])
-		return tData
-
-	def buildDataWirelessNet(self, idObject: str) -> list[list[str]]:
-		global wireless_net
-		tData = []
-		if idObject == ':WirelessNet':
-			self.headers = [" ● BSID ● "]
-			for w in wireless_net:
-				#wirelessSsid = w["uco-observable:ssid"]
-				wirelessBsid = w["uco-observable:baseStation"]
-				tData.append([wirelessBsid])
-		return tData
-
-	def buildDataSearchedItems(self, idObject):
-		tData = []
-		if idObject == ':SearchedItems':
-			self.headers = [" ● Value ● "]
-			for s in searched_items:
-				#searchedSource = s["drafting:searchSource"]
-				#searchedTime = s["drafting:searchLaunchedTime"]
-				searchedValue = s["drafting:searchValue"]
-				tData.append([searchedValue])
-		return tData
-
-	def buildDataSocialMediaActivities(self, idObject):
-		tData = []
-		if idObject == ':SocialMediaActivities':
-			self.headers = [" ● App ● ", " ● Type ● "]
-			for s in social_media_activities:
-				#socialBody = s["uco-observable:body"]
-				#socialTitle = s["uco-observable:pageTitle"]
-				#socialDate = s["uco-observable:observableCreatedTime"]
-				socialApp = s["uco-observable:application"]
-				#socialAuthorId = s["drafting:authorIdentifier"]
-				#socialAccountId = s["uco-observable:accountIdentifier"]
-				#socialName = s["drafting:authorName"]
-				socialType = s["drafting:activityType"]
-				tData.append([socialApp, socialType])
-		return tData
-
-	def buildDataEvents(self, idObject):
-		tData = []
-		if idObject == ':Events':
-			self.headers = [" ● Date ● ", " ● Type ● "]
-			for e in events:
-				eCreated = e["uco-observable:observableCreatedTime"]
-				eType = e["uco-observable:eventType"]
-				#eText = e["uco-observable:eventText"]
-				tData.append([eCreated, eType])
-		return tData
-
-	def buildDataCookies(self, idObject):
-		tData = []
-		if idObject == ':Cookies':
-			self.headers = [" ● Name ● ", " ● Application ● "]
-			for c in cookies:
-				cookieName = c["uco-observable:cookieName"]
-				#cookiePath = c["uco-observable:cookiePath"]
-				cookieApp = c["uco-observable:cookieApp"]
-				#cookieCreatedTime = c["uco-observable:observableCreatedTime"]
-				#cookieExpirationTime = c["uco-observable:expirationTime"]
-				tData.append([cookieName, cookieApp])
-		return tData
-
-	def buildDataEmailMessages(self, idObject):
-		tData = []
-		if idObject == ':EmailMessages':
-			self.headers = [" ● From ● ", " ● To ● ", " ● Date ● "]
-			for e in emailMessages:
-				#emailSubject = e["uco-observable:subject"]
-				emailDate = e["uco-observable:sentTime"]
-				emailFrom = e["uco-observable:from"]
-				emailTo = e["uco-observable:to"]
-				tData.append([emailFrom, emailTo, emailDate])
-		return tData
-
-	def buildDataFiles(self, idObject):
-		tData = []
-		self.headers = [" ● Name ● ", " ● Size ● "]
-
-		if idObject == ':Images':
-			self.buildDataFileType(filesImage, tData)
-			# for f in filesImage:
-			# 	fileName = f["uco-observable:fileName"]
-			# 	fileSize = f["uco-observable:fileSize"]
-			# 	tData.append([fileName, fileSize])
-
-		if idObject == ':Texts':
-			self.buildDataFileType(filesText, tData)
-
-		if idObject == ':PDFs':
-			self.buildDataFileType(filesPDF, tData)
-
-		if idObject == ':Words':
-			self.buildDataFileType(filesWord, tData)
-
-		if idObject == ':RTFs':
-			self.buildDataFileType(filesRTF, tData)
-
-		if idObject == ':Audios':
-			self.buildDataFileType(filesAudio, tData)
-
-		if idObject == ':Videos':
-			self.buildDataFileType(filesVideo, tData)
-
-		if idObject == ':Archives':
-			self.buildDataFileType(filesArchive, tData)
-
-		if idObject == ':Databases':
-			self.buildDataFileType(filesDatabase, tData)
-
-		if idObject == ':Applications':
-			self.buildDataFileType(filesApplication, tData)
-
-		if idObject == ':Uncategorized':
-			self.buildDataFileType(filesUncategorized, tData)
-
-		return tData
-
-	def buildDataFileType(self, listFile, tData):
-		for f in listFile:
-				fileName = f["uco-observable:fileName"]
-				fileSize = f["uco-observable:fileSize"]
-				tData.append([fileName, fileSize])
-
-	def buildDataSms(self, idObject):
-		tData = []
-		if idObject == ':Sms':
-			self.headers = [" ● From ● ", " ● To ● ", " ● Date ● "]
-			for m in smsMessages:
-				#smsText = m["uco-observable:messageText"]
-				#smsApp = m["uco-observable:application"]
-				smsSentTime = m["uco-observable:sentTime"]
-				#smsStatus = m["uco-observable:allocationStatus"]
-				smsFrom = m["uco-observable:from"]
-				smsTo = m["uco-observable:to"]
-				tData.append([smsFrom, smsTo, smsSentTime])
-		return tData
-
-	def buildDataWebBookmarks(self, idObject):
-		tData = []
-		if idObject == ':WebBookmarks':
-			self.headers = [" ● Url ● ", " ● App ● "]
-			for w in webBookmark:
-				webUrl = w["uco-observable:urlTargeted"]
-				webApp = w["uco-observable:application"]
-				#webPath = w["uco-observable:bookmarkPath"]
-				#webDate = w["uco-observable:observableCreatedTime"]
-				tData.append([webUrl, webApp])
-		return tData
-
-	def buildDataWebHistories(self, idObject):
-		tData = []
-		webApp = ''
-		if idObject == ':WebHistories':
-			self.headers = [" ● Url ● ", " ● App ● "]
-			for w in webURLHistory:
-				webUrl = w["uco-observable:url"]
-				#webTitle = w["uco-observable:title"]
-				#webLastVisited = w["uco-observable:lastVisited"]
-				webApp = w["uco-observable:browserInformation"]
-				tData.append([webUrl, webApp])
-		return tData
-
-	def buildDataWebSearchTerm(self, idObject):
-		tData = []
-		print(f"idObject={idObject}")
-		if idObject == ':WebSearchTerms':
-			self.headers = [" ● Web search term ● "]
-			for w in webSearchTerm:
-				webTerm = w["uco-observable:searchTerm"]
-				tData.append([webTerm])
-		return tData
-
-	def buildDataLocationDevice(self, idObject):
-		tData = []
-		if idObject == ':LocationDevice':
-			self.headers = [" ● Latitude ● ", " ● Longitude ● "]
-			for location in relationMappedBy:
-				#lDate = location["uco-observable:mappedByStartDate"]
-				lLat = location["uco-observable:mappedByLatitude"]
-				lLong = location["uco-observable:mappedByLongitude"]
-				tData.append([lLat, lLong])
-		return tData
-
-	def select_left_bar(self, index):
-		text = index.data(QtCore.Qt.ItemDataRole.DisplayRole)
-		threadId = ''
-		for i, dic in enumerate(treeData):
-			if dic['short_name'] == text:
-				print('text: ' + text + ', selected thread id: ' + str(treeData[i]['unique_id']))
-				threadId = treeData[i]['unique_id']
-				break
-		if threadId == '':
-			print('Thread id not found')
-			self.tree_cyber_item = ''
-		else:
-			self.tree_cyber_item = text
-			self.tableData = self.buildTableData(threadId)
-			#self.tableData.insert(0, self.headers)
-			print(f"self.tree_cyber_item={self.tree_cyber_item}")
-			file_type = self.tree_cyber_item.split()[0]
-			html_text = ""
-			if "chat N." in self.tree_cyber_item:
-				html_text = self.gather_all_chats()
-				self.textEdit.setHtml(html_text)
-			elif "Accounts " in self.tree_cyber_item:
-				html_text = self.gather_all_accounts()
-				self.textEdit.setHtml(html_text)
-			elif "Calendars " in self.tree_cyber_item:
-				html_text = self.gather_all_calendars()
-				self.textEdit.setHtml(html_text)
-			elif "Calls " in self.tree_cyber_item:
-				html_text = self.gather_all_calls()
-				self.textEdit.setHtml(html_text)
-			elif "CellSite " in self.tree_cyber_item:
-				html_text = self.gather_all_cellsites()
-				self.textEdit.setHtml(html_text)
-			elif "Cookies " in self.tree_cyber_item:
-				html_text = self.gather_all_cookies()
-				self.textEdit.setHtml(html_text)
-			elif "Device connection " in self.tree_cyber_item:
-				html_text = self.gather_all_device_connection()
-				self.textEdit.setHtml(html_text)
-			elif "Emails " in self.tree_cyber_item:
-				html_text = "<h3>Please, select single messages from the main panel.</br/><br/>" + \
-				"Viewing all messages will take too much time.</h3>"
-				#html_text = self.gather_all_emails()
-				self.textEdit.setHtml(html_text)
-			elif "Events " in self.tree_cyber_item:
-				html_text = self.gather_all_events()
-				self.textEdit.setHtml(html_text)
-			elif "Location device " in self.tree_cyber_item:
-				html_text = self.gather_all_locations()
-				self.textEdit.setHtml(html_text)
-			elif file_type in ("Images", "Audios", "Videos",
-					"Texts", "Archives", "Databases", "Applications", "Uncategorized"):
-					print(f"Here you are! [{self.tree_cyber_item}]")
-					if file_type == "Images":
-						html_text = "<h3>Please, select single image from the main panel.</br/><br/>" + \
-							"Viewing all images will take too much time.</h3>"
-					elif file_type == "Audios":
-						html_text = self.gather_all_files(file_type, filesAudio)
-					elif file_type == "Videos":
-						html_text = "<h3>Please, select single video from the main panel.</br/><br/>" + \
-							"Viewing all videos will take too much time.</h3>"
-					elif file_type == "Texts":
-						html_text = "<h3>Please, select single text from the main panel.</br/><br/>" + \
-							"Viewing all texts will take too much time.</h3>"
-					elif file_type == "Archives":
-						html_text = self.gather_all_files(file_type, filesArchive)
-					elif file_type == "Databases":
-						html_text = self.gather_all_files(file_type, filesDatabase)
-					elif file_type == "Applications":
-						html_text = self.gather_all_files(file_type, filesApplication)
-					elif file_type == "Uncategorized":
-						html_text = self.gather_all_files(file_type, filesUncategorized)
-					self.textEdit.setHtml(html_text)
-			elif "Social media activities" in self.tree_cyber_item:
-				html_text = self.gather_all_social_media_activities()
-				self.textEdit.setHtml(html_text)
-			elif "Web Bookmarks " in self.tree_cyber_item:
-				html_text = self.gather_all_web_bookmarks()
-				self.textEdit.setHtml(html_text)
-			elif "Web Histories " in self.tree_cyber_item:
-				html_text = self.gather_all_web_histories()
-				self.textEdit.setHtml(html_text)
-			elif "Web Search Terms " in self.tree_cyber_item:
-				html_text = self.gather_all_web_search_terms()
-				self.textEdit.setHtml(html_text)
-			elif "Wireless Net " in self.tree_cyber_item:
-				html_text = self.gather_all_wireless_nets()
-				self.textEdit.setHtml(html_text)
-
-		self.model = TableModel(self.tableData, self.headers)
-		self.table.setModel(self.model)
-
-	def select_main_panel(self, item):
-		if item.row():
-			row = int(item.row() - 1)
-			if 'Email' in self.tree_cyber_item:
-				row = emailMessages[row]
-				detail = "<strong>From</strong> " + str(row["uco-observable:from"]) + "<br/>" + \
-				"<strong>To</strong> " + str(row["uco-observable:to"]) + "<br/>" + \
-				"<strong>Cc </strong> " + str(row["uco-observable:cc"]) + "<br/>" + \
-				"<strong>Bcc </strong> " + str(row["uco-observable:bcc"]) + "<br/>" + \
-				"<strong>Subject</strong> " + str(row["uco-observable:subject"]) + "<br/>" + \
-				"<strong>Sent time</strong> " + str(row["uco-observable:sentTime"]) + "<br/>" + \
-				"<strong>Body</strong> " + str(row["uco-observable:body"]) + "<hr/>"
-				self.textEdit.setHtml('<h2>Email</h2>' + detail)
-			elif "chat N." in self.tree_cyber_item:
-				row = chatMessages[row]
-				to_participants = ""
-				for p in row["uco-observable:to"]:
-					to_participants = to_participants + p + "; "
-				detail = "<strong>From</strong> " + str(row["uco-observable:from"]) + "<br/>" + \
-				"<strong>To</strong> " + str(to_participants) + "<br/>" + \
-				"<strong>Message</strong><br/>" + row["uco-observable:messageText"] + '<hr/>'
-				self.textEdit.setHtml('<h2>Chat message</h2>' + detail)
-			elif "Accounts " in self.tree_cyber_item:
-				row = accounts[row]
-				detail = "<strong>Name</strong> " + row["uco-observable:displayName"] + "<br/>" + \
-				"<strong>Phone n.</strong> " + row["uco-observable:phoneAccount"] + "<br>" + \
-				"<strong>Identifier</strong> " + row["uco-observable:accountIdentifier"]
-				self.textEdit.setHtml('<h2>Account</h2>' + detail)
-			elif "Calendar" in self.tree_cyber_item:
-				row = calendars[row]
-				detail = "<strong>Subject</strong> " + str(row["uco-observable:subject"]) + "<br/>" + \
-				"<strong>Start</strong> " + str(row["uco-observable:startTime"]) + "<br/>" + \
-				"<strong>End</strong> " + str(row["uco-observable:endTime"]) + "<br/>" + \
-				"<strong>Recurrence</strong> " + str(row["uco-observable:recurrence"])
-				self.textEdit.setHtml('<h2>Calendar</h2>' + detail)
-			elif "Calls" in self.tree_cyber_item:
-				row = phoneCalls[row]
-				detail = "<strong>From</strong> " + str(row["uco-observable:from"]) + "<br/>" + \
-				"<strong>To</strong> " + str(row["uco-observable:to"]) + "<br/>" + \
-				"<strong>Name</strong> " + row["uco-core:name"] + "<br/>" + \
-				"<strong>Start time</strong> " + str(row["uco-observable:startTime"]) + "<br/>" + \
-				"<strong>Duration (s.)</strong> " + str(row["uco-observable:duration"])
-				self.textEdit.setHtml('<h2>Call</h2>' + detail)
-			elif "CellSite" in self.tree_cyber_item:
-				row = cell_sites[row]
-				detail = "<strong>Country code</strong> " + str(row["uco-observable:cellSiteCountryCode"]) + "<br/>" + \
-				"<strong>Identifier</strong> " + str(row["uco-observable:cellSiteIdentifier"]) + "<br/>" + \
-				"<strong>Network code</strong> " + str(row["uco-observable:cellSiteNetworkCode"]) + "<br/>" + \
-				"<strong>Location area code </strong> " + str(row["uco-observable:cellSiteLocationAreaCode"]) + "<br/>" + \
-				"<strong>Site type </strong> " + str(row["uco-observable:cellSiteType"])
-				self.textEdit.setHtml('<h2>Cell site</h2>' + detail)
-			elif "Cookies" in self.tree_cyber_item:
-				row= cookies[row]
-				detail = "<strong>Name</strong> " + str(row["uco-observable:cookieName"]) + "<br/>" + \
-				"<strong>Path</strong> " + str(row["uco-observable:cookiePath"]) + "<br/>" + \
-				"<strong>Application </strong> " + str(row["uco-observable:cookieApp"]) + "<br/>" + \
-				"<strong>Crreated time </strong> " + str(row["uco-observable:accessedTime"]) + "<br/>" + \
-				"<strong>Expiration time </strong> " + str(row["uco-observable:expirationTime"]) + "<hr/>"
-				self.textEdit.setHtml('<h2>Cookies</h2>' + detail)
-			elif "Device connection" in self.tree_cyber_item:
-				row = bluetooths[row]
-				detail = "<strong>Address</strong> " + str(row["uco-observable:addressValue"]) + "<hr/>"
-				self.textEdit.setHtml('<h2>Device connection (bluetooth)</h2>' + detail)
-			elif "Events" in self.tree_cyber_item:
-				row = events[row]
-				detail = "<strong>Type</strong> " + str(row["uco-observable:eventType"]) + "<br/>" + \
-				"<strong>Text</strong> " + str(row["uco-observable:eventText"]) + "<br/>" + \
-				"<strong>Created time</strong> " + str(row["uco-observable:observableCreatedTime"]) + "<hr/>"
-				self.textEdit.setHtml('<h2>Events</h2>' + detail)
-			elif "Images" in self.tree_cyber_item:
-				row = filesImage[row]
-				detail = self.gather_data_file(row)
-				self.textEdit.setHtml('<h2>Image</h2>' + detail)
-			elif "Audios" in self.tree_cyber_item:
-				row = filesAudio[row]
-				detail = self.gather_data_file(row)
-				self.textEdit.setHtml('<h2>Audio</h2>' + detail)
-			elif "Texts" in self.tree_cyber_item:
-				row = filesText[row]
-				detail = self.gather_data_file(row)
-				self.textEdit.setHtml('<h2>Text</h2>' + detail)
-			elif "Videos" in self.tree_cyber_item:
-				row = filesVideo[row]
-				detail = self.gather_data_file(row)
-				self.textEdit.setHtml('<h2>Video</h2>' + detail)
-			elif "Archives" in self.tree_cyber_item:
-				row = filesArchive[row]
-				detail = self.gather_data_file(row)
-				self.textEdit.setHtml('<h2>Archive</h2>' + detail)
-			elif "Databases" in self.tree_cyber_item:
-				row = filesDatabase[row]
-				detail = self.gather_data_file(row)
-				self.textEdit.setHtml('<h2>Database</h2>' + detail)
-			elif "Applications" in self.tree_cyber_item:
-				row = filesApplication[row]
-				detail = self.gather_data_file(row)
-				self.textEdit.setHtml('<h2>Application</h2>' + detail)
-			elif "Uncategorized" in self.tree_cyber_item:
-				row = filesUncategorized[row]
-				detail = self.gather_data_file(row)
-				self.textEdit.setHtml('<h2>Uncategorized</h2>' + detail)
-			elif "Location device" in self.tree_cyber_item:
-				item =relationMappedBy[row]
-				detail = "<strong>Start date</strong> " + str(item["uco-observable:mappedByStartDate"]) + "<br/>" + \
-				"<strong>Latitude</strong> " + str(item["uco-observable:mappedByLatitude"]) + "<br/>" + \
-				"<strong>Longitude</strong> " + str(item["uco-observable:mappedByLongitude"]) + "<hr/>"
-				self.textEdit.setHtml('<h2>Location device</h2>' + detail)
-			elif "Social media activities" in self.tree_cyber_item:
-				item =social_media_activities[row]
-				detail = "<strong>Body</strong> " + str(item["uco-observable:body"]) + "<br/>" + \
-				"<strong>Title</strong> " + str(item["uco-observable:pageTitle"]) + "<br/>" + \
-				"<strong>Date</strong> " + str(item["uco-observable:observableCreatedTime"]) + "<br/>"
-				"<strong>ApplicationName</strong> " + str(item["uco-observable:application"]) + "<br/>"
-				"<strong>Author ID</strong> " + str(item["drafting:authorIdentifier"]) + "<br/>"
-				"<strong>Account ID</strong> " + str(item["drafting:authorName"]) + "<br/>"
-				"<strong>Name</strong> " + str(item["uco-observable:application"]) + "<br/>"
-				"<strong>Type</strong> " + str(item["drafting:activityType"])
-				self.textEdit.setHtml('<h2>Social media activity</h2>' + detail)
-			elif "Web Bookmarks" in self.tree_cyber_item:
-				row =webBookmark[row]
-				detail = "<strong>Url</strong> " + str(row["uco-observable:urlTargeted"]) + "<br/>" + \
-				"<strong>Path</strong> " + str(row["uco-observable:bookmarkPath"]) + "<br/>" + \
-				"<strong>Application</strong> " + str(row["uco-observable:application"]) + "<br/>" + \
-				"<strong>Created time</strong> " + str(row["uco-observable:observableCreatedTime"]) + "<hr/>"
-				self.textEdit.setHtml('<h2>Web Bookmark</h2>' + detail)
-			elif "Web Histories" in self.tree_cyber_item:
-				row =webURLHistory[row]
-				detail = "<strong>Url</strong> " + str(row["uco-observable:url"]) + "<br/>" + \
-				"<strong>Title</strong> " + str(row["uco-observable:title"]) + "<br/>" + \
-				"<strong>Browser</strong> " + str(row["uco-observable:browserInformation"]) + "<br/>" + \
-				"<strong>Last visited</strong> " + str(row["uco-observable:lastVisited"]) + "<hr/>"
-				self.textEdit.setHtml('<h2>Web History</h2>' + detail)
-			elif "Web Search Terms" in self.tree_cyber_item:
-				row =webSearchTerm[row]
-				detail = "<strong>Web Search Term</strong> " + str(row["uco-observable:searchTerm"]) + "<hr/>"
-				self.textEdit.setHtml('<h2>Web Search Terms</h2>' + detail)
-			elif "Wireless Net" in self.tree_cyber_item:
-				row =wireless_net[row]
-				detail = "<strong>SSID</strong> " + str(row["uco-observable:ssid"]) + "<br/>" + \
-				"<strong>Base Station</strong> " + str(row["uco-observable:baseStation"]) + "<hr/>"
-				self.textEdit.setHtml('<h2>Wireless Network Connection</h2>' + detail)
+from .stream import get_case_objects, iter_case_objects
+from . import cache
+from . import database
+from . import export
+from . import parallel
+from .columnar import ColumnarStore, Row, Table, write_store
+from .database import SqliteStore, SqlTable
+from .interner import IdInterner
+from .profiling import Profiler, format_summary
+from .progress import ProgressMeter
+from .records import Record, Artifact, ChatMessage, SmsMessage, ChatThread, Account, \
+						EmailAddress, EmailAccount, EmailMessage, Bluetooth, CellSite, Event, \
+						SearchedItem, SocialMediaActivity, WirelessNet, Cookie, Coordinate, \
+						Application, Call, Calendar, File, URL, WebBookmark, WebHistory, \
+						WebSearchTerm, Attachment, ConnectedTo, MappedBy, clear_categories
+
+
+class CaseIngest:
+	# Processing of the observables of a case file into a session, or
+	# restoring of the processed case from the snapshot cache.  It reports its
+	# progress and checks for a cancellation through the functions given to
+	# run, so it runs the same in the GUI worker thread and in the headless
+	# modes.
+	PROGRESS_INTERVAL = 0.5
+
+	def __init__(self, f, stream, inputName='', cacheDir=None, cacheSize=cache.DEFAULT_MAX_SIZE, storage="columnar", writers=None, jobs=1):
+		self.f = f
+		self.stream = stream
+		self.inputName = inputName
+		self.cacheDir = cacheDir  # None when the snapshot cache is disabled
+		self.cacheSize = cacheSize
+		self.storage = storage  # format of the store of the processed case, see STORAGES
+		# Writers taking the place of the lists of STREAMED_TABLES while the
+		# case is processed, by table name
+		self.writers = writers or {}
+		self.jobs = jobs  # number of processes processing the objects
+		self.nObjects = 0
+		self.cancelled = False
+
+	def run(self, session, progress=lambda report: None, interrupted=lambda: False):
+		# The tables of the session are filled, progress(report) is called
+		# with a ProgressReport every PROGRESS_INTERVAL seconds, the processing
+		# stops when interrupted() is true.
+		digest = None
+		writer = None
+		suffix = cache.DATABASE_SUFFIX if self.storage == "sqlite" else cache.SNAPSHOT_SUFFIX
+		try:
+			if self.cacheDir is not None:
+				digest = cache.file_digest(self.inputName)
+				store = cache.load_snapshot(self.cacheDir, digest, suffix)
+				if store is not None:
+					self.nObjects = session.use_artifact_store(store)
+					print(C_CYAN + "Processed case restored from the cache " + str(self.cacheDir) + C_BLACK)
+					return
+			if self.storage == "sqlite":
+				# The tables of STREAMED_TABLES are written to the database as
+				# they are processed, the others by save_database.
+				writer = database.DatabaseWriter(self.database_path(digest), INDEXED_FIELDS)
+				self.writers = {name: writer.table(name) for name in STREAMED_TABLES}
+			self.process(session, progress, interrupted)
+		except Exception:
+			if writer is not None:
+				writer.close()
+				os.remove(writer.path)
+			raise
+		finally:
+			self.f.close()
+		print(C_CYAN + "\n\nEnd Observables processing!" + C_BLACK + "\n\n")
+		for objectType, hits in session.facet_hits.most_common():
+			logging.debug("%10s %s", number_with_dots(hits), objectType)
+		if writer is not None:
+			with profile_stage("save_database"):
+				self.save_database(session, writer, digest)
+		# The tables written by an export are not read back, its records are
+		# kept.
+		elif not self.writers:
+			with profile_stage("save_snapshot"):
+				store = self.save_snapshot(session, digest)
+			# From now on the artifacts are read from the snapshot, and the
+			# records built by the processing are released.
+			if store is not None:
+				session.use_artifact_store(store)
+
+	def process(self, session, progress, interrupted):
+		tables = {name: session.tables[name] for name in self.writers}
+		session.tables.update(self.writers)
+		session.fileTablesByTag.clear()
+		try:
+			# The processes read the chunks from the file, so a text
+			# stream without a file is processed here.
+			if self.jobs > 1 and file_size(self.f) > 0:
+				self.process_parallel(session, progress, interrupted)
+				return
+			if self.stream:
+				# The syntax is checked while the observables are processed.
+				json_data = profile_iterable("stream", iter_case_objects(self.f))
+				meter = ProgressMeter(file_size(self.f), self.PROGRESS_INTERVAL)
 			else:
-				self.textEdit.setHtml('<h2>Here the details of the cyber item will be displayed</h2>')
-				print("item selected is not an Email")
-
-	def gather_all_chats(self):
-		pos = self.tree_cyber_item.find('(')
-		idx = int((self.tree_cyber_item[7:pos])) - 1
-		html_text="<h2>Chat messages</h2><br/>"
-		for t in chatThreads[idx]['thread:messages']:
-			for m in chatMessages:
-				if m["@id"] == t:
-					html_text += "<strong>From</strong> " + m["uco-observable:from"] + "<br/>" + \
-					"<strong>To</strong> " + " ".join(m["uco-observable:to"]) + "<br/>" + \
-					"<strong>Application</strong> " + m["uco-observable:application"] + "<br/>" + \
-					"<strong>Message</strong><br/>" + m["uco-observable:messageText"] + "<hr/>"
-		return html_text
-
-
-	def gather_all_accounts(self):
-		html_text="<h2>Accounts data</h2><br/>"
-		for a in accounts:
-			html_text = html_text + \
-			"<strong>Identifier</strong> " + a["uco-observable:accountIdentifier"] + "<br/>" + \
-			"<strong>Phone number</strong> " + a["uco-observable:phoneAccount"] + "<br/>" + \
-			"<strong>Application</strong> " + a["uco-observable:application"] + "<br/>" + \
-			"<strong>Display name</strong> " + a["uco-observable:displayName"] + "<hr/>"
-		return html_text
-
-	def gather_all_calendars(self):
-		html_text="<h2>Calendars data</h2><br/>"
-		for c in calendars:
-			html_text = html_text + \
-			"<strong>Subject</strong> " + str(c["uco-observable:subject"]) + "<br/>" + \
-			"<strong>Start</strong> " + str(c["uco-observable:startTime"]) + "<br/>" + \
-			"<strong>End</strong> " + str(c["uco-observable:endTime"]) + "<br/>" + \
-			"<strong>Recurrence</strong> " + str(c["uco-observable:recurrence"]) + "<hr/>"
-		return html_text
-
-	def gather_all_calls(self):
-		html_text="<h2>Calls data</h2><br/>"
-		for a in phoneCalls:
-			html_text = html_text + \
-			"<strong>From</strong> " + str(a["uco-observable:from"]) + "<br/>" + \
-			"<strong>To</strong> " + str(a["uco-observable:to"]) + "<br/>" + \
-			"<strong>Name</strong> " + a["uco-core:name"] + "<br/>" + \
-			"<strong>Start time</strong> " + str(a["uco-observable:startTime"]) + "<br/>" + \
-			"<strong>Duration (s.)</strong> " + str(a["uco-observable:duration"]) + "<hr/>"
-		return html_text
-
-	def gather_all_cellsites(self):
-		html_text="<h2>Cellsites data</h2><br/>"
-		for a in cell_sites:
-			html_text = html_text + \
-			"<strong>Country code</strong> " + str(a["uco-observable:cellSiteCountryCode"]) + "<br/>" + \
-				"<strong>Identifier</strong> " + str(a["uco-observable:cellSiteIdentifier"]) + "<br/>" + \
-				"<strong>Network code</strong> " + str(a["uco-observable:cellSiteNetworkCode"]) + "<br/>" + \
-				"<strong>Location area code </strong> " + str(a["uco-observable:cellSiteLocationAreaCode"]) + "<br/>" + \
-				"<strong>Site type </strong> " + str(a["uco-observable:cellSiteType"]) + "<hr/>"
-		return html_text
-
-	def gather_all_cookies(self):
-		html_text="<h2>Cookies data</h2><br/>"
-		for item in cookies:
-			html_text = html_text + \
-			"<strong>Name</strong> " + str(item["uco-observable:cookieName"]) + "<br/>" + \
-			"<strong>Path</strong> " + str(item["uco-observable:cookiePath"]) + "<br/>" + \
-			"<strong>Application </strong> " + str(item["uco-observable:cookieApp"]) + "<br/>" + \
-			"<strong>Crreated time </strong> " + str(item["uco-observable:accessedTime"]) + "<br/>" + \
-			"<strong>Expiration time </strong> " + str(item["uco-observable:expirationTime"]) + "<hr/>"
-		return html_text
-
-	def gather_all_device_connection(self):
-		html_text="<h2>Device connection data</h2><br/>"
-		for item in bluetooths:
-			html_text = html_text + \
-			"<strong>Address</strong> " + str(item["uco-observable:addressValue"]) + "<hr/>"
-		return html_text
-
-	def gather_all_emails(self):
-		html_text="<h2>Email data</h2><br/>"
-		for item in emailMessages:
-			html_text = html_text + \
-			"<strong>From</strong> " + str(item["uco-observable:from"]) + "<br/>" + \
-			"<strong>To</strong> " + str(item["uco-observable:to"]) + "<br/>" + \
-			"<strong>Cc</strong> " + str(item["uco-observable:cc"]) + "<br/>" + \
-			"<strong>Bcc</strong> " + str(item["uco-observable:bcc"]) + "<br/>" + \
-			"<strong>Subject</strong> " + str(item["uco-observable:subject"]) + "<br/>" + \
-			"<strong>Sent time</strong> " + str(item["uco-observable:sentTime"]) + "<br/>" + \
-			"<strong>Body</strong> " + str(item["uco-observable:body"]) + "<hr/>"
-		return html_text
-
-	def gather_all_events(self):
-		html_text="<h2>Events data</h2><br/>"
-		for item in events:
-			html_text = html_text + \
-			"<strong>Tipo</strong> " + str(item["uco-observable:eventType"]) + "<br/>" + \
-			"<strong>Text</strong> " + str(item["uco-observable:eventText"]) + "<br/>" + \
-			"<strong>Created time</strong> " + str(item["uco-observable:observableCreatedTime"]) + "<hr/>"
-		return html_text
-
-	def gather_all_files(self, type, arrayFiles):
-		html_text="<h2>" + type + " data</h2><br/>"
-		for item in arrayFiles:
-			html_text = html_text + \
-			"<strong>Name</strong> " + str(item["uco-observable:fileName"]) + "<br/>" + \
-			"<strong>Path</strong> " + str(item["uco-observable:filePath"]) + "<br/>" + \
-			"<strong>Size</strong> " + str(item["uco-observable:fileSize"]) + "<hr/>"
-		return html_text
-
-	def gather_all_locations(self):
-		html_text="<h2>Location device data</h2><br/>"
-		for item in relationMappedBy:
-			html_text = html_text + \
-			"<strong>Start date</strong> " + str(item["uco-observable:mappedByStartDate"]) + "<br/>" + \
-			"<strong>Latitude</strong> " + str(item["uco-observable:mappedByLatitude"]) + "<br/>" + \
-			"<strong>Longitude</strong> " + str(item["uco-observable:mappedByLongitude"]) + "<hr/>"
-		return html_text
-
-	def gather_data_file(self, row):
-		detail = "<strong>Name</strong> " + str(row["uco-observable:fileName"]) + "<br/>" + \
-		"<strong>Path</strong> " + str(row["uco-observable:filePath"]) + "<br/>" + \
-		"<strong>Size</strong> " + str(row["uco-observable:fileSize"]) + "<hr/>"
-		return(detail)
-
-	def gather_all_social_media_activities(self):
-		html_text="<h2>Social Media Activities data</h2><br/>"
-		for item in social_media_activities:
-			html_text = html_text + \
-			"<strong>Body</strong> " + str(item["uco-observable:body"]) + "<br/>" + \
-			"<strong>Title</strong> " + str(item["uco-observable:pageTitle"]) + "<br/>" + \
-			"<strong>Date</strong> " + str(item["uco-observable:observableCreatedTime"]) + "<br/>" + \
-			"<strong>ApplicationName</strong> " + str(item["uco-observable:application"]) + "<br/>" + \
-			"<strong>Author ID</strong> " + str(item["drafting:authorIdentifier"]) + "<br/>" + \
-			"<strong>Account ID</strong> " + str(item["drafting:authorName"]) + "<br/>" + \
-			"<strong>Name</strong> " + str(item["uco-observable:application"]) + "<br/>" + \
-			"<strong>Type</strong> " + str(item["drafting:activityType"]) + "<hr/>"
-		return html_text
-
-	def gather_all_web_histories(self):
-		html_text="<h2>Web History data</h2><br/>"
-		for item in webURLHistory:
-			html_text = html_text + \
-			"<strong>Url</strong> " + str(item["uco-observable:url"]) + "<br/>" + \
-			"<strong>Title</strong> " + str(item["uco-observable:title"]) + "<br/>" + \
-			"<strong>Browser</strong> " + str(item["uco-observable:browserInformation"]) + "<br/>" + \
-			"<strong>Last visited</strong> " + str(item["uco-observable:lastVisited"]) + "<hr/>"
-		return html_text
-
-	def gather_all_web_bookmarks(self):
-		html_text="<h2>Web Bookmark data</h2><br/>"
-		for item in webBookmark:
-			html_text = html_text + \
-			"<strong>Url</strong> " + str(item["uco-observable:urlTargeted"]) + "<br/>" + \
-			"<strong>Path</strong> " + str(item["uco-observable:bookmarkPath"]) + "<br/>" + \
-			"<strong>Application</strong> " + str(item["uco-observable:application"]) + "<br/>" + \
-			"<strong>Created time</strong> " + str(item["uco-observable:observableCreatedTime"]) + "<hr/>"
-		return html_text
-
-	def gather_all_web_search_terms(self):
-		html_text="<h2>Web Search Terms data</h2><br/>"
-		for item in webSearchTerm:
-			html_text = html_text + \
-			"<strong>Search term</strong> " + str(item["uco-observable:searchTerm"]) + "<hr/>"
-		return html_text
-
-	def gather_all_wireless_nets(self) -> str:
-		html_text="<h2>Wireless Network connections</h2><br/>"
-		for item in wireless_net:
-			html_text = html_text + \
-			"<strong>SSID</strong> " + str(item["uco-observable:ssid"]) + "<br/>" + \
-			"<strong>Base station</strong> " + str(item["uco-observable:baseStation"]) + "<hr/>"
-		return html_text
-
-### global funtions
-def process_id_messages():
-	for m in chatMessages:
-		if m["uco-observable:application-id"]:
-			for a in applications:
-				if a["@id"] == m["uco-observable:application-id"]:
-					m["uco-observable:application"] = a["uco-core:name"]
-					break
-		if m["uco-observable:from-id"]:
-			for a in accounts:
-				if a["@id"] == m["uco-observable:from-id"]:
-					msg_from = a["uco-observable:phoneAccount"] + " " + \
-					a["uco-observable:accountIdentifier"] + " / " + a["uco-observable:displayName"]
-					m["uco-observable:from"] = msg_from
-					break
-
-		msg_to = []
-		if m["uco-observable:to-id"]:
-			if len(m["uco-observable:to-id"]) > 0:
-				for toId in m["uco-observable:to-id"]:
-					for a in accounts:
-						if a["@id"] == toId["@id"]:
-							msg_to.append(a["uco-observable:phoneAccount"] + " " + \
-							a["uco-observable:accountIdentifier"] + " / " + a["uco-observable:displayName"])
-							break
-				m["uco-observable:to"] = msg_to
-
-	for m in smsMessages:
-		if m["uco-observable:from-id"]:
-			for a in accounts:
-				if a["@id"] == m["uco-observable:from-id"]:
-					msg_from = a["uco-observable:phoneAccount"] + " " + \
-					a["uco-observable:accountIdentifier"] + " / " + a["uco-observable:displayName"]
-					m["uco-observable:from"] = msg_from
-					break
-		if len(m["uco-observable:to-id"]) > 0:
-			msg_to = []
-			for toId in m["uco-observable:to-id"]:
-				for a in accounts:
-					if a["@id"] == toId["@id"]:
-						msg_to.append(a["uco-observable:phoneAccount"] + " " + \
-						a["uco-observable:accountIdentifier"] + " / " + a["uco-observable:displayName"])
+				print(C_CYAN + "Load JSON structure, it might take some time, please wait ...\n")
+				with profile_stage("json.load"):
+					json_data = get_case_objects(json.load(self.f))
+				# The file has been read, the progress is counted in objects.
+				meter = ProgressMeter(len(json_data), self.PROGRESS_INTERVAL, bytes=False)
+			with profiled_processors(profiler) if profiler is not None else nullcontext():
+				for jsonObj in json_data:
+					if interrupted():
+						print(C_CYAN + "\n\nObservables processing cancelled!" + C_BLACK)
+						self.cancelled = True
 						break
-			m["uco-observable:to"] = msg_to
-
-def process_id_cookies():
-	for c in cookies:
-		if c["uco-observable:cookieAppId"]:
-			for a in applications:
-				if a["@id"] == c["uco-observable:cookieAppId"]:
-					c["uco-observable:cookieApp"] = a["uco-core:name"]
+					self.nObjects +=1
+					process_object(session, jsonObj)
+					if meter.due():
+						self.report(session, meter, progress, file_position(self.f) if self.stream else self.nObjects)
+			self.report(session, meter, progress, file_position(self.f) if self.stream else self.nObjects)
+			# The references are resolved on what has been loaded, even when cancelled.
+			process_references(session)
+			if profiler is not None:
+				# All the records of the case are in memory.
+				profiler.snapshot()
+		finally:
+			session.tables.update(tables)
+			session.fileTablesByTag.clear()
+
+	def process_parallel(self, session, progress, interrupted):
+		# The objects are processed by chunks in the processes, and the records
+		# of each chunk are merged in the order of the file.
+		print(C_CYAN + "Processing the observables with " + str(self.jobs) + " processes, please wait ...\n")
+		meter = ProgressMeter(file_size(self.f), self.PROGRESS_INTERVAL)
+		position = 0
+		# The processes do not inherit the profiler of this process.
+		function = functools.partial(process_chunk, profile=profiler is not None)
+		with closing(parallel.imap_file(self.f.name, function, self.jobs)) as chunks:
+			for position, chunk in profile_iterable("chunks", chunks):
+				if interrupted():
+					print(C_CYAN + "\n\nObservables processing cancelled!" + C_BLACK)
+					self.cancelled = True
 					break
+				self.nObjects += merge_chunk(session, chunk)
+				if meter.due():
+					self.report(session, meter, progress, position)
+		self.report(session, meter, progress, position)
+		process_references(session)
+		if profiler is not None:
+			profiler.snapshot()
+
+	def report(self, session, meter, progress, position):
+		report = meter.report(self.nObjects, position, session.facet_hits)
+		# The line is cleared to its end, as it overwrites the previous one.
+		print(C_GREEN + " " + str(report) + C_CLEAR_LINE + C_BLACK, end='\r')
+		progress(report)
+
+	def save_snapshot(self, session, digest):
+		"""
+		This method writes the columnar snapshot of the processed case to the cache and opens it.  A snapshot left out of the cache (no cache, a cancelled processing, a failure of the cache) is written to a temporary file instead, removed on exit, so that the records are released all the same.
+
+		>>> from contextlib import redirect_stdout
+		>>> case = {"@graph": [{"@id": "kb:event-1", "uco-core:hasFacet": [{"@type": "uco-observable:EventRecordFacet",
+		...     "uco-observable:eventType": "Boot"}]}]}
+		>>> path = Path(tempfile.mkdtemp()) / "case.json"
+		>>> _ = path.write_text(json.dumps(case))
+		>>> session = CaseSession()
+		>>> with redirect_stdout(io.StringIO()):
+		...     nObjects = session.load(path)
+		>>> nObjects, [e.eventType for e in session.table("events")], type(session.artifactStore).__name__
+		(1, ['Boot'], 'ColumnarStore')
+		>>> session.close()
+		"""
+		tables = dict(session.tables, **{IRI_TABLE: session.idInterner.rows()})
+		meta = {"nObjects": self.nObjects, "facet_hits": session.facet_hits}
+		# A cancelled processing is partial, so it is not cached.
+		if digest is not None and not self.cancelled:
+			try:
+				cache.save_snapshot(self.cacheDir, digest, tables, meta, self.cacheSize)
+				store = cache.load_snapshot(self.cacheDir, digest)
+				if store is not None:
+					return store
+			except Exception as e:
+				print(C_RED + "ERROR: in saving the processed case to the cache " + str(self.cacheDir) + C_BLACK)
+				print (e)
+		fd, path = tempfile.mkstemp(suffix=cache.SNAPSHOT_SUFFIX)
+		atexit.register(Path(path).unlink, missing_ok=True)
+		try:
+			with os.fdopen(fd, "wb") as fp:
+				write_store(fp, tables, meta)
+			return ColumnarStore(path)
+		except Exception as e:
+			print(C_RED + "ERROR: in writing the processed case to the snapshot " + path + C_BLACK)
+			print (e)
+			return None
+
+	def database_path(self, digest):
+		# The database is written next to the snapshots, and moved among them
+		# once complete; without the cache, it is a temporary file.
+		if digest is not None:
+			self.cacheDir.mkdir(parents=True, exist_ok=True)
+			return cache.temporary_path(cache.snapshot_path(self.cacheDir, digest, cache.DATABASE_SUFFIX))
+		fd, path = tempfile.mkstemp(suffix=cache.DATABASE_SUFFIX)
+		os.close(fd)
+		os.remove(path)
+		atexit.register(lambda: Path(path).unlink(missing_ok=True))
+		return path
+
+	def save_database(self, session, writer, digest):
+		"""
+		This method writes the tables not written while the case was processed, now that their references are resolved, then the store of the database replaces the lists.  The tables of STREAMED_TABLES are only in the database, so it is opened even when the cache cannot keep it.
+
+		>>> from contextlib import redirect_stdout
+		>>> case = {"@graph": [{"@id": "kb:event-1", "uco-core:hasFacet": [{"@type": "uco-observable:EventRecordFacet",
+		...     "uco-observable:eventType": "Boot"}]}]}
+		>>> path = Path(tempfile.mkdtemp()) / "case.json"
+		>>> _ = path.write_text(json.dumps(case))
+		>>> session = CaseSession(cacheDir=path.parent / "cache", cacheSize=0, storage="sqlite")
+		>>> with redirect_stdout(io.StringIO()):
+		...     nObjects = session.load(path)
+		>>> nObjects, [e.eventType for e in session.table("events")]
+		(1, ['Boot'])
+		>>> session.close()
+		"""
+		try:
+			for name, records in session.tables.items():
+				if name not in self.writers:
+					writer.table(name).extend(records)
+			writer.table(IRI_TABLE).extend(session.idInterner.rows())
+			writer.close({"nObjects": self.nObjects, "facet_hits": session.facet_hits})
+		except Exception as e:
+			print(C_RED + "ERROR: in writing the processed case to the database " + writer.path + C_BLACK)
+			print (e)
+			return
+		path = Path(writer.path)
+		# A cancelled processing is partial, so it is not cached.
+		if digest is not None and not self.cancelled:
+			try:
+				path = cache.add_snapshot(self.cacheDir, digest, path, cache.DATABASE_SUFFIX, self.cacheSize)
+			except Exception as e:
+				print(C_RED + "ERROR: in saving the database to the cache " + str(self.cacheDir) + C_BLACK)
+				print (e)
+				# The database may have been moved before the failure.
+				if not path.exists():
+					path = cache.snapshot_path(self.cacheDir, digest, cache.DATABASE_SUFFIX)
+		if digest is not None and path == Path(writer.path):
+			# Left out of the cache, the database is removed on exit.
+			atexit.register(path.unlink, missing_ok=True)
+		try:
+			store = database.SqliteStore(str(path))
+		except Exception as e:
+			print(C_RED + "ERROR: in opening the database " + str(path) + C_BLACK)
+			print (e)
+			return
+		session.use_artifact_store(store)
+
+class CaseSession:
+	# A processed case: its artifact tables, the indexes of its records and the
+	# store they are read from.  The processing functions are given the
+	# session they fill, and its records are read through it, so several
+	# cases can be loaded in the same process, one after the other or from
+	# different threads, each released by close.  The tables are read as
+	# attributes too, e.g. session.chatMessages.
+
+	# Sessions whose records code their categorical values in the
+	# dictionaries of the record classes, emptied once all are closed.
+	_coding: "weakref.WeakSet[CaseSession]" = weakref.WeakSet()
+
+	def __init__(self, cacheDir=None, cacheSize=cache.DEFAULT_MAX_SIZE, storage="columnar", jobs=1):
+		self.cacheDir = cacheDir  # None when the snapshot cache is disabled
+		self.cacheSize = cacheSize
+		self.storage = storage  # format of the store of the processed case, see STORAGES
+		self.jobs = jobs  # number of processes processing the case files
+		self.tables: dict[str, Sequence[Union[Record, Row]]] = {name: [] for name in ARTIFACT_TABLES}
+		self.idInterner = IdInterner()
+		self.idIndex: dict[str, dict[int, Artifact]] = {}
+		self.pendingReferences: list[tuple[Record, str, str, int, Callable[[Any], str]]] = []
+		self.fileTablesByTag: dict[int, list[list[File]]] = {}
+		self.facet_hits: Counter[str] = Counter()
+		self.treeData: list[dict[str, str]] = []
+		self.artifactStore: Optional[Union[ColumnarStore, SqliteStore]] = None
+		# Facet kinds processed for each account of a chunk of a parallel
+		# processing (see merge_chunk), by key of the account.
+		self.accountKinds: Optional[dict[int, list[str]]] = None
+		self.nObjects = 0
+
+	def __getattr__(self, name: str) -> Any:
+		# The tables, by the attribute of their name
+		try:
+			return self.__dict__["tables"][name]
+		except KeyError:
+			raise AttributeError(name) from None
+
+	def ingest(self, f, stream=False, inputName='') -> CaseIngest:
+		# The processing of a case file into the session, started by run.
+		return CaseIngest(f, stream, inputName, self.cacheDir, self.cacheSize, self.storage, jobs=self.jobs)
+
+	def run(self, ingest: CaseIngest, progress=lambda nObjects: None, interrupted=lambda: False) -> int:
+		# The tables of the session are filled by the processing, or replaced
+		# by those of the store it ends with.
+		CaseSession._coding.add(self)
+		try:
+			with profile_stage("ingest"):
+				ingest.run(self, progress, interrupted)
+		finally:
+			self.nObjects = ingest.nObjects
+		return self.nObjects
+
+	def load(self, inputName, stream=False) -> int:
+		"""
+		This method processes the case file, or restores it from the snapshot cache, and returns the number of its objects.
+		"""
+		self.run(self.ingest(codecs.open(inputName, 'r', encoding='utf-8'), stream, str(inputName)))
+		build_tree_data(self)
+		return self.nObjects
+
+	def table(self, name: str) -> Sequence[Union[Record, Row]]:
+		return self.tables[name]
+
+	def counts(self) -> dict[str, int]:
+		# The number of records of each table
+		return {name: len(records) for name, records in self.tables.items()}
+
+	def select(self, name: str, **values) -> Sequence[Union[Record, Row]]:
+		"""
+		This method returns the records of the table whose fields have the given values, e.g. select("events", eventType="Boot").  The records are tested on a categorical field by the code of its value, looked up once (see Record.where), and the rows of a columnar store by their heap entries (see Table.select).  The rows of a database are selected by an SQL query using the indexes of INDEXED_FIELDS, and read by pages as they are accessed.
+
+		>>> from contextlib import redirect_stdout
+		>>> case = {"@graph": [{"@id": "kb:event-%d" % n, "uco-core:hasFacet": [{"@type": "uco-observable:EventRecordFacet",
+		...     "uco-observable:eventType": t}]} for n, t in enumerate(["Boot", "Shutdown", "Boot"])]}
+		>>> path = Path(tempfile.mkdtemp()) / "case.json"
+		>>> _ = path.write_text(json.dumps(case))
+		>>> session = CaseSession(cacheDir=path.parent / "cache", storage="sqlite")
+		>>> with redirect_stdout(io.StringIO()):
+		...     _ = session.load(path)
+		>>> boots = session.select("events", eventType="Boot")
+		>>> type(boots).__name__, [session.iri(e.id) for e in boots]
+		('SqlTable', ['kb:event-0', 'kb:event-2'])
+		>>> [session.iri(e.id) for e in session.query("events", offset=1, limit=1, eventType="Boot")]
+		['kb:event-2']
+		>>> session.distinct("events", "eventType")
+		['Boot', 'Shutdown']
+		>>> session.close()
+		>>> columnar = CaseSession()
+		>>> with redirect_stdout(io.StringIO()):
+		...     _ = columnar.run(columnar.ingest(io.StringIO(json.dumps(case))))
+		>>> boots = columnar.select("events", eventType="Boot")
+		>>> type(boots).__name__, [columnar.iri(e.id) for e in boots], len(columnar.select("events", eventType="Reboot"))
+		('Selection', ['kb:event-0', 'kb:event-2'], 0)
+		>>> columnar.close()
+		>>> memory = CaseSession()
+		>>> for jsonObj in case["@graph"]:
+		...     process_object(memory, jsonObj)
+		>>> [memory.iri(e.id) for e in memory.select("events", eventType="Boot")], memory.select("events", eventType="Reboot")
+		(['kb:event-0', 'kb:event-2'], [])
+		>>> memory.distinct("events", "eventType")
+		['Boot', 'Shutdown']
+		>>> memory.close()
+		"""
+		table = self.tables[name]
+		if isinstance(table, (SqlTable, Table)):
+			return table.select(values)
+		return list(filter(ARTIFACT_TABLES[name].where(values), cast(list[Record], table)))
+
+	def distinct(self, name: str, attribute: str) -> list[str]:
+		"""
+		This method returns the values of a categorical field of the table, without repetitions, in order of appearance, e.g. to choose the value the records are selected by.  The records are grouped by the code of their value.
+		"""
+		table = self.tables[name]
+		if isinstance(table, (SqlTable, Table)):
+			return table.distinct(attribute)
+		categories = ARTIFACT_TABLES[name].categories(attribute)
+		return [categories.value(code) for code in dict.fromkeys(record.code(attribute) for record in cast(list[Record], table))]
+
+	def query(self, name: str, offset=0, limit=None, **values) -> list[Union[Record, Row]]:
+		"""
+		This method returns the records of the table whose fields have the given values, e.g. query("chatMessages", application="WhatsApp"), skipping the first offset matches and returning at most limit.  On a database, the page is read by an SQL query with LIMIT and OFFSET (see select).
+		"""
+		table = self.tables[name]
+		if isinstance(table, (SqlTable, Table)):
+			return list(table.select(values)[offset:None if limit is None else offset + limit])
+		matches = filter(ARTIFACT_TABLES[name].where(values), cast(list[Record], table))
+		return list(islice(matches, offset, None if limit is None else offset + limit))
+
+	def lookup(self, kind: str, id: int) -> Optional[Union[Record, Row]]:
+		# The record of the table kind with the integer key id
+		if self.artifactStore is not None:
+			return self.artifactStore.lookup(kind, id)
+		return self.idIndex.get(kind, {}).get(id)
+
+	def iri(self, id: int) -> str:
+		# The @id of an integer key, for display and export
+		if self.artifactStore is not None:
+			return self.artifactStore.table(IRI_TABLE)[id - 1].iri
+		return self.idInterner.iri(id)
+
+	def thread_messages(self, thread: Union[ChatThread, Row]) -> list[Union[Record, Row]]:
+		# The chat messages of a thread, in the order of the thread
+		messages = []
+		for idMsg in thread.messages:
+			m = self.lookup("chatMessages", idMsg)
+			if m is not None:
+				messages.append(m)
+		return messages
+
+	def use_artifact_store(self, store: Union[ColumnarStore, SqliteStore]) -> int:
+		# The artifact lists are replaced by the tables of the store, whose
+		# rows are read from the file on access; the lookups by @id and the
+		# IRIs go to the store as well.  It returns the number of objects of
+		# the case.
+		with profile_stage("use_artifact_store"):
+			self.artifactStore = store
+			for name in self.tables:
+				self.tables[name] = store.table(name)
+			self.idIndex.clear()
+			self.idInterner.clear()
+			self.fileTablesByTag.clear()
+			self.facet_hits.clear()
+			self.facet_hits.update(store.meta["facet_hits"])
+			return store.meta["nObjects"]
+
+	def close(self) -> None:
+		"""
+		This method releases the records and closes the store of the session, which is left empty.  The dictionaries of the categorical values are emptied with the last session holding records.
+
+		>>> from contextlib import redirect_stdout
+		>>> def events(*types):
+		...     return json.dumps({"@graph": [{"@id": "kb:event-%d" % n, "uco-core:hasFacet": [{"@type": "uco-observable:EventRecordFacet",
+		...         "uco-observable:eventType": t}]} for n, t in enumerate(types)]})
+		>>> first, second = CaseSession(), CaseSession()
+		>>> with redirect_stdout(io.StringIO()):
+		...     _ = first.run(first.ingest(io.StringIO(events("Boot", "Shutdown"))))
+		...     _ = second.run(second.ingest(io.StringIO(events("Reboot"))))
+		>>> first.close()
+		>>> [e.eventType for e in second.table("events")], Event.categories("eventType").values()
+		(['Reboot'], ['Boot', 'Shutdown', 'Reboot'])
+		>>> second.close()
+		>>> Event.categories("eventType").values()
+		[]
+		"""
+		if self.artifactStore is not None:
+			self.artifactStore.close()
+			self.artifactStore = None
+		for name in self.tables:
+			self.tables[name] = []
+		self.idInterner.clear()
+		self.idIndex.clear()
+		self.pendingReferences.clear()
+		self.fileTablesByTag.clear()
+		self.facet_hits.clear()
+		self.treeData.clear()
+		self.nObjects = 0
+		# The codes of the categorical values are shared with the other
+		# sessions holding records, and released with the last of them.
+		CaseSession._coding.discard(self)
+		if not CaseSession._coding:
+			clear_categories()
 
-def process_id_email_accounts():
-	for e in emailAccounts:
-		for a in emailAddresses:
-			if a["@id"] == e["uco-observable:addressId"]:
-				e["uco-observable:addressValue"] = a["uco-observable:addressValue"]
-				break
-
-def process_id_email_messages():
-	for m in emailMessages:
-		for e in emailAccounts:
-			if e["@id"] == m["uco-observable:fromId"]:
-				m["uco-observable:from"] = e["uco-observable:addressValue"]
-				break
-
-		if len(m["uco-observable:toId"]) > 0:
-			emailToId = m["uco-observable:toId"][0]["@id"]
-			for e in emailAccounts:
-				if e["@id"] == emailToId:
-					m["uco-observable:to"] = e["uco-observable:addressValue"]
-
-		if len(m["uco-observable:ccId"]) > 0:
-			emailCcId = m["uco-observable:ccId"][0]["@id"]
-			for e in emailAccounts:
-				if e["@id"] == emailCcId:
-					m["uco-observable:cc"] = e["uco-observable:addressValue"]
-					break
-		if len(m["uco-observable:bccId"]) > 0:
-			emailBccId = m["uco-observable:bccId"][0]["@id"]
-			for e in emailAccounts:
-				if e["@id"] == emailBccId:
-					m["uco-observable:bcc"] = e["uco-observable:addressValue"]
-					break
+### global funtions
 
-def process_attachments():
-	for item in chatMessages:
-		# print(f"in process_attachments, chatMessages, item={item}")
-		for attachment in relationAttachmentsTo:
-			if item["@id"] == attachment["uco-observable:attachmentTarget"]:
-				fileAttached = ''
-				for f in filesImage:
-					if f["@id"] == attachment["uco-observable:attachmentSource"]:
-						fileAttached += f["uco-observable:fileName"] + ';'
-						break
-				for f in filesVideo:
-					if f["@id"] == attachment["uco-observable:attachmentSource"]:
-						fileAttached += f["uco-observable:fileName"] + ';'
-						break
-				for f in filesAudio:
-					if f["@id"] == attachment["uco-observable:attachmentSource"]:
-						fileAttached += f["uco-observable:fileName"] + ';'
-						break
-				item["uco-observable:attachedFiles"] = fileAttached
+# Profile of the processing, with --profile
+profiler: Optional[Profiler] = None
+
+def profiled(function):
+	# The calls of the function are a stage of the profile, when profiling.
+	@functools.wraps(function)
+	def timed(*args, **kwargs):
+		if profiler is None:
+			return function(*args, **kwargs)
+		with profiler.stage(function.__name__):
+			return function(*args, **kwargs)
+	return timed
+
+def profile_stage(name: str):
+	# The context of a stage of the profile, when profiling
+	return profiler.stage(name) if profiler is not None else nullcontext()
+
+def profile_iterable(name: str, iterable):
+	# The making of each item is timed as a stage of the profile, when profiling.
+	return profiler.iterate(name, iterable) if profiler is not None else iterable
+
+@contextmanager
+def profiled_processors(profiler: Profiler):
+	# The processors of the facets and of the relationships are timed by the
+	# profiler, each as a stage of its own, while in the context.
+	saved = dict(FACET_PROCESSORS), dict(RELATIONSHIP_PROCESSORS)
+	for processors in (FACET_PROCESSORS, RELATIONSHIP_PROCESSORS):
+		for name, processor in processors.items():
+			processors[name] = profiler.wrap(name, processor)
+	try:
+		yield
+	finally:
+		FACET_PROCESSORS.update(saved[0])
+		RELATIONSHIP_PROCESSORS.update(saved[1])
 
-def processRelationAttachments(jsonObj):
-	id_attachment_source = jsonObj["uco-core:source"]["@id"]
-	id_attachment_target = jsonObj["uco-core:target"]["@id"]
+def file_size(f) -> int:
+	# The size of the file read by f, 0 if unknown
+	try:
+		return os.fstat(f.fileno()).st_size
+	except (AttributeError, OSError, ValueError):
+		return 0
+
+def file_position(f) -> int:
+	# The number of bytes read from the file by f, 0 if unknown; the binary
+	# file under the text reader tells its position without decoding.
+	binary = getattr(f, "stream", None) or getattr(f, "buffer", None)
+	try:
+		return binary.tell() if binary is not None else 0
+	except (OSError, ValueError):
+		return 0
+
+def process_chunk(objects: list[dict], profile: bool = False) -> tuple:
+	# The objects of a chunk are processed in a process of the pool of
+	# CaseIngest, into a session of their own with keys of their own;
+	# merge_chunk merges the records of the chunk into the case.
+	chunk = CaseSession()
+	chunk.accountKinds = {}
+	# The processors are profiled by the chunk, whose profile is added to the
+	# profile of the case by merge_chunk.
+	chunkProfiler = Profiler(memory=False) if profile else None
+	with profiled_processors(chunkProfiler) if chunkProfiler is not None else nullcontext():
+		for jsonObj in objects:
+			process_object(chunk, jsonObj)
+	return (chunk.tables, chunk.idInterner.iris(), chunk.idIndex, chunk.pendingReferences,
+		chunk.accountKinds, chunk.facet_hits, chunkProfiler and chunkProfiler.stats(), len(objects))
+
+@profiled
+def merge_chunk(session: CaseSession, chunk: tuple) -> int:
+	# The records of a chunk are appended to the tables of the session, their
+	# keys mapped to the keys of the case, as if the objects of the chunk were
+	# processed here; it returns the number of objects of the chunk.
+	tables, iris, index, pending, kinds, hits, stats, nObjects = chunk
+	keys = session.idInterner.merge(iris)
+	remapped = set()
+	for records in tables.values():
+		for record in records:
+			# The same file record is in several tables.
+			if id(record) in remapped:
+				continue
+			remapped.add(id(record))
+			for attribute in record.REFERENCES:
+				value = getattr(record, attribute)
+				setattr(record, attribute, keys[value] if isinstance(value, int) else type(value)(keys[key] for key in value))
+	# The facets of an account met in a previous chunk update its record,
+	# instead of making a new one (see processAccount).
+	merged = {}
+	accountIndex = session.idIndex.get("accounts", {})
+	for key, account in index.get("accounts", {}).items():
+		existing = accountIndex.get(account.id)
+		if existing is not None:
+			for kind in kinds.get(key, ()):
+				for attribute in ACCOUNT_FACET_FIELDS[kind]:
+					setattr(existing, attribute, getattr(account, attribute))
+			merged[id(account)] = existing
+	for name, records in tables.items():
+		if merged and name == "accounts":
+			records = [r for r in records if id(r) not in merged]
+		cast(list[Record], session.tables[name]).extend(records)
+	for kind, records in index.items():
+		kindIndex = session.idIndex.setdefault(kind, {})
+		for record in records.values():
+			kindIndex.setdefault(record.id, record)
+	for record, field, kind, key, render in pending:
+		session.pendingReferences.append((merged.get(id(record), record), field, kind, keys[key], render))
+	session.facet_hits.update(hits)
+	if profiler is not None and stats:
+		profiler.add(stats)
+	return nObjects
+
+def export_case(f, stream: bool, directory: Path, format: str, jobs: int = 1) -> dict[str, int]:
+	# Headless processing: the artifact tables are written to the directory
+	# in the given format instead of being shown.  The tables of
+	# STREAMED_TABLES are written while the case is processed, the others
+	# once the references are resolved.
+	directory.mkdir(parents=True, exist_ok=True)
+	session = CaseSession()
+	writers = {name: export.TableWriter(directory, name, format, session.iri) for name in STREAMED_TABLES}
 	try:
-		relationAttachmentsTo.append(
-			{
-				"uco-observable:attachmentSource":id_attachment_source,
-				"uco-observable:attachmentTarget":id_attachment_target
-			})
+		session.run(CaseIngest(f, stream, writers=writers, jobs=jobs))
+		# The tables hold the records just processed, not the rows of a store.
+		rows = export.export_tables(directory,
+			{name: cast(list[Record], records) for name, records in session.tables.items() if name not in writers},
+			format, session.iri)
+	finally:
+		for writer in writers.values():
+			writer.close()
+		session.close()
+	rows.update((name, writer.rows) for name, writer in writers.items())
+	return rows
+
+def index_record(session: CaseSession, kind: str, record: Artifact) -> None:
+	# The first record wins, as the resolvers used to stop at the first match.
+	session.idIndex.setdefault(kind, {}).setdefault(record.id, record)
+
+def account_label(a: Account) -> str:
+	return a.phoneAccount + " " + \
+		a.accountIdentifier + " / " + a.displayName
+
+def account_phone_label(a: Account) -> str:
+	return a.phoneAccount + " / " + a.accountIdentifier
+
+def application_name(a: Application) -> str:
+	return a.name
+
+def url_value(u: URL) -> str:
+	return u.url
+
+def coordinate_latitude(c: Coordinate) -> str:
+	return c.latitude
+
+def coordinate_longitude(c: Coordinate) -> str:
+	return c.longitude
+
+def defer_reference(session: CaseSession, record: Record, field: str, kind: str, id: int,
+		render: Callable[[Any], str]) -> None:
+	# The referenced object may come later in the file: record.<field> is set
+	# to render(<record of the list kind with this @id>) by
+	# resolve_deferred_references, once all the objects have been processed.
+	session.pendingReferences.append((record, field, kind, id, render))
+
+@profiled
+def resolve_deferred_references(session: CaseSession) -> None:
+	for record, field, kind, id, render in session.pendingReferences:
+		target = session.lookup(kind, id)
+		if target is not None:
+			setattr(record, field, render(target))
+	session.pendingReferences.clear()
+
+@profiled
+def process_references(session):
+	resolve_deferred_references(session)
+	process_id_messages(session)
+	process_id_cookies(session)
+	process_id_email_accounts(session)
+	process_id_email_messages(session)
+	process_attachments(session)
+
+@profiled
+def process_id_messages(session):
+	for m in session.chatMessages:
+		if m.applicationId:
+			a = session.lookup("applications", m.applicationId)
+			if a is not None:
+				m.application = a.name
+		if m.fromId:
+			a = session.lookup("accounts", m.fromId)
+			if a is not None:
+				m.from_ = account_label(a)
+
+		msg_to = []
+		if m.toId:
+			if len(m.toId) > 0:
+				for toId in m.toId:
+					a = session.lookup("accounts", toId)
+					if a is not None:
+						msg_to.append(account_label(a))
+				m.to = msg_to
+
+	for m in session.smsMessages:
+		if m.fromId:
+			a = session.lookup("accounts", m.fromId)
+			if a is not None:
+				m.from_ = account_label(a)
+		if len(m.toId) > 0:
+			msg_to = []
+			for toId in m.toId:
+				a = session.lookup("accounts", toId)
+				if a is not None:
+					msg_to.append(account_label(a))
+			m.to = msg_to
+
+@profiled
+def process_id_cookies(session):
+	for c in session.cookies:
+		if c.cookieAppId:
+			a = session.lookup("applications", c.cookieAppId)
+			if a is not None:
+				c.cookieApp = a.name
+
+@profiled
+def process_id_email_accounts(session):
+	for e in session.emailAccounts:
+		a = session.lookup("emailAddresses", e.addressId)
+		if a is not None:
+			e.addressValue = a.addressValue
+
+@profiled
+def process_id_email_messages(session):
+	"""
+	This method sets the addresses of the senders and of the first recipients of the e-mail messages, from their accounts. A message without sender, or without recipients, keeps them empty.
+
+	>>> case = {"@graph": [{"@id": "kb:message-1", "uco-core:hasFacet": [{"@type": "uco-observable:EmailMessageFacet",
+	...     "uco-observable:to": [{"@id": "kb:account-1"}], "uco-observable:subject": "No sender"}]},
+	...     {"@id": "kb:account-1", "uco-core:hasFacet": [{"@type": "uco-observable:EmailAccountFacet",
+	...     "uco-observable:emailAddress": {"@id": "kb:address-1"}}]},
+	...     {"@id": "kb:address-1", "uco-core:hasFacet": [{"@type": "uco-observable:EmailAddressFacet",
+	...     "uco-observable:addressValue": "bob@example.org"}]}]}
+	>>> session = CaseSession(cacheDir=None)
+	>>> from contextlib import redirect_stdout
+	>>> with redirect_stdout(io.StringIO()):
+	...     nObjects = session.run(session.ingest(io.StringIO(json.dumps(case))))
+	>>> nObjects
+	3
+	>>> [(m.fromId, m.from_, m.to, m.subject) for m in session.table("emailMessages")]
+	[(0, '', 'bob@example.org', 'No sender')]
+	>>> session.close()
+	"""
+	for m in session.emailMessages:
+		if m.fromId:
+			e = session.lookup("emailAccounts", m.fromId)
+			if e is not None:
+				m.from_ = e.addressValue
+
+		if len(m.toId) > 0:
+			e = session.lookup("emailAccounts", m.toId[0])
+			if e is not None:
+				m.to = e.addressValue
+
+		if len(m.ccId) > 0:
+			e = session.lookup("emailAccounts", m.ccId[0])
+			if e is not None:
+				m.cc = e.addressValue
+		if len(m.bccId) > 0:
+			e = session.lookup("emailAccounts", m.bccId[0])
+			if e is not None:
+				m.bcc = e.addressValue
+
+@profiled
+def process_attachments(session):
+	# Sources of the Attached_To relationships, grouped by target.
+	attachmentSources: dict[int, list[int]] = {}
+	for attachment in session.relationAttachmentsTo:
+		attachmentSources.setdefault(attachment.attachmentTarget, []).append(
+			attachment.attachmentSource)
+	for item in session.chatMessages:
+		sources = attachmentSources.get(item.id)
+		if sources is None:
+			continue
+		fileAttached = ''
+		for source in sources:
+			f = session.lookup("files", source)
+			if f is not None:
+				fileAttached += f.fileName + ';'
+		item.attachedFiles = fileAttached
+
+def processRelationAttachments(session, jsonObj):
+	id_attachment_source = session.idInterner.intern(jsonObj["uco-core:source"]["@id"])
+	id_attachment_target = session.idInterner.intern(jsonObj["uco-core:target"]["@id"])
+	try:
+		session.relationAttachmentsTo.append(
+			Attachment(
+				attachmentSource=id_attachment_source,
+				attachmentTarget=id_attachment_target
+			))
 	except Exception as e:
 		print("ERROR: in appending dictionary to chatMessages")
 		print (e)
 
-def processRelationConnectedTo(jsonObj):
-	id_connected_source = jsonObj["uco-core:source"]["@id"]
-	id_connected_target = jsonObj["uco-core:target"]["@id"]
+def processRelationConnectedTo(session, jsonObj):
+	id_connected_source = session.idInterner.intern(jsonObj["uco-core:source"]["@id"])
+	id_connected_target = session.idInterner.intern(jsonObj["uco-core:target"]["@id"])
 
 	startTime = get_optional_dict_attribute(jsonObj, "uco-observable:startTime", {})
 	if startTime:
@@ -1025,46 +797,48 @@ def processRelationConnectedTo(jsonObj):
 		endTime = jsonObj["uco-observable:endTime"]["@value"]
 
 	try:
-		relationConnectedTo.append(
-			{
-				"uco-core:source":id_connected_source,
-				"uco-core:target":id_connected_target,
-				"uco-observable:startTime": startTime,
-				"uco-observable:endTime": endTime
-			})
+		session.relationConnectedTo.append(
+			ConnectedTo(
+				source=id_connected_source,
+				target=id_connected_target,
+				startTime=startTime,
+				endTime=endTime
+			))
 	except Exception as e:
 		print("ERROR: in appending dictionary to chatMessages")
 		print (e)
 
-def processRelationMappedBy(jsonObj):
-	id_mapped_by_target = jsonObj["uco-core:target"]["@id"]
+def processRelationMappedBy(session, jsonObj):
+	id_mapped_by_target = session.idInterner.intern(jsonObj["uco-core:target"]["@id"])
 	latitude_mapped_by = ''
 	longitude_mapped_by = ''
-	for c in geo_coordinates:
-		if c["@id"] == id_mapped_by_target:
-			latitude_mapped_by = c["uco-location:latitude"]
-			longitude_mapped_by = c["uco-location:longitude"]
-			break
 	start_date = get_optional_dict_attribute(jsonObj, "uco-observable:startTime", {})
 	if start_date:
 		start_date = jsonObj["uco-observable:startTime"]["@value"]
 	try:
-		relationMappedBy.append(
-			{
-				"uco-observable:mappedByLatitude":latitude_mapped_by,
-				"uco-observable:mappedByLongitude":longitude_mapped_by,
-				"uco-observable:mappedByStartDate":start_date
+		session.relationMappedBy.append(
+			MappedBy(
+				mappedByLatitude=latitude_mapped_by,
+				mappedByLongitude=longitude_mapped_by,
+				mappedByStartDate=start_date
 				#"not-in-ontology:locationType":category
-			})
+			))
+		# The coordinates may come later in the file.
+		defer_reference(session, session.relationMappedBy[-1], "mappedByLatitude", "geo_coordinates",
+			id_mapped_by_target, coordinate_latitude)
+		defer_reference(session, session.relationMappedBy[-1], "mappedByLongitude", "geo_coordinates",
+			id_mapped_by_target, coordinate_longitude)
 	except Exception as e:
 		print("ERROR: in appending dictionary to Relation Mapped_By")
 		print (e)
 
-def processMessage(uuid_object=None, facet=None):
+def processMessage(session, uuid_object=None, facet=None):
 	msg_text = get_optional_string_attribute(facet, "uco-observable:messageText", '')
 	msg_app_id = get_optional_dict_attribute(facet, "uco-observable:application", {})
 	if msg_app_id:
-		msg_app_id = facet["uco-observable:application"]["@id"]
+		msg_app_id = session.idInterner.intern(facet["uco-observable:application"]["@id"])
+	else:
+		msg_app_id = 0
 
 	msg_sent_time = get_optional_dict_attribute(facet, "uco-observable:sentTime", {})
 	if msg_sent_time:
@@ -1072,53 +846,54 @@ def processMessage(uuid_object=None, facet=None):
 
 	msg_from_id = get_optional_dict_attribute(facet, "uco-observable:from", {})
 	if msg_from_id:
-		msg_from_id = facet["uco-observable:from"]["@id"]
+		msg_from_id = session.idInterner.intern(facet["uco-observable:from"]["@id"])
+	else:
+		msg_from_id = 0
 
 	msg_to_id = get_optional_list_attribute(facet, "uco-observable:to", [])
 	if msg_to_id:
-		msg_to_id = facet["uco-observable:to"]
+		msg_to_id = [session.idInterner.intern(to["@id"]) for to in facet["uco-observable:to"]]
 
 	msg_type = get_optional_string_attribute(facet, "uco-observable:messageType", "")
 
 	try:
 		if msg_type == "SMS/Native Message":
-			smsMessages.append(
-				{
-					"@id":uuid_object,
-					"uco-observable:messageText":msg_text,
-					"uco-observable:messageTypte":msg_type,
-					"uco-observable:application":'Native',
-					"uco-observable:sentTime": msg_sent_time,
-					"uco-observable:from-id":msg_from_id,
-					"uco-observable:from":"-",
-					"uco-observable:to-id":msg_to_id,
-					"uco-observable:to":"",
-					"uco-observable:messageType":'SMS/Native Message'
-				})
+			session.smsMessages.append(
+				SmsMessage(
+					id=uuid_object,
+					messageText=msg_text,
+					application='Native',
+					sentTime=msg_sent_time,
+					fromId=msg_from_id,
+					from_="-",
+					toId=msg_to_id,
+					to="",
+					messageType='SMS/Native Message'
+				))
 		else:
-			chatMessages.append(
-				{
-					"@id":uuid_object,
-					"uco-observable:messageText":msg_text,
-					"uco-observable:application-id":msg_app_id,
-					"uco-observable:application":"-",
-					"uco-observable:sentTime": msg_sent_time,
-					"uco-observable:from-id":msg_from_id,
-					"uco-observable:from":"-",
-					"uco-observable:to-id":msg_to_id,
-					"uco-observable:to":"-",
-					"uco-observable:attachedFiles": "",
-					"uco-observable:messageType":'CHAT Message'
-				}
+			chatMessage = ChatMessage(
+				id=uuid_object,
+				messageText=msg_text,
+				applicationId=msg_app_id,
+				application="-",
+				sentTime=msg_sent_time,
+				fromId=msg_from_id,
+				from_="-",
+				toId=msg_to_id,
+				to="-",
+				attachedFiles="",
+				messageType='CHAT Message'
 			)
+			session.chatMessages.append(chatMessage)
+			index_record(session, "chatMessages", chatMessage)
 	except Exception as e:
 		print("ERROR: in appending dictionary to either ChatMessages or SMSmessages")
 		print (e)
 
-def processThread(uuid_object=None, facet=None):
+def processThread(session, uuid_object=None, facet=None):
 	thread_participants = list()
-	for p in facet["uco-observable:participant"]:
-		thread_participants.append(p["@id"])
+	for p in get_optional_list_attribute(facet, "uco-observable:participant", []):
+		thread_participants.append(session.idInterner.intern(p["@id"]))
 	thread = facet["uco-observable:messageThread"]
 	thread_len = get_optional_integer_attribute(thread, "co:size", "-")
 	thread_messages = list()
@@ -1126,185 +901,184 @@ def processThread(uuid_object=None, facet=None):
 	if isinstance(thread_elements, dict):
 		thread_elements = [thread_elements]
 	for m in thread_elements:
-		thread_messages.append(m["@id"])
+		thread_messages.append(session.idInterner.intern(m["@id"]))
 	try:
-		chatThreads.append(
-			{
-				"@id":uuid_object,
-				"thread:length": thread_len,
-				"thread:messages":thread_messages,
-				"thread:participants": thread_participants
-			})
+		chatThread = ChatThread(
+			id=uuid_object,
+			length=thread_len,
+			messages=thread_messages,
+			participants=thread_participants
+		)
+		session.chatThreads.append(chatThread)
+		index_record(session, "chatThreads", chatThread)
 	except Exception as e:
-		print("ERROR: in appending dictionary to chatThreads, @id=" + uuid_object)
+		print("ERROR: in appending dictionary to chatThreads, @id=" + session.idInterner.iri(uuid_object))
 		print (e)
 
-def processAccount(uuid_object=None, facet=None, kind=None):
-	accountFound = False
+def processAccount(session, uuid_object=None, facet=None, kind=None):
 	accountPhoneNumber = ""
 	accountIdentifier = ""
 	accountApplication = ""
 	accountName = ""
+	# The facets of the same account are merged into a single record.
+	account = session.lookup("accounts", uuid_object)
+	if session.accountKinds is not None:
+		session.accountKinds.setdefault(uuid_object, []).append(kind)
 
 	if kind == "AccountFacet":
 		accountIdentifier = get_optional_string_attribute(facet, "uco-observable:accountIdentifier", "")
-		for a in accounts:
-			if a["@id"] == uuid_object:
-				a["uco-observable:accountIdentifier"] = accountIdentifier
-				accountFound = True
-				break
+		if account is not None:
+			account.accountIdentifier = accountIdentifier
 	elif kind == "ApplicationAccountFacet":
 		idApp = get_optional_dict_attribute(facet, "uco-observable:application", {})
 		if idApp:
-			idApp = facet["uco-observable:application"]["@id"]
+			idApp = session.idInterner.intern(facet["uco-observable:application"]["@id"])
+		else:
+			idApp = 0
 		accountApplication = '?'
-		for app in applications:
-			if app["@id"] == idApp:
-				accountApplication = app["uco-core:name"]
-				break
-		for a in accounts:
-			if a["@id"] == uuid_object:
-				a["uco-observable:application"] = accountApplication
-				accountFound = True
-				break
+		if account is not None:
+			account.application = accountApplication
 	elif kind == "PhoneAccountFacet":
 		accountPhoneNumber = get_optional_string_attribute(facet, "uco-observable:phoneNumber", "")
 		accountName = get_optional_string_attribute(facet, "uco-observable:accountIdentifier", "")
-		for a in accounts:
-			if a["@id"] == uuid_object:
-				a["uco-observable:phoneAccount"] = accountPhoneNumber
-				a["uco-observable:displayName"] = accountName
-				accountFound = True
-				break
+		if account is not None:
+			account.phoneAccount = accountPhoneNumber
+			account.displayName = accountName
 	elif kind == "DigitalAccountFacet":
 		accountName = get_optional_string_attribute(facet, "uco-observable:displayName", "")
-		for a in accounts:
-			if a["@id"] == uuid_object:
-				a["uco-observable:displayName"] = accountName
-				accountFound = True
-				break
+		if account is not None:
+			account.displayName = accountName
 
-	if not accountFound:
+	if account is None:
 		try:
-			accounts.append(
-				{
-					"@id":uuid_object,
-					"uco-observable:accountIdentifier": accountIdentifier,
-					"uco-observable:phoneAccount":accountPhoneNumber,
-					"uco-observable:application":accountApplication,
-					"uco-observable:displayName": accountName
-				}
+			session.accounts.append(
+				Account(
+					id=uuid_object,
+					accountIdentifier=accountIdentifier,
+					phoneAccount=accountPhoneNumber,
+					application=accountApplication,
+					displayName=accountName
+				)
 			)
+			account = session.accounts[-1]
+			index_record(session, "accounts", account)
 		except Exception as e:
 			print("ERROR: in appending dictionary to accounts")
 			print (e)
+			return
 
-def processEmailAddress(uuid_object=None, facet=None):
+	if kind == "ApplicationAccountFacet" and idApp:
+		defer_reference(session, account, "application", "applications", idApp, application_name)
+
+def processEmailAddress(session, uuid_object=None, facet=None):
 	accountEmail = get_optional_string_attribute(facet, "uco-observable:addressValue", "")
 	try:
-		emailAddresses.append(
-			{
-				"@id":uuid_object,
-				"uco-observable:addressValue": accountEmail
-			})
+		session.emailAddresses.append(
+			EmailAddress(
+				id=uuid_object,
+				addressValue=accountEmail
+			))
+		index_record(session, "emailAddresses", session.emailAddresses[-1])
 	except Exception as e:
 		print("ERROR: in appending dictionary to emailAddresses")
 		print (e)
 
-def processEmailAccount(uuid_object=None, facet=None):
-	accountEmailId = facet["uco-observable:emailAddress"]["@id"]
+def processEmailAccount(session, uuid_object=None, facet=None):
+	accountEmailId = session.idInterner.intern(facet["uco-observable:emailAddress"]["@id"])
 	addressEmail = "-"
 
 	try:
-		emailAccounts.append(
-			{
-				"@id":uuid_object,
-				"uco-observable:addressId": accountEmailId,
-				"uco-observable:addressValue": addressEmail,
-			})
+		session.emailAccounts.append(
+			EmailAccount(
+				id=uuid_object,
+				addressId=accountEmailId,
+				addressValue=addressEmail,
+			))
+		index_record(session, "emailAccounts", session.emailAccounts[-1])
 	except Exception as e:
 		print("ERROR: in appending dictionary to emailAddresses")
 		print (e)
 
-def processBluetooth(uuid_object=None, facet=None):
+def processBluetooth(session, uuid_object=None, facet=None):
 	bt_address = get_optional_string_attribute(facet, "uco-observable:addressValue", "")
 	try:
-		bluetooths.append(
-			{
-				"@id":uuid_object,
-				"uco-observable:addressValue": bt_address,
-				#"uco-core:name": btName
-			})
+		session.bluetooths.append(
+			Bluetooth(
+				id=uuid_object,
+				addressValue=bt_address,
+				#name=btName
+			))
 	except Exception as e:
 		print("ERROR: in appending dictionary to Bluetooth Connecitons")
 		print (e)
 
-def processCellSite(uuid_object=None, facet=None):
+def processCellSite(session, uuid_object=None, facet=None):
 	cellMcc = get_optional_string_attribute(facet, "uco-observable:cellSiteCountryCode", "")
 	cellCid = get_optional_string_attribute(facet, "uco-observable:cellSiteIdentifier", "")
 	cellLac = get_optional_string_attribute(facet, "uco-observable:cellSiteLocationAreaCode", "")
 	cellMnc = get_optional_string_attribute(facet, "uco-observable:cellSiteNetworkCode", "")
 	cellType = get_optional_string_attribute(facet, "uco-observable:cellSiteType", "")
 	try:
-		cell_sites.append(
-			{
-				"@id":uuid_object,
-				"uco-observable:cellSiteCountryCode": cellMcc,
-				"uco-observable:cellSiteIdentifier": cellCid,
-				"uco-observable:cellSiteNetworkCode": cellMnc,
-				"uco-observable:cellSiteLocationAreaCode": cellLac,
-				"uco-observable:cellSiteType": cellType,
-			})
+		session.cell_sites.append(
+			CellSite(
+				id=uuid_object,
+				cellSiteCountryCode=cellMcc,
+				cellSiteIdentifier=cellCid,
+				cellSiteNetworkCode=cellMnc,
+				cellSiteLocationAreaCode=cellLac,
+				cellSiteType=cellType,
+			))
 	except Exception as e:
 		print("ERROR: in appending dictionary to Cell Site")
 		print (e)
 
-def processEvents(jsonObj, facet):
-	eventId = jsonObj["@id"]
+def processEvents(session, jsonObj, facet):
+	eventId = session.idInterner.intern(jsonObj["@id"])
 	eventCreated = get_optional_dict_attribute(facet, "uco-observable:observableCreatedTime", {})
 	if eventCreated:
 		eventCreated = facet["uco-observable:observableCreatedTime"]["@value"]
 	eventType = get_optional_string_attribute(facet, "uco-observable:eventType", "")
 	eventText = get_optional_string_attribute(facet, "uco-observable:eventText", "")
 	try:
-		events.append(
-			{
-				"@id":eventId,
-				"uco-observable:observableCreatedTime": eventCreated,
-				"uco-observable:eventType": eventType,
-				"uco-observable:eventText": eventText
-			})
+		session.events.append(
+			Event(
+				id=eventId,
+				observableCreatedTime=eventCreated,
+				eventType=eventType,
+				eventText=eventText
+			))
 	except Exception as e:
 		print("ERROR: in appending dictionary to Event Record")
 		print (e)
 
-def processSearchedItems(jsonObj, facet):
-	searchId = jsonObj["@id"]
-	searchApp = get_optional_dict_attribute(facet, "uco-observable:application", {})
-	if searchApp:
-		searchAppId = facet["uco-observable:application"]["@id"]
-		for a in applications:
-			if a["@id"] == searchAppId:
-				searchApp = a["uco-core:name"]
-				break
-	searchLaunchTime = get_optional_string_attribute(facet, "drafting:searchLaunchedTime", '')
+def processSearchedItems(session, jsonObj, facet):
+	searchId = session.idInterner.intern(jsonObj["@id"])
+	searchApp = ""
+	searchAppId = get_optional_dict_attribute(facet, "uco-observable:application", {})
+	if searchAppId:
+		searchAppId = session.idInterner.intern(facet["uco-observable:application"]["@id"])
+	else:
+		searchAppId = 0
+	searchLaunchTime = get_optional_dict_attribute(facet, "drafting:searchLaunchedTime", {})
 	if searchLaunchTime:
 		searchLaunchTime = facet["drafting:searchLaunchedTime"]["@value"]
 	searchValue = get_optional_string_attribute(facet, "drafting:searchValue", "")
 	try:
-		searched_items.append(
-			{
-				"@id":searchId,
-				"drafting:searchSource": searchApp,
-				"drafting:searchLaunchedTime": searchLaunchTime,
-				"drafting:searchValue": searchValue
-			})
+		session.searched_items.append(
+			SearchedItem(
+				id=searchId,
+				searchSource=searchApp,
+				searchLaunchedTime=searchLaunchTime,
+				searchValue=searchValue
+			))
+		if searchAppId:
+			defer_reference(session, session.searched_items[-1], "searchSource", "applications", searchAppId, application_name)
 	except Exception as e:
 		print("ERROR: in appending dictionary to SearchedItems")
 		print (e)
 
-def processSocialMediaActivities(jsonObj, facet):
-	socialId = jsonObj["@id"]
+def processSocialMediaActivities(session, jsonObj, facet):
+	socialId = session.idInterner.intern(jsonObj["@id"])
 	socialBody = get_optional_string_attribute(facet, "uco-observable:body", "")
 	socialTitle = get_optional_string_attribute(facet, "uco-observable:pageTitle", "")
 	socialDate = get_optional_dict_attribute(facet, "uco-observable:observableCreatedTime", {})
@@ -1313,54 +1087,56 @@ def processSocialMediaActivities(jsonObj, facet):
 	socialAppId = get_optional_dict_attribute(facet, "uco-observable:application", {})
 	socialApp = ''
 	if socialAppId:
-		socialAppId = facet["uco-observable:application"]["@id"]
-		for a in applications:
-			if a["@id"] == socialAppId:
-				socialApp = a["uco-core:name"]
-				break
+		socialAppId = session.idInterner.intern(facet["uco-observable:application"]["@id"])
+	else:
+		socialAppId = 0
 	socialAuthorId = get_optional_string_attribute(facet, "drafting:authorIdentifier", "")
 	socialAccountId = get_optional_string_attribute(facet, "uco-observable:accountIdentifier", "")
 	socialName = get_optional_string_attribute(facet, "drafting:authorName", "")
-	socialType = get_optional_list_attribute(facet, "@type", [])
-	if socialType:
+	socialType = ''
+	if get_optional_list_attribute(facet, "@type", []):
 		socialType = facet["@type"][0]
 	try:
-		social_media_activities.append(
-			{
-				"@id":socialId,
-				"uco-observable:body":socialBody,
-				"uco-observable:pageTitle":socialTitle,
-				"uco-observable:observableCreatedTime": socialDate,
-				"uco-observable:application": socialApp,
-			"drafting:authorIdentifier": socialAuthorId,
-		"uco-observable:accountIdentifier": socialAccountId,
-		"drafting:authorName": socialName,
-		"drafting:activityType": socialType
-			})
+		session.social_media_activities.append(
+			SocialMediaActivity(
+				id=socialId,
+				body=socialBody,
+				pageTitle=socialTitle,
+				observableCreatedTime=socialDate,
+				application=socialApp,
+				authorIdentifier=socialAuthorId,
+				accountIdentifier=socialAccountId,
+				authorName=socialName,
+				activityType=socialType
+			))
+		if socialAppId:
+			defer_reference(session, session.social_media_activities[-1], "application", "applications", socialAppId, application_name)
 	except Exception as e:
 		print("ERROR: in appending dictionary to Social Media Activity")
 		print (e)
 
-def processWirelessNetwork(jsonObj, facet) -> None:
+def processWirelessNetwork(session, jsonObj, facet) -> None:
 	assert isinstance(jsonObj["@id"], str), "Anonymous object found in CASE JSON-LD data."
-	wId = jsonObj["@id"]
+	wId = session.idInterner.intern(jsonObj["@id"])
 	wSsid = get_optional_string_attribute(facet, "uco-observable:ssid", '')
 	wBssid = get_optional_string_attribute(facet, "uco-observable:baseStation", '')
 	try:
-		wireless_net.append(
-			{
-				"@id":wId,
-				"uco-observable:ssid": wSsid,
-				"uco-observable:baseStation": wBssid,
-			})
+		session.wireless_net.append(
+			WirelessNet(
+				id=wId,
+				ssid=wSsid,
+				baseStation=wBssid,
+			))
 	except Exception as e:
 		print("ERROR: in appending dictionary to Wireless Network")
 		print (e)
 
-def processCookie(uuid_object=None, facet=None):
+def processCookie(session, uuid_object=None, facet=None):
 	cookieAppId = get_optional_dict_attribute(facet, "uco-observable:application", {})
 	if cookieAppId:
-		cookieAppId = facet["uco-observable:application"]["@id"]
+		cookieAppId = session.idInterner.intern(facet["uco-observable:application"]["@id"])
+	else:
+		cookieAppId = 0
 	cookieApp = "-"
 	cookieName = get_optional_string_attribute(facet, "uco-observable:cookieName", '')
 	cookiePath = get_optional_string_attribute(facet, "uco-observable:cookiePath", '')
@@ -1378,22 +1154,22 @@ def processCookie(uuid_object=None, facet=None):
 		cookieExpirationTime = facet["uco-observable:expirationTime"]["@value"]
 
 	try:
-		cookies.append(
-			{
-				"@id":uuid_object,
-				"uco-observable:cookieAppId": cookieAppId,
-				"uco-observable:cookieApp": cookieApp,
-				"uco-observable:cookieName": cookieName,
-				"uco-observable:cookiePath": cookiePath,
-				"uco-observable:observableCreatedTime": cookieCreatedTime,
-				"uco-observable:accessedTime": cookieLastAccessedTime,
-				"uco-observable:expirationTime": cookieExpirationTime
-			})
+		session.cookies.append(
+			Cookie(
+				id=uuid_object,
+				cookieAppId=cookieAppId,
+				cookieApp=cookieApp,
+				cookieName=cookieName,
+				cookiePath=cookiePath,
+				observableCreatedTime=cookieCreatedTime,
+				accessedTime=cookieLastAccessedTime,
+				expirationTime=cookieExpirationTime
+			))
 	except Exception as e:
 		print("ERROR: in appending dictionary to cookies")
 		print (e)
 
-def processCoordinate(uuid_object=None, facet=None):
+def processCoordinate(session, uuid_object=None, facet=None):
 	coordinateLat = get_optional_dict_attribute(facet, "uco-location:latitude", {})
 	if coordinateLat:
 		coordinateLat = facet["uco-location:latitude"]["@value"]
@@ -1404,86 +1180,78 @@ def processCoordinate(uuid_object=None, facet=None):
 	if coordinateAlt:
 		coordinateAlt = facet["uco-location:altitude"]["@value"]
 	try:
-		geo_coordinates.append(
-			{
-				"@id":uuid_object,
-				"uco-location:latitude": coordinateLat,
-				"uco-location:longitude": coordinateLong,
-				"uco-location:altitude": coordinateAlt
-			})
+		session.geo_coordinates.append(
+			Coordinate(
+				id=uuid_object,
+				latitude=coordinateLat,
+				longitude=coordinateLong,
+				altitude=coordinateAlt
+			))
+		index_record(session, "geo_coordinates", session.geo_coordinates[-1])
 	except Exception as e:
 		print("ERROR: in appending dictionary to geo coordinate")
 		print (e)
 
-def processApplication(uuid_object=None, facet=None):
+def processApplication(session, uuid_object=None, facet=None):
 	applicationName = get_optional_string_attribute(facet, "uco-core:name", "")
 	if applicationName:
 		applicationName = get_optional_string_attribute(facet, "uco-observable:applicationIdentifier", "yyy")
 	try:
-		applications.append(
-			{
-				"@id":uuid_object,
-				"uco-core:name": applicationName
-			})
+		session.applications.append(
+			Application(
+				id=uuid_object,
+				name=applicationName
+			))
+		index_record(session, "applications", session.applications[-1])
 	except Exception as e:
 		print("ERROR: in appending dictionary to applications")
 		print (e)
 
-def processCall(uuid_object=None, facet=None):
+def processCall(session, uuid_object=None, facet=None):
 	#callId = jsonObj["@id"]
 	callFromId = get_optional_dict_attribute(facet, "uco-observable:from", {})
 	callFrom = "-"
 	if callFromId:
-		callFromId = callFromId["@id"]
-		for a in accounts:
-			if a["@id"] == callFromId:
-				callFrom = a["uco-observable:phoneAccount"] + " / " + \
-					a["uco-observable:accountIdentifier"]
-				break
-	callToId = get_optional_dict_attribute(facet, "uco-observable:to", {})
-	if callToId:
-		callToId = facet["uco-observable:to"]["@id"]
-		callTo = "-"
-		if isinstance(callToId, dict):
-			for a in accounts:
-				if a["@id"] == callToId["@id"]:
-					callTo = a["uco-observable:phoneAccount"] + " / " + \
-						a["uco-observable:accountIdentifier"]
-					break
-		elif isinstance(callToId, list):
-			for to_item in callToId:
-				for a in accounts:
-					if a["@id"] == to_item["@id"]:
-						callTo = a["uco-observable:phoneAccount"] + " / " + \
-							a["uco-observable:accountIdentifier"]
-						break
-
+		callFromId = session.idInterner.intern(callFromId["@id"])
+	else:
+		callFromId = 0
+	callToIds = get_attribute(facet, "uco-observable:to", [])
+	if isinstance(callToIds, dict):
+		callToIds = [callToIds]
+	callTo = "-"
 	callApplication = "-"
 	callApplicationId = get_optional_dict_attribute(facet, "uco-observable:application", {})
 	if callApplicationId:
-		callApplicationId = facet["uco-observable:application"]["@id"]
-		for a in applications:
-			if a["@id"] == callApplicationId:
-				callApplication = a["uco-core:name"]
+		callApplicationId = session.idInterner.intern(facet["uco-observable:application"]["@id"])
+	else:
+		callApplicationId = 0
 	callStartTime = get_optional_dict_attribute(facet, "uco-observable:startTime", {})
 	if callStartTime:
 		callStartTime = facet["uco-observable:startTime"]["@value"]
 	callDuration = get_optional_integer_attribute(facet, "uco-observable:duration", "-")
 	try:
-		phoneCalls.append(
-			{
-				"@id":uuid_object,
-				"uco-observable:from":callFrom,
-				"uco-observable:to":callTo,
-				"uco-core:name":callApplication,
-				"uco-observable:startTime":callStartTime,
-			  "uco-observable:duration":callDuration,
-			})
+		session.phoneCalls.append(
+			Call(
+				id=uuid_object,
+				from_=callFrom,
+				to=callTo,
+				name=callApplication,
+				startTime=callStartTime,
+				duration=callDuration,
+			))
+		call = session.phoneCalls[-1]
+		if callFromId:
+			defer_reference(session, call, "from_", "accounts", callFromId, account_phone_label)
+		# With more recipients, the label of the last one is kept.
+		for callToId in callToIds:
+			defer_reference(session, call, "to", "accounts", session.idInterner.intern(callToId["@id"]), account_phone_label)
+		if callApplicationId:
+			defer_reference(session, call, "name", "applications", callApplicationId, application_name)
 	except Exception as e:
 		print("ERROR: in appending dictionary to Call")
 		print (e)
 
-def processCalendar(uuid_object=None, facet=None):
+def processCalendar(session, uuid_object=None, facet=None):
 	calendarSubject = get_optional_string_attribute(facet, "uco-observable:subject", "")
 	calendarRepeatInterval = get_optional_string_attribute(facet, "uco-observable:recurrence", "")
 	calendarStatus = get_optional_string_attribute(facet, "uco-observable:eventStatus", "")
@@ -1494,240 +1262,177 @@ def processCalendar(uuid_object=None, facet=None):
 	if calendarEndTime:
 		calendarEndTime = facet["uco-observable:endTime"]["@value"]
 	try:
-		calendars.append(
-			{
-				"@id":uuid_object,
-				"uco-observable:subject":calendarSubject,
-				"uco-observable:startTime":calendarStartTime,
-			  "uco-observable:endTime":calendarEndTime,
-			  "uco-observable:recurrence":calendarRepeatInterval,
-			  "uco-observable:eventStatus":calendarStatus
-			})
+		session.calendars.append(
+			Calendar(
+				id=uuid_object,
+				subject=calendarSubject,
+				startTime=calendarStartTime,
+				endTime=calendarEndTime,
+				recurrence=calendarRepeatInterval,
+				eventStatus=calendarStatus
+			))
 	except Exception as e:
 		print("ERROR: in appending dictionary to Calendar")
 		print (e)
 
-def processEmailMessage(jsonObj, facet):
-	emailId = jsonObj["@id"]
+def processEmailMessage(session, jsonObj, facet):
+	emailId = session.idInterner.intern(jsonObj["@id"])
 	emailSentTime = get_optional_dict_attribute(facet, "uco-observable:sentTime", {})
 	if emailSentTime:
 		emailSentTime = facet["uco-observable:sentTime"]["@value"]
 
 	emailFromId = get_optional_dict_attribute(facet, "uco-observable:from", {})
 	if emailFromId:
-		emailFromId = facet["uco-observable:from"]["@id"]
+		emailFromId = session.idInterner.intern(facet["uco-observable:from"]["@id"])
+	else:
+		emailFromId = 0
 
 	emailFrom = ""
 	emailToId = get_optional_list_attribute(facet, "uco-observable:to", [])
 	if emailToId:
-		emailToId = facet["uco-observable:to"]
+		emailToId = [session.idInterner.intern(to["@id"]) for to in facet["uco-observable:to"]]
 	emailTo = ""
 	emailCcId = get_optional_list_attribute(facet, "uco-observable:cc", [])
 	if emailCcId:
-		emailCcId = facet["uco-observable:cc"]
+		emailCcId = [session.idInterner.intern(cc["@id"]) for cc in facet["uco-observable:cc"]]
 	emailCc = ""
 	emailBccId = get_optional_list_attribute(facet, "uco-observable:bcc", [])
 	if emailBccId:
-		emailBccId = facet["uco-observable:bcc"]
+		emailBccId = [session.idInterner.intern(bcc["@id"]) for bcc in facet["uco-observable:bcc"]]
 	emailBcc = ""
 	emailBody = get_optional_string_attribute(facet, "uco-observable:body", "")
 	emailSubject = get_optional_string_attribute(facet, "uco-observable:subject", "")
 
 	try:
-		emailMessages.append(
-			{
-				"@id":emailId,
-				"uco-observable:fromId":emailFromId,
-				"uco-observable:from":emailFrom,
-				"uco-observable:toId":emailToId,
-				"uco-observable:to":emailTo,
-				"uco-observable:ccId":emailCcId,
-				"uco-observable:cc":emailCc,
-				"uco-observable:bccId":emailBccId,
-				"uco-observable:bcc":emailBcc,
-				"uco-observable:sentTime":emailSentTime,
-				"uco-observable:body":emailBody,
-				"uco-observable:subject":emailSubject,
-			})
+		session.emailMessages.append(
+			EmailMessage(
+				id=emailId,
+				fromId=emailFromId,
+				from_=emailFrom,
+				toId=emailToId,
+				to=emailTo,
+				ccId=emailCcId,
+				cc=emailCc,
+				bccId=emailBccId,
+				bcc=emailBcc,
+				sentTime=emailSentTime,
+				body=emailBody,
+				subject=emailSubject,
+			))
 	except Exception as e:
 		print("ERROR: in appending dictionary to emailMessage")
 		print (e)
 
-def processFile(jsonObj, facet):
-	fileId = jsonObj["@id"]
+def file_tables(session: CaseSession, fileTag: str) -> list[list[File]]:
+	# Lists of the files with the given MIME tag.
+	tables: list[list[File]] = []
+	fileTagNorm = fileTag.lower()
+	if fileTagNorm in ('image', 'pictures', 'live photos'):
+		tables.append(session.filesImage)
+	if fileTagNorm == 'audio':
+		tables.append(session.filesAudio)
+	if fileTagNorm.find('text') > -1:
+		tables.append(session.filesText)
+	if fileTagNorm.find('pdf') > -1:
+		tables.append(session.filesPDF)
+	if fileTagNorm.find('rtf') > -1:
+		tables.append(session.filesRTF)
+	if fileTagNorm.find('word') > -1:
+		tables.append(session.filesWord)
+	if fileTagNorm.find('video') > -1:
+		tables.append(session.filesVideo)
+	if fileTagNorm == 'archives':
+		tables.append(session.filesArchive)
+	if fileTagNorm.find('database') > -1:
+		tables.append(session.filesDatabase)
+	if fileTagNorm == 'application':
+		tables.append(session.filesApplication)
+	if not tables:
+		tables.append(session.filesUncategorized)
+	return tables
+
+def processFile(session, jsonObj, facet):
+	fileId = session.idInterner.intern(jsonObj["@id"])
 	fileTag = get_optional_string_attribute(facet, "uco-observable:mimeType", "")
 	fileName = get_optional_string_attribute(facet, "uco-observable:fileName", "")
 	filePath = get_optional_string_attribute(facet, "uco-observable:filePath", "")
 	fileSize = get_optional_integer_attribute(facet, "uco-observable:sizeInBytes", "-")
-	tagProcessed = False;
 	try:
-		fileTagNorm = fileTag.lower()
-		if fileTagNorm in ('image', 'pictures', 'live photos'):
-			filesImage.append(
-				{
-					"@id":fileId,
-					"uco-core:tag": fileTag,
-					"uco-observable:fileName":fileName,
-					"uco-observable:filePath":filePath,
-					"uco-observable:fileSize":fileSize
-				})
-			tagProcessed = True
-		if fileTagNorm == 'audio':
-			filesAudio.append(
-				{
-					"@id":fileId,
-					"uco-core:tag": fileTag,
-					"uco-observable:fileName":fileName,
-					"uco-observable:filePath":filePath,
-					"uco-observable:fileSize":fileSize
-				})
-			tagProcessed = True
-		if fileTagNorm.find('text') > -1:
-			filesText.append(
-				{
-					"@id":fileId,
-					"uco-core:tag": fileTag,
-					"uco-observable:fileName":fileName,
-					"uco-observable:filePath":filePath,
-					"uco-observable:fileSize":fileSize
-				})
-			tagProcessed = True
-		if fileTagNorm.find('pdf') > -1:
-			filesPDF.append(
-				{
-					"@id":fileId,
-					"uco-core:tag": fileTag,
-					"uco-observable:fileName":fileName,
-					"uco-observable:filePath":filePath,
-					"uco-observable:fileSize":fileSize
-				})
-			tagProcessed = True
-		if fileTagNorm.find('rtf') > -1:
-			filesRTF.append(
-				{
-					"@id":fileId,
-					"uco-core:tag": fileTag,
-					"uco-observable:fileName":fileName,
-					"uco-observable:filePath":filePath,
-					"uco-observable:fileSize":fileSize
-				})
-			tagProcessed = True
-		if fileTagNorm.find('word') > -1:
-			filesWord.append(
-				{
-					"@id":fileId,
-					"uco-core:tag": fileTag,
-					"uco-observable:fileName":fileName,
-					"uco-observable:filePath":filePath,
-					"uco-observable:fileSize":fileSize
-				})
-			tagProcessed = True
-		if fileTagNorm.find('video') > -1:
-			filesVideo.append(
-				{
-					"@id":fileId,
-					"uco-core:tag": fileTag,
-					"uco-observable:fileName":fileName,
-					"uco-observable:filePath":filePath,
-					"uco-observable:fileSize":fileSize
-				})
-			tagProcessed = True
-		if fileTagNorm == 'archives':
-			filesArchive.append(
-				{
-					"@id":fileId,
-					"uco-core:tag": fileTag,
-					"uco-observable:fileName":fileName,
-					"uco-observable:filePath":filePath,
-					"uco-observable:fileSize":fileSize
-				})
-			tagProcessed = True
-		if fileTagNorm.find('database') > -1:
-			filesDatabase.append(
-				{
-					"@id":fileId,
-					"uco-core:tag": fileTag,
-					"uco-observable:fileName":fileName,
-					"uco-observable:filePath":filePath,
-					"uco-observable:fileSize":fileSize
-				})
-			tagProcessed = True
-		if fileTagNorm == 'application':
-			filesApplication.append(
-				{
-					"@id":fileId,
-					"uco-core:tag": fileTag,
-					"uco-observable:fileName":fileName,
-					"uco-observable:filePath":filePath,
-					"uco-observable:fileSize":fileSize
-				})
-			tagProcessed = True
-		if not tagProcessed:
-			filesUncategorized.append(
-				{
-					"@id":fileId,
-					"uco-core:tag": fileTag,
-					"uco-observable:fileName":fileName,
-					"uco-observable:filePath":filePath,
-					"uco-observable:fileSize":fileSize
-				})
+		# The same record is shared by all the categories the file belongs to.
+		fileRecord = File(
+			id=fileId,
+			tag=fileTag,
+			fileName=fileName,
+			filePath=filePath,
+			fileSize=fileSize
+		)
+		# The files are grouped by the code of their tag, so the tag is
+		# classified once for all the files having it.
+		tagCode = fileRecord.code("tag")
+		fileTables = session.fileTablesByTag.get(tagCode)
+		if fileTables is None:
+			fileTables = session.fileTablesByTag[tagCode] = file_tables(session, fileTag)
+		for fileTable in fileTables:
+			fileTable.append(fileRecord)
+		index_record(session, "files", fileRecord)
 	except Exception as e:
 		print("ERROR: in appending dictionary to file")
 		print (e)
 
-def processURL(jsonObj, facet):
-	webId = jsonObj["@id"]
+def processURL(session, jsonObj, facet):
+	webId = session.idInterner.intern(jsonObj["@id"])
 	webUrl = facet["uco-observable:fullValue"]
 	try:
-		webURLs.append(
-			{
-				"@id":webId,
-				"uco-observable:url":webUrl
-			})
+		session.webURLs.append(
+			URL(
+				id=webId,
+				url=webUrl
+			))
+		index_record(session, "webURLs", session.webURLs[-1])
 	except Exception as e:
 		print("ERROR: in appending dictionary to webURL")
 		print (e)
 
-def processWebBookmark(jsonObj, facet):
-	webId = jsonObj["@id"]
+def processWebBookmark(session, jsonObj, facet):
+	webId = session.idInterner.intern(jsonObj["@id"])
 	webCreatedTime = ''
 	webApp = ""
 	webUrl = ""
 	webPath = ""
 	browserId = get_optional_dict_attribute(facet, "uco-observable:application", {})
 	if browserId:
-		browserId = facet["uco-observable:application"]["@id"]
-		for a in applications:
-			if a["@id"] == browserId:
-				webApp = a["uco-core:name"]
-	webCreatedTime = get_optional_string_attribute(facet, "uco-observable:observableCreatedTime", '')
+		browserId = session.idInterner.intern(facet["uco-observable:application"]["@id"])
+	else:
+		browserId = 0
+	webCreatedTime = get_optional_dict_attribute(facet, "uco-observable:observableCreatedTime", {})
 	if webCreatedTime:
 		webCreatedTime = facet["uco-observable:observableCreatedTime"]["@value"]
 	webUrlId = get_optional_dict_attribute(facet, "uco-observable:urlTargeted", {})
 	if webUrlId:
-		webUrlId = facet["uco-observable:urlTargeted"]["@id"]
-		for u in webURLs:
-			if u["@id"] == webUrlId:
-				webUrl = u["uco-observable:url"]
-				break
+		webUrlId = session.idInterner.intern(facet["uco-observable:urlTargeted"]["@id"])
 	else:
+		webUrlId = 0
 		webUrl = "-"
 	webPath = get_optional_string_attribute(facet, "uco-observable:bookmarkPath", "")
 	try:
-		webBookmark.append(
-			{
-				"@id":webId,
-				"uco-observable:application":webApp,
-				"uco-observable:urlTargeted": webUrl,
-				"uco-observable:bookmarkPath":webPath,
-				"uco-observable:observableCreatedTime":webCreatedTime
-			})
+		session.webBookmark.append(
+			WebBookmark(
+				id=webId,
+				application=webApp,
+				urlTargeted=webUrl,
+				bookmarkPath=webPath,
+				observableCreatedTime=webCreatedTime
+			))
+		if browserId:
+			defer_reference(session, session.webBookmark[-1], "application", "applications", browserId, application_name)
+		if webUrlId:
+			defer_reference(session, session.webBookmark[-1], "urlTargeted", "webURLs", webUrlId, url_value)
 	except Exception as e:
 		print("ERROR: in appending dictionary to Web Bookmark")
 		print (e)
 
-def processURLHistory(jsonObj, facet):
-	webId = jsonObj["@id"]
+def processURLHistory(session, jsonObj, facet):
+	webId = session.idInterner.intern(jsonObj["@id"])
 	webLastVisited = ''
 	webTitle = ""
 	webUrl = ""
@@ -1736,11 +1441,11 @@ def processURLHistory(jsonObj, facet):
 	if search_term:
 		search_term = search_term.replace('\n','').replace('\r', '').replace('\t', ' ')
 		try:
-			webSearchTerm.append(
-				{
-					"@id":webId,
-					"uco-observable:searchTerm":search_term,
-				})
+			session.webSearchTerm.append(
+				WebSearchTerm(
+					id=webId,
+					searchTerm=search_term,
+				))
 		except Exception as e:
 			print("ERROR: in appending dictionary to webSearchTerm")
 			print (e)
@@ -1748,39 +1453,129 @@ def processURLHistory(jsonObj, facet):
 		return
 	browserId = get_optional_dict_attribute(facet, "uco-observable:browserInformation", {})
 	if browserId:
-		browserId = facet["uco-observable:browserInformation"]["@id"]
-		for a in applications:
-			if a["@id"] == browserId:
-				webApp = a["uco-core:name"]
+		browserId = session.idInterner.intern(facet["uco-observable:browserInformation"]["@id"])
 	else:
+		browserId = 0
 		webApp = "-"
-	firstVisit = get_optional_string_attribute(facet["uco-observable:urlHistoryEntry"][0], "uco-observable:firstVisit", '')
+	firstVisit = get_optional_dict_attribute(facet["uco-observable:urlHistoryEntry"][0], "uco-observable:firstVisit", {})
 	if firstVisit:
 		firstVisit = facet["uco-observable:urlHistoryEntry"][0]["uco-observable:firstVisit"]["@value"]
-	lastVisit = get_optional_string_attribute(facet["uco-observable:urlHistoryEntry"][0], "uco-observable:lastVisit", '')
+	lastVisit = get_optional_dict_attribute(facet["uco-observable:urlHistoryEntry"][0], "uco-observable:lastVisit", {})
 	if lastVisit:
-		lastVisit = facet["uco-observable:urlHistoryEntry"][0]["uco-observable:lastVisit"]["@value"]
+		webLastVisited = facet["uco-observable:urlHistoryEntry"][0]["uco-observable:lastVisit"]["@value"]
 	webUrlId = get_optional_dict_attribute(facet["uco-observable:urlHistoryEntry"][0], "uco-observable:url", {})
 	webUrl = "-"
 	if webUrlId:
-		webUrlId = webUrlId["@id"]
-		for w in webURLs:
-			if w["@id"] == webUrlId:
-				webUrl = w["uco-observable:url"]
+		webUrlId = session.idInterner.intern(webUrlId["@id"])
+	else:
+		webUrlId = 0
 	webTitle = get_optional_string_attribute(facet["uco-observable:urlHistoryEntry"][0], "uco-observable:pageTitle", "")
 	try:
-		webURLHistory.append(
-			{
-				"@id":webId,
-				"uco-observable:browserInformation":webApp,
-				"uco-observable:url": webUrl,
-				"uco-observable:title":webTitle,
-				"uco-observable:lastVisited":webLastVisited,
-			})
+		session.webURLHistory.append(
+			WebHistory(
+				id=webId,
+				browserInformation=webApp,
+				url=webUrl,
+				title=webTitle,
+				lastVisited=webLastVisited,
+			))
+		if browserId:
+			defer_reference(session, session.webURLHistory[-1], "browserInformation", "applications", browserId, application_name)
+		if webUrlId:
+			defer_reference(session, session.webURLHistory[-1], "url", "webURLs", webUrlId, url_value)
 	except Exception as e:
 		print("ERROR: in appending dictionary to URLHistory")
 		print (e)
 
+# Processors of the uco-core:hasFacet entries, keyed by facet @type.
+# Each processor is called with the session, the observable and the facet.
+FACET_PROCESSORS: Dict[str, Callable[[CaseSession, dict, dict], None]] = {
+	"uco-observable:MessageFacet":
+		lambda session, jsonObj, facet: processMessage(session, uuid_object=session.idInterner.intern(jsonObj["@id"]), facet=facet),
+	"uco-observable:SMSMessageFacet":
+		lambda session, jsonObj, facet: processMessage(session, uuid_object=session.idInterner.intern(jsonObj["@id"]), facet=facet),
+	"uco-observable:BluetoothAddressFacet":
+		lambda session, jsonObj, facet: processBluetooth(session, uuid_object=session.idInterner.intern(jsonObj["@id"]), facet=facet),
+	"uco-observable:CellSiteFacet":
+		lambda session, jsonObj, facet: processCellSite(session, uuid_object=session.idInterner.intern(jsonObj["@id"]), facet=facet),
+	"uco-observable:BrowserCookieFacet":
+		lambda session, jsonObj, facet: processCookie(session, uuid_object=session.idInterner.intern(jsonObj["@id"]), facet=facet),
+	"uco-location:LatLongCoordinatesFacet":
+		lambda session, jsonObj, facet: processCoordinate(session, uuid_object=session.idInterner.intern(jsonObj["@id"]), facet=facet),
+	"uco-observable:MessageThreadFacet":
+		lambda session, jsonObj, facet: processThread(session, uuid_object=session.idInterner.intern(jsonObj["@id"]), facet=facet),
+	"uco-observable:AccountFacet":
+		lambda session, jsonObj, facet: processAccount(session, uuid_object=session.idInterner.intern(jsonObj["@id"]), facet=facet, kind="AccountFacet"),
+	"uco-observable:ApplicationAccountFacet":
+		lambda session, jsonObj, facet: processAccount(session, uuid_object=session.idInterner.intern(jsonObj["@id"]), facet=facet, kind="ApplicationAccountFacet"),
+	"uco-observable:DigitalAccountFacet":
+		lambda session, jsonObj, facet: processAccount(session, uuid_object=session.idInterner.intern(jsonObj["@id"]), facet=facet, kind="DigitalAccountFacet"),
+	"uco-observable:PhoneAccountFacet":
+		lambda session, jsonObj, facet: processAccount(session, uuid_object=session.idInterner.intern(jsonObj["@id"]), facet=facet, kind="PhoneAccountFacet"),
+	"uco-observable:EmailAccountFacet":
+		lambda session, jsonObj, facet: processEmailAccount(session, uuid_object=session.idInterner.intern(jsonObj["@id"]), facet=facet),
+	"uco-observable:ApplicationFacet":
+		lambda session, jsonObj, facet: processApplication(session, uuid_object=session.idInterner.intern(jsonObj["@id"]), facet=facet),
+	"uco-observable:EmailAddressFacet":
+		lambda session, jsonObj, facet: processEmailAddress(session, uuid_object=session.idInterner.intern(jsonObj["@id"]), facet=facet),
+	"uco-observable:CalendarEntryFacet":
+		lambda session, jsonObj, facet: processCalendar(session, uuid_object=session.idInterner.intern(jsonObj["@id"]), facet=facet),
+	"uco-observable:CallFacet":
+		lambda session, jsonObj, facet: processCall(session, uuid_object=session.idInterner.intern(jsonObj["@id"]), facet=facet),
+	"uco-observable:EmailMessageFacet": processEmailMessage,
+	"uco-observable:FileFacet": processFile,
+	"uco-observable:URLFacet": processURL,
+	"uco-observable:URLHistoryFacet": processURLHistory,
+	"uco-observable:BrowserBookmarkFacet": processWebBookmark,
+	"uco-observable:WirelessNetworkConnectionFacet": processWirelessNetwork,
+	"drafting:SocialMediaActivityFacet": processSocialMediaActivities,
+	"drafting:SearchedItemFacet": processSearchedItems,
+	"uco-observable:EventRecordFacet": processEvents,
+}
+
+# Processors of the ObservableRelationship objects, keyed by uco-core:kindOfRelationship.
+RELATIONSHIP_PROCESSORS: Dict[str, Callable[[CaseSession, dict], None]] = {
+	"Attached_To": processRelationAttachments,
+	"Mapped_By": processRelationMappedBy,
+	"Connected_To": processRelationConnectedTo,
+}
+
+def process_object(session, jsonObj):
+	dataFacets = get_optional_list_attribute(jsonObj, "uco-core:hasFacet", [])
+	if not dataFacets:
+		observableType = get_optional_string_attribute(jsonObj, "@type", "")
+		# Only the ObservableRelationship is considered.
+		# Others (i.e. uco-identity:Identity, case-investigation:InvestigativeAction,
+		# uco-tool:Tool, uco-identity:Organization, uco-role:Role,
+		# case-investigation:ProvenanceRecord, case-investigation:InvestigativeAction)
+		# are ignored.
+		if observableType == "uco-observable:ObservableRelationship":
+			kindOfRelationship = jsonObj["uco-core:kindOfRelationship"]
+			relationshipProcessor = RELATIONSHIP_PROCESSORS.get(kindOfRelationship)
+			if relationshipProcessor is not None:
+				session.facet_hits[kindOfRelationship] += 1
+				relationshipProcessor(session, jsonObj)
+	else:
+		if isinstance(dataFacets, dict):
+			dataFacets = [dataFacets]
+
+		for facet in dataFacets:
+			assert isinstance(facet, dict)
+			facet_type = facet["@type"]
+			objectTypes: list
+			if isinstance(facet_type, str):
+				objectTypes = [facet_type]
+			elif isinstance(facet_type, list):
+				objectTypes = facet_type # SocialMediaActivityFacet
+			else:
+				raise TypeError("Unexpected type for property %r: %r." % (facet_type, type(facet_type)))
+			for objectType in objectTypes:
+				processor = FACET_PROCESSORS.get(objectType)
+				if processor is not None:
+					session.facet_hits[objectType] += 1
+					processor(session, jsonObj, facet)
+					break
+
 def number_with_dots(n: Union[int, str]) -> str:
 	if isinstance(n, int) or isinstance(n, str):
 		n = str(n)
@@ -1793,385 +1588,351 @@ def number_with_dots(n: Union[int, str]) -> str:
 	else:
 		raise TypeError('Parameter must be either integer or string')
 
-#--- Gobal variables
-chatMessages: list[dict[str, str]] = []
-chatThreads: list[dict[str, str]] = []
-#chatMessageAttachments = []
-cookies: list[dict[str, str]] = []
-geo_coordinates: list[dict[str, str]] = []
-cell_sites: list[dict[str, str]] = []
-bluetooths: list[dict[str, str]] = []
-searched_items: list[dict[str, str]] = []
-social_media_activities: list[dict[str, str]] = []
-events: list[dict[str, str]] = []
-relationAttachmentsTo: list[dict[str, str]] = []
-relationMappedBy: list[dict[str, str]] = []
-relationConnectedTo: list[dict[str, str]] = []
-smsMessages: list[dict[str, str]] = []
-accounts: list[dict[str, str]] = []
-emailAddresses: list[dict[str, str]] = []
-emailAccounts: list[dict[str, str]] = []
-applications: list[dict[str, str]] = []
-phoneCalls: list[dict[str, str]] = []
-calendars: list[dict[str, str]] = []
-emailMessages: list[dict[str, str]] = []
-filesUncategorized: list[dict[str, str]] = []
-filesImage: list[dict[str, str]] = []
-filesAudio: list[dict[str, str]] = []
-filesText: list[dict[str, str]] = []
-filesPDF: list[dict[str, str]] = []
-filesWord: list[dict[str, str]] = []
-filesRTF: list[dict[str, str]] = []
-filesVideo: list[dict[str, str]] = []
-filesArchive: list[dict[str, str]] = []
-filesDatabase: list[dict[str, str]] = []
-filesApplication: list[dict[str, str]] = []
-webURLs: list[dict[str, str]] = []
-webURLHistory: list[dict[str, str]] = []
-webSearchTerm: list[dict[str, str]] = []
-webBookmark: list[dict[str, str]] = []
-wireless_net: list[dict[str, str]] = []
-
-tableData: list[list[str]] = [[]]
-treeData: list[dict[str,str]] = []
-
-def main():
-	C_GREEN = '\033[32m'
-	C_RED = '\033[31m'
-	C_BLACK = '\033[0m'
-	C_CYAN = '\033[36m'
-	EMPTY_DATA = "1900-01-01T00:00:00"
-
-	parser = argparse.ArgumentParser()
-	parser.add_argument("--debug", action="store_true")
-	parser.add_argument("--dry-run", action="store_true", help="Run application, exiting without initiating GUI.")
-	parser.add_argument("input_jsonld")
-	args = parser.parse_args()
-
-	logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
-
-#--- Read input file in CASE-JSON format
-	try:
-		f = codecs.open(args.input_jsonld, 'r', encoding='utf-8')
-	except Exception as e:
-		print(C_RED + '\n' + "ERROR in trying to open the file " + args.input_jsonld)
-		print (e)
-		sys.exit('Open file failed.')
-	try:
-		print(C_CYAN + "Load JSON structure, it might take some time, please wait ...\n")
-		json_obj = json.load(f)
-		if args.dry_run:
-			logging.info("Exiting dry run.")
-			sys.exit(0)
-		app = QApplication([])
-
-		_widget=QWidget()
-		main_window = QWidget()
-		main_window.setWindowTitle("CASE viewer")
-		main_window.setGeometry(10, 10, 10, 10)
-		main_window.show()
-
-		msgBox = QMessageBox(main_window)
-		# set properties
-		msgBox.setWindowTitle("CASE syntax check result")
-		msgBox.setText("Syntax check went well! \n\nDo you want to continue?")
-		msgBox.setIcon(QMessageBox.Icon.Question)
-		# Set buttons by using PyQt6 Enum
-		msgBox.setStandardButtons(
-    	QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-		)
-		msgBox.setDefaultButton(QMessageBox.StandardButton.Yes)
-		# Force te window to be modal
-		msgBox.setWindowModality(Qt.WindowModality.ApplicationModal)
-
-		# the WindowStaysOnTopHint flag maintains the Box over all the others
-		msgBox.setWindowFlag(Qt.WindowType.WindowStaysOnTopHint, True)
-		QTimer.singleShot(0, msgBox.activateWindow)
-		QTimer.singleShot(0, msgBox.raise_)
-
-		msgBox.activateWindow()
-		# Show the Box and capture the reply
-		reply = msgBox.exec()
-
-		if reply == QMessageBox.StandardButton.No:
-			sys.exit('Terminate by user.')
-
-		main_window.close()
-		msgBox.close()
-#--- Loop over all Observables of the array "uco-core:object"
-		if 'uco-core:object' in json_obj.keys():
-			json_data = json_obj['uco-core:object']
-		elif '@graph' in json_obj.keys():
-			json_data = json_obj['@graph']
-		else:
-			sys.exit(C_RED + "\n Neither key uco-core:object nor @graph have been found. \
-				\n" + C_BLACK)
-
-		nObjects = 0
-		for jsonObj in json_data:
-			nObjects +=1
-			uuid_object = jsonObj['@id']
-			print(f"{C_GREEN} Observable n. {str(nObjects)} - uuid={uuid_object}", end='\r')
-			dataFacets = get_optional_list_attribute(jsonObj, "uco-core:hasFacet", [])
-			if not dataFacets:
-				observableType = get_optional_string_attribute(jsonObj, "@type", "")
-				# Only the ObservableRelationship is considered.
-				# Others (i.e. uco-identity:Identity, case-investigation:InvestigativeAction,
-				# uco-tool:Tool, uco-identity:Organization, uco-role:Role,
-				# case-investigation:ProvenanceRecord, case-investigation:InvestigativeAction)
-				# are ignored.
-				if observableType == "uco-observable:ObservableRelationship":
-					if jsonObj["uco-core:kindOfRelationship"] == "Attached_To":
-						processRelationAttachments(jsonObj)
-					elif jsonObj["uco-core:kindOfRelationship"] == "Mapped_By":
-						processRelationMappedBy(jsonObj)
-					elif jsonObj["uco-core:kindOfRelationship"] == "Connected_To":
-						processRelationConnectedTo(jsonObj)
-			else:
-				if isinstance(dataFacets, dict):
-					dataFacets = [dataFacets]
-
-				for facet in dataFacets:
-					assert isinstance(facet, dict)
-					facet_type = facet["@type"]
-					objectType: str
-					if isinstance(facet_type, str):
-						objectType = facet_type
-					elif isinstance(facet_type, list):
-						assert isinstance(facet_type[0], str)
-						objectType = facet_type[0] # SocialMediaActivityFacet
-					else:
-						raise TypeError("Unexpected type for property %r: %r." % (facet_type, type(facet_type)))
-					# print(f"objectType={objectType}")
-					if objectType == "uco-observable:MessageFacet":
-						processMessage(uuid_object=uuid_object, facet=facet)
-					elif objectType == "uco-observable:SMSMessageFacet":
-						processMessage(uuid_object=uuid_object, facet=facet)
-					elif objectType == "uco-observable:BluetoothAddressFacet":
-						processBluetooth(uuid_object=uuid_object, facet=facet)
-					elif objectType == "uco-observable:CellSiteFacet":
-						processCellSite(uuid_object=uuid_object, facet=facet)
-					elif objectType == "uco-observable:BrowserCookieFacet":
-						processCookie(uuid_object=uuid_object, facet=facet)
-					elif objectType == "uco-location:LatLongCoordinatesFacet":
-						processCoordinate(uuid_object=uuid_object, facet=facet)
-					elif objectType == "uco-observable:MessageThreadFacet":
-						processThread(uuid_object=uuid_object, facet=facet)
-					elif objectType == "uco-observable:AccountFacet":
-						processAccount(uuid_object=uuid_object, facet=facet, kind="AccountFacet")
-					elif objectType == "uco-observable:ApplicationAccountFacet":
-						processAccount(uuid_object=uuid_object, facet=facet, kind="ApplicationAccountFacet")
-					elif objectType == "uco-observable:DigitalAccountFacet" :
-						processAccount(uuid_object=uuid_object, facet=facet, kind="DigitalAccountFacet")
-					elif objectType == "uco-observable:PhoneAccountFacet":
-						processAccount(uuid_object=uuid_object, facet=facet, kind="PhoneAccountFacet")
-					elif objectType == "uco-observable:EmailAccountFacet":
-						processEmailAccount(uuid_object=uuid_object, facet=facet)
-					elif objectType == "uco-observable:ApplicationFacet":
-						processApplication(uuid_object=uuid_object, facet=facet)
-					elif objectType == "uco-observable:EmailAddressFacet":
-						processEmailAddress(uuid_object=uuid_object, facet=facet)
-					elif objectType == "uco-observable:CalendarEntryFacet":
-						processCalendar(uuid_object=uuid_object, facet=facet)
-					elif objectType == "uco-observable:CallFacet":
-						processCall(uuid_object=uuid_object, facet=facet)
-					elif objectType == "uco-observable:EmailMessageFacet":
-						processEmailMessage(jsonObj, facet)
-					elif objectType == "uco-observable:FileFacet":
-						processFile(jsonObj, facet)
-					elif objectType == "uco-observable:URLFacet":
-						processURL(jsonObj, facet)
-					elif objectType == "uco-observable:URLHistoryFacet":
-						processURLHistory(jsonObj, facet)
-					elif objectType == "uco-observable:BrowserBookmarkFacet":
-						processWebBookmark(jsonObj, facet)
-					elif objectType == "uco-observable:WirelessNetworkConnectionFacet":
-						processWirelessNetwork(jsonObj, facet)
-					elif objectType == "drafting:SocialMediaActivityFacet":
-						processSocialMediaActivities(jsonObj, facet)
-					elif objectType == "uco-observable:EventRecordFacet":
-						processEvents(jsonObj, facet)
-		process_id_messages()
-		process_id_cookies()
-		process_id_email_accounts()
-		process_id_email_messages()
-		process_attachments()
-	except Exception as e:
-		print(C_CYAN + "ERROR: in Loading the JSON structure! \n\n" + C_BLACK + "\n\n")
-		print (e)
-		sys.exit('Load JSON file failed. \n')
-
-	f.close()
-	print(C_CYAN + "\n\nEnd Observables processing!" + C_BLACK + "\n\n")
-
-	i = 1
+C_GREEN = '\033[32m'
+C_RED = '\033[31m'
+C_BLACK = '\033[0m'
+C_CYAN = '\033[36m'
+C_CLEAR_LINE = '\033[K'
+
+# Artifact tables of a case, by name, with the class of their records: each
+# session holds a table of each (see CaseSession), saved in the snapshots of
+# the processed cases.
+ARTIFACT_TABLES: dict[str, type[Record]] = {
+	"chatMessages": ChatMessage,
+	"chatThreads": ChatThread,
+	"cookies": Cookie,
+	"geo_coordinates": Coordinate,
+	"cell_sites": CellSite,
+	"bluetooths": Bluetooth,
+	"searched_items": SearchedItem,
+	"social_media_activities": SocialMediaActivity,
+	"events": Event,
+	"relationAttachmentsTo": Attachment,
+	"relationMappedBy": MappedBy,
+	"relationConnectedTo": ConnectedTo,
+	"smsMessages": SmsMessage,
+	"accounts": Account,
+	"emailAddresses": EmailAddress,
+	"emailAccounts": EmailAccount,
+	"applications": Application,
+	"phoneCalls": Call,
+	"calendars": Calendar,
+	"emailMessages": EmailMessage,
+	"filesUncategorized": File,
+	"filesImage": File,
+	"filesAudio": File,
+	"filesText": File,
+	"filesPDF": File,
+	"filesWord": File,
+	"filesRTF": File,
+	"filesVideo": File,
+	"filesArchive": File,
+	"filesDatabase": File,
+	"filesApplication": File,
+	"webURLs": URL,
+	"webURLHistory": WebHistory,
+	"webSearchTerm": WebSearchTerm,
+	"webBookmark": WebBookmark,
+	"wireless_net": WirelessNet
+}
+
+# File tables, by the key of their node in the tree
+FILE_CATEGORIES: dict[str, str] = {
+	':Images': "filesImage",
+	':Audios': "filesAudio",
+	':Texts': "filesText",
+	':PDFs': "filesPDF",
+	':Words': "filesWord",
+	':RTFs': "filesRTF",
+	':Videos': "filesVideo",
+	':Archives': "filesArchive",
+	':Databases': "filesDatabase",
+	':Applications': "filesApplication",
+	':Uncategorized': "filesUncategorized"
+}
+
+# Tables whose records are complete once appended: no reference of theirs is
+# resolved and they are not looked up, so they are written while the case is
+# processed when it is exported (see export_case) or stored in a database; the
+# other tables are held in memory until the references are resolved.
+STREAMED_TABLES = ("bluetooths", "calendars", "cell_sites", "events", "relationConnectedTo",
+	"webSearchTerm", "wireless_net") + tuple(FILE_CATEGORIES.values())
+
+# Formats of the store of the processed cases: the columnar snapshot, mapped in
+# memory, or an SQLite database, written while the case is processed.
+STORAGES = ("columnar", "sqlite")
+
+# Fields indexed in the SQLite databases, besides the id: the timestamps and
+# the categorical fields.
+INDEXED_FIELDS = ("sentTime", "startTime", "endTime", "observableCreatedTime", "searchLaunchedTime",
+	"accessedTime", "expirationTime", "lastVisited", "mappedByStartDate",
+	"application", "messageType", "cellSiteType", "eventType", "activityType", "cookieApp", "tag",
+	"browserInformation")
+
+# The records refer to each other by the integer keys of the @id of the
+# objects (see IdInterner), whose IRIs are saved in the IRI_TABLE of the
+# snapshots.
+IRI_TABLE = "iris"
+
+# Fields of an account set by each kind of facet (see processAccount)
+ACCOUNT_FACET_FIELDS = {
+	"AccountFacet": ("accountIdentifier",),
+	"ApplicationAccountFacet": ("application",),
+	"PhoneAccountFacet": ("phoneAccount", "displayName"),
+	"DigitalAccountFacet": ("displayName",)
+}
+
+@profiled
+def build_tree_data(session):
 	totMessages = 0
 
 	# for w in webURLs:
 	# 	print(f"@id= {w['@id']}")
 	# 	print(f"URL= {w['uco-observable:url']}")
 
-	treeData.insert(0, {'unique_id': ':00000000', 'parent_id': '0', 'short_name': 'Cyber items' })
+	session.treeData.clear()
+	session.treeData.append({'unique_id': ':00000000', 'parent_id': '0', 'short_name': 'Cyber items' })
 
-	totAccounts = len(accounts)
+	totAccounts = len(session.accounts)
 	if totAccounts > 0:
 		accountText = 'Accounts ' + '(' + number_with_dots(totAccounts) + ')'
-		treeData.append({'unique_id': ':Accounts', 'parent_id': ':00000000', 'short_name': accountText })
+		session.treeData.append({'unique_id': ':Accounts', 'parent_id': ':00000000', 'short_name': accountText })
 
-	totCalendars = len(calendars)
+	totCalendars = len(session.calendars)
 	if totCalendars > 0:
 		calendarText = 'Calendars ' + '(' + number_with_dots(totCalendars) + ')'
-		treeData.append({'unique_id': ':Calendars', 'parent_id': ':00000000', 'short_name': calendarText })
+		session.treeData.append({'unique_id': ':Calendars', 'parent_id': ':00000000', 'short_name': calendarText })
 
-	totCalls = len(phoneCalls)
+	totCalls = len(session.phoneCalls)
 	if totCalls > 0:
 		callText = 'Calls ' + '(' + number_with_dots(totCalls) + ')'
-		treeData.append({'unique_id': ':Calls', 'parent_id': ':00000000', 'short_name': callText })
+		session.treeData.append({'unique_id': ':Calls', 'parent_id': ':00000000', 'short_name': callText })
 
-	totCellSites = len(cell_sites)
+	totCellSites = len(session.cell_sites)
 	if totCellSites > 0:
 		cellSiteText = 'CellSite ' + '(' + number_with_dots(totCellSites) + ')'
-		treeData.append({'unique_id': ':CellSites', 'parent_id': ':00000000', 'short_name': cellSiteText })
+		session.treeData.append({'unique_id': ':CellSites', 'parent_id': ':00000000', 'short_name': cellSiteText })
 
-	for t in chatThreads:
-		id = t['@id']
-		text = 'chat N. ' + str(i) + ' (' + number_with_dots(t["thread:length"]) + ')'
-		totMessages += int(t["thread:length"])
-		treeData.append({'unique_id': id, 'parent_id': ':ChatMessages', 'short_name': text})
-		i = i + 1
+	# The nodes of the single threads are added by TreeModel on demand
+	for t in session.chatThreads:
+		totMessages += int(t.length)
 
-	totChats = len(chatThreads)
+	totChats = len(session.chatThreads)
 	if totChats > 0:
 		chatText = 'Chats ' + '(' + number_with_dots(totChats) + '/' + number_with_dots(totMessages) + ')'
-		treeData.append({'unique_id': ':ChatMessages', 'parent_id': ':00000000', 'short_name': chatText})
+		session.treeData.append({'unique_id': ':ChatMessages', 'parent_id': ':00000000', 'short_name': chatText})
 
-	totCookies = len(cookies)
+	totCookies = len(session.cookies)
 	if totCookies > 0:
 		cookieText = 'Cookies ' + '(' + number_with_dots(totCookies) + ')'
-		treeData.append({'unique_id': ':Cookies', 'parent_id': ':00000000', 'short_name': cookieText })
+		session.treeData.append({'unique_id': ':Cookies', 'parent_id': ':00000000', 'short_name': cookieText })
 
-	totBluetooths = len(bluetooths)
+	totBluetooths = len(session.bluetooths)
 	if totBluetooths > 0:
 		btText = 'Device connection (Bluetooth) ' + '(' + number_with_dots(totBluetooths) + ')'
-		treeData.append({'unique_id': ':Bluetooths', 'parent_id': ':00000000', 'short_name': btText })
+		session.treeData.append({'unique_id': ':Bluetooths', 'parent_id': ':00000000', 'short_name': btText })
 
-	totEmails = len(emailMessages)
+	totEmails = len(session.emailMessages)
 	if totEmails > 0:
 		emailText = 'Emails ' + '(' + number_with_dots(totEmails) + ')'
-		treeData.append({'unique_id': ':EmailMessages', 'parent_id': ':00000000', 'short_name': emailText })
+		session.treeData.append({'unique_id': ':EmailMessages', 'parent_id': ':00000000', 'short_name': emailText })
 
-	totEvents = len(events)
+	totEvents = len(session.events)
 	if totEvents > 0:
 		eventText = 'Events ' + '(' + number_with_dots(totEvents) + ')'
-		treeData.append({'unique_id': ':Events', 'parent_id': ':00000000', 'short_name': eventText })
+		session.treeData.append({'unique_id': ':Events', 'parent_id': ':00000000', 'short_name': eventText })
 
-	totFiles = (len(filesUncategorized) + len(filesImage) + len(filesArchive) +
-				len(filesVideo) + len(filesAudio) + + len(filesText) + len(filesDatabase) +
-				len(filesApplication) + len(filesPDF) + len(filesWord) + len(filesRTF))
+	totFiles = (len(session.filesUncategorized) + len(session.filesImage) + len(session.filesArchive) +
+				len(session.filesVideo) + len(session.filesAudio) + + len(session.filesText) + len(session.filesDatabase) +
+				len(session.filesApplication) + len(session.filesPDF) + len(session.filesWord) + len(session.filesRTF))
 	fileText = 'Files ' + '(' + number_with_dots(totFiles) + ')'
-	treeData.append({'unique_id': ':Files', 'parent_id': ':00000000', 'short_name': fileText })
+	session.treeData.append({'unique_id': ':Files', 'parent_id': ':00000000', 'short_name': fileText })
 
-	totImages = len(filesImage)
+	totImages = len(session.filesImage)
 	if totImages > 0:
 		imageText = 'Images ' + '(' + number_with_dots(totImages) + ')'
-		treeData.append({'unique_id': ':Images', 'parent_id': ':Files', 'short_name': imageText })
+		session.treeData.append({'unique_id': ':Images', 'parent_id': ':Files', 'short_name': imageText })
 
-	totAudios = len(filesAudio)
+	totAudios = len(session.filesAudio)
 	if totAudios > 0:
 		audioText = 'Audios ' + '(' + number_with_dots(totAudios) + ')'
-		treeData.append({'unique_id': ':Audios', 'parent_id': ':Files', 'short_name': audioText })
+		session.treeData.append({'unique_id': ':Audios', 'parent_id': ':Files', 'short_name': audioText })
 
-	totTexts = len(filesText)
+	totTexts = len(session.filesText)
 	if totTexts > 0:
 		textText = 'Texts ' + '(' + number_with_dots(totTexts) + ')'
-		treeData.append({'unique_id': ':Texts', 'parent_id': ':Files', 'short_name': textText })
+		session.treeData.append({'unique_id': ':Texts', 'parent_id': ':Files', 'short_name': textText })
 
-	totPDF = len(filesPDF)
+	totPDF = len(session.filesPDF)
 	if totPDF > 0:
 		pdfText = 'PDFs ' + '(' + number_with_dots(totPDF) + ')'
-		treeData.append({'unique_id': ':PDFs', 'parent_id': ':Files', 'short_name': pdfText })
+		session.treeData.append({'unique_id': ':PDFs', 'parent_id': ':Files', 'short_name': pdfText })
 
-	totWord = len(filesWord)
+	totWord = len(session.filesWord)
 	if totWord > 0:
 		wordText = 'Words ' + '(' + number_with_dots(totWord) + ')'
-		treeData.append({'unique_id': ':Words', 'parent_id': ':Files', 'short_name': wordText })
+		session.treeData.append({'unique_id': ':Words', 'parent_id': ':Files', 'short_name': wordText })
 
-	totWord = len(filesRTF)
+	totWord = len(session.filesRTF)
 	if totWord > 0:
 		rtfText = 'RTFs ' + '(' + number_with_dots(totWord) + ')'
-		treeData.append({'unique_id': ':RTFs', 'parent_id': ':Files', 'short_name': rtfText })
+		session.treeData.append({'unique_id': ':RTFs', 'parent_id': ':Files', 'short_name': rtfText })
 
-	totVideos = len(filesVideo)
+	totVideos = len(session.filesVideo)
 	if totVideos > 0:
 		videoText = 'Videos ' + '(' + number_with_dots(totVideos) + ')'
-		treeData.append({'unique_id': ':Videos', 'parent_id': ':Files', 'short_name': videoText })
+		session.treeData.append({'unique_id': ':Videos', 'parent_id': ':Files', 'short_name': videoText })
 
-	totArchives = len(filesArchive)
+	totArchives = len(session.filesArchive)
 	if totArchives > 0:
 		archiveText = 'Archives ' + '(' + number_with_dots(totArchives) + ')'
-		treeData.append({'unique_id': ':Archives', 'parent_id': ':Files', 'short_name': archiveText })
+		session.treeData.append({'unique_id': ':Archives', 'parent_id': ':Files', 'short_name': archiveText })
 
-	totDatabases = len(filesDatabase)
+	totDatabases = len(session.filesDatabase)
 	if totDatabases > 0:
 		databaseText = 'Databases ' + '(' + number_with_dots(totDatabases) + ')'
-		treeData.append({'unique_id': ':Databases', 'parent_id': ':Files', 'short_name': databaseText })
+		session.treeData.append({'unique_id': ':Databases', 'parent_id': ':Files', 'short_name': databaseText })
 
-	totApplications = len(filesApplication)
+	totApplications = len(session.filesApplication)
 	if totApplications > 0:
 		applicationText = 'Applications ' + '(' + number_with_dots(totApplications) + ')'
-		treeData.append({'unique_id': ':Applications', 'parent_id': ':Files', 'short_name': applicationText })
+		session.treeData.append({'unique_id': ':Applications', 'parent_id': ':Files', 'short_name': applicationText })
 
-	totUncategorized = len(filesUncategorized)
+	totUncategorized = len(session.filesUncategorized)
 	if totUncategorized > 0:
 		uncategorizedText = 'Uncategorized ' + '(' + number_with_dots(totUncategorized) + ')'
-		treeData.append({'unique_id': ':Uncategorized', 'parent_id': ':Files', 'short_name': uncategorizedText })
+		session.treeData.append({'unique_id': ':Uncategorized', 'parent_id': ':Files', 'short_name': uncategorizedText })
 
-	totLocationDevice = len(relationMappedBy)
+	totLocationDevice = len(session.relationMappedBy)
 	if totLocationDevice > 0:
 		locationText = 'Location device ' + '(' + number_with_dots(totLocationDevice) + ')'
-		treeData.append({'unique_id': ':LocationDevice', 'parent_id': ':00000000', 'short_name': locationText })
+		session.treeData.append({'unique_id': ':LocationDevice', 'parent_id': ':00000000', 'short_name': locationText })
 
-	totSearchedItems = len(searched_items)
+	totSearchedItems = len(session.searched_items)
 	if totSearchedItems > 0:
 		searchedItemsText = 'Searched items ' + '(' + number_with_dots(totSearchedItems) + ')'
-		treeData.append({'unique_id': ':SearchedItems', 'parent_id': ':00000000', 'short_name': searchedItemsText })
+		session.treeData.append({'unique_id': ':SearchedItems', 'parent_id': ':00000000', 'short_name': searchedItemsText })
 
-	totSocialMediaActivities = len(social_media_activities)
+	totSocialMediaActivities = len(session.social_media_activities)
 	if totSocialMediaActivities > 0:
 		socialMediaActivitiesText = 'Social media activities ' + '(' + number_with_dots(totSocialMediaActivities) + ')'
-		treeData.append({'unique_id': ':SocialMediaActivities', 'parent_id': ':00000000', 'short_name': socialMediaActivitiesText })
+		session.treeData.append({'unique_id': ':SocialMediaActivities', 'parent_id': ':00000000', 'short_name': socialMediaActivitiesText })
 
-	totSMSs = len(smsMessages)
+	totSMSs = len(session.smsMessages)
 	if totSMSs > 0:
 		smsText = 'SMSs ' + '(' + number_with_dots(totSMSs) + ')'
-		treeData.append({'unique_id': ':Sms', 'parent_id': ':00000000', 'short_name': smsText })
+		session.treeData.append({'unique_id': ':Sms', 'parent_id': ':00000000', 'short_name': smsText })
 
-	totWebBookmarks = len(webBookmark)
+	totWebBookmarks = len(session.webBookmark)
 	if totWebBookmarks > 0:
 		webBookmarkText = 'Web Bookmarks ' + '(' + number_with_dots(totWebBookmarks) + ')'
-		treeData.append({'unique_id': ':WebBookmarks', 'parent_id': ':00000000', 'short_name': webBookmarkText })
+		session.treeData.append({'unique_id': ':WebBookmarks', 'parent_id': ':00000000', 'short_name': webBookmarkText })
 
-	totWebs = len(webURLHistory)
+	totWebs = len(session.webURLHistory)
 	if totWebs > 0:
 		webText = 'Web Histories ' + '(' + number_with_dots(totWebs) + ')'
-		treeData.append({'unique_id': ':WebHistories', 'parent_id': ':00000000', 'short_name': webText })
+		session.treeData.append({'unique_id': ':WebHistories', 'parent_id': ':00000000', 'short_name': webText })
 
-	totWirelessNet = len(wireless_net)
+	totWirelessNet = len(session.wireless_net)
 	if totWirelessNet > 0:
 		wirelessNetText = 'Wireless Net ' + '(' + number_with_dots(totWirelessNet) + ')'
-		treeData.append({'unique_id': ':WirelessNet', 'parent_id': ':00000000', 'short_name': wirelessNetText })
+		session.treeData.append({'unique_id': ':WirelessNet', 'parent_id': ':00000000', 'short_name': wirelessNetText })
 
-	totSearch = len(webSearchTerm)
+	totSearch = len(session.webSearchTerm)
 	if totSearch > 0:
 		webSearchText = 'Web Search Terms ' + '(' + number_with_dots(totSearch) + ')'
-		treeData.append({'unique_id': ':WebSearchTerms', 'parent_id': ':00000000', 'short_name': webSearchText })
-
-#--- Set the UI layout
-	_view = view(treeData, tableData)
-	_view.setGeometry(50, 50, 1400, 800)
-	_view.setWindowTitle('Cyber items view - ' + args.input_jsonld + ' (n. Observables: ' + number_with_dots(nObjects) + ')')
-	_view.show()
-	sys.exit(app.exec())
+		session.treeData.append({'unique_id': ':WebSearchTerms', 'parent_id': ':00000000', 'short_name': webSearchText })
+
+def start_profiling(path: str) -> None:
+	# The processing is profiled from now on, and the profile written to path
+	# on exit, whatever the mode.
+	global profiler
+	profiler = Profiler()
+	profiler.start()
+	atexit.register(write_profile, profiler, path)
+
+def write_profile(profiler: Profiler, path: str) -> None:
+	profiler.stop()
+	try:
+		report = profiler.write(path)
+	except Exception as e:
+		print(C_RED + "ERROR: in writing the profile to " + path + C_BLACK)
+		print (e)
+		return
+	print(C_CYAN + "\nProfile written to " + path + C_BLACK + "\n")
+	print(format_summary(report))
+
+def main():
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--debug", action="store_true")
+	parser.add_argument("--dry-run", action="store_true", help="Run application, exiting without initiating GUI.")
+	parser.add_argument("--stream", action="store_true", help="Read the observables one at a time instead of loading the whole JSON document in memory.")
+	parser.add_argument("--jobs", type=int, default=1, help="Number of processes decoding and processing the input file, or only decoding it with --dry-run (default: %(default)s).")
+	parser.add_argument("--cache-dir", default=None, help="Directory of the snapshots of the processed cases (default: %s)." % cache.default_cache_dir())
+	parser.add_argument("--cache-size", type=int, default=cache.DEFAULT_MAX_SIZE >> 20, help="Size cap of the snapshot cache, in MB (default: %(default)s).")
+	parser.add_argument("--store", choices=STORAGES, default=STORAGES[0], help="Format of the store of the processed case, kept in the snapshot cache (default: %(default)s).")
+	parser.add_argument("--no-cache", action="store_true", help="Always process the input file, without reading or writing the snapshot cache.")
+	parser.add_argument("--export", metavar="DIR", default=None, help="Process the input file without the GUI, writing the artifact tables to files in DIR.")
+	parser.add_argument("--export-format", choices=export.FORMATS, default="csv", help="Format of the files written by --export (default: %(default)s).")
+	parser.add_argument("--profile", metavar="REPORT", default=None, help="Profile the processing by stage and the memory, writing the JSON report to REPORT and its summary to the standard output; the tracing of the memory slows the processing down.")
+	parser.add_argument("input_jsonld")
+	args = parser.parse_args()
+
+	logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+	if args.profile:
+		start_profiling(args.profile)
+
+#--- Read input file in CASE-JSON format
+	try:
+		f = codecs.open(args.input_jsonld, 'r', encoding='utf-8')
+	except Exception as e:
+		print(C_RED + '\n' + "ERROR in trying to open the file " + args.input_jsonld)
+		print (e)
+		sys.exit('Open file failed.')
+	if args.dry_run:
+		try:
+			if args.jobs > 1:
+				# The objects are decoded by chunks in the processes, and only
+				# counted.
+				with profile_stage("chunks"):
+					nObjects = sum(parallel.map_file(args.input_jsonld, len, args.jobs))
+				logging.info("%s objects decoded by %d processes.", number_with_dots(nObjects), args.jobs)
+			elif args.stream:
+				for _ in profile_iterable("stream", iter_case_objects(f)):
+					pass
+			else:
+				print(C_CYAN + "Load JSON structure, it might take some time, please wait ...\n")
+				with profile_stage("json.load"):
+					json.load(f)
+		except Exception as e:
+			print(C_CYAN + "ERROR: in Loading the JSON structure! \n\n" + C_BLACK + "\n\n")
+			print (e)
+			sys.exit('Load JSON file failed. \n')
+		logging.info("Exiting dry run.")
+		sys.exit(0)
+	if args.export:
+		try:
+			rows = export_case(f, args.stream, Path(args.export), args.export_format, args.jobs)
+		except Exception as e:
+			print(C_RED + "ERROR: in exporting the case to " + args.export + C_BLACK)
+			print (e)
+			sys.exit('Export failed. \n')
+		for name, n in rows.items():
+			if n:
+				logging.info("%10s %s", number_with_dots(n), name)
+		sys.exit(0)
+
+	cacheDir = None
+	if not args.no_cache:
+		cacheDir = Path(args.cache_dir) if args.cache_dir else cache.default_cache_dir()
+	# Qt is loaded only now that the window is opened.
+	try:
+		from .gui import run_viewer
+	except ImportError as e:
+		print(C_RED + "ERROR: PyQt6 is needed to open the viewer, --dry-run and --export run without it." + C_BLACK)
+		print (e)
+		sys.exit('Import PyQt6 failed.')
+	sys.exit(run_viewer(f, args.stream, args.input_jsonld, cacheDir, args.cache_size << 20, args.store, args.jobs))
 
 if __name__ == '__main__':
 	main()
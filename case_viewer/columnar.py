@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+Columnar store of the artifact tables, read through mmap.
+
+Every value of every table is an entry of a single string heap, shared by
+all the tables, so a value repeated across the artifacts (an application
+name, a MIME type, an account label) is stored once, as long as it is short
+and has been met among the last HEAP_CACHE_ENTRIES short values.  A table is
+a set of columns, one per key of its records, each one a fixed-width array of
+heap entry numbers.  The file layout is:
+
+* the magic bytes ``CASECOL2``;
+* for each table, the heap entries of its new values, written as the
+  records are read, followed by the column arrays (``uint32``) and the row
+  order by ``id`` if the table has one (``uint32``), each array aligned to 8
+  bytes;
+* the heap offsets (``uint64``), positions in the file of the heap entries:
+  an entry ends where the next one starts, and an entry is added after the
+  last new entry of a table, where its arrays start, which no column refers
+  to;
+* a JSON directory with the position of the sections and the metadata;
+* the position of the directory (``uint64``) followed by the magic bytes.
+
+The reader maps the file and decodes a value only when it is accessed, so
+neither the tables nor their rows are materialised in memory.  The rows
+having given values are selected by the heap entries of their columns, each
+entry being decoded once.  The values of
+a row are read either by key or as attributes, like the fields of the records
+the table has been written from.
+"""
+
+import json
+import mmap
+import sys
+from array import array
+from collections import OrderedDict
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, Literal, Mapping, Optional, Protocol, Sequence, Union, overload
+
+MAGIC = b"CASECOL2"
+
+# Values deduplicated in the heap: the last entries of at most
+# HEAP_CACHE_VALUE_SIZE bytes, e.g. application names or MIME types, rather
+# than message texts.
+HEAP_CACHE_ENTRIES = 1 << 16
+HEAP_CACHE_VALUE_SIZE = 256
+
+# Heap entry of the keys missing from a record.
+MISSING = 0xFFFFFFFF
+
+# Key of the values the rows of a table are looked up by.
+ID_KEY = "id"
+
+# Tags of the heap entries: a string is stored as UTF-8, anything else as JSON.
+_STRING = b"s"
+_JSON = b"j"
+
+
+class RowSource(Protocol):
+	"""
+	A table the values of a Row are read from: a Table, or the table of another store.
+	"""
+
+	def keys(self) -> list[str]: ...
+
+	def get(self, row: int, key: str) -> Any: ...
+
+	def has(self, row: int, key: str) -> bool: ...
+
+
+class SupportsItems(Protocol):
+	"""
+	A record to be written: a dict, or any object listing its values by key.
+	"""
+
+	def items(self) -> Iterable[tuple[str, Any]]: ...
+
+
+def _encode(value: Any) -> bytes:
+	if isinstance(value, str):
+		return _STRING + value.encode("utf-8")
+	return _JSON + json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def _decode(data: Union[bytes, memoryview]) -> Any:
+	if data[:1] == _STRING:
+		return str(data[1:], "utf-8")
+	return json.loads(bytes(data[1:]))
+
+
+def _align(fp: BinaryIO) -> int:
+	position = fp.tell()
+	if position % 8:
+		fp.write(b"\0" * (8 - position % 8))
+	return fp.tell()
+
+
+def write_store(fp: BinaryIO, tables: Mapping[str, Sequence[SupportsItems]], meta: Optional[Mapping[str, Any]] = None) -> None:
+	"""
+	This method writes the tables, lists of records with JSON-serialisable values, to a binary file in the columnar format.  The metadata are stored in the directory.  The values are written to the file as they are read, so only the columns of a table and the heap offsets are held in memory.
+
+	>>> import io
+	>>> fp = io.BytesIO()
+	>>> write_store(fp, {"apps": [{"id": 2, "name": "WhatsApp"}, {"id": 1, "name": "WhatsApp"}], "calls": [{"id": 3}]})
+	>>> fp.getvalue()[8:21]
+	b'j2sWhatsAppj1'
+	"""
+	heap_ids: OrderedDict[bytes, int] = OrderedDict()
+	heap_offsets = array("Q")
+	position = fp.write(MAGIC)
+
+	def intern(value: Any) -> int:
+		nonlocal position
+		data = _encode(value)
+		cached = len(data) <= HEAP_CACHE_VALUE_SIZE
+		if cached:
+			n = heap_ids.get(data)
+			if n is not None:
+				heap_ids.move_to_end(data)
+				return n
+		n = len(heap_offsets)
+		heap_offsets.append(position)
+		position += fp.write(data)
+		if cached:
+			heap_ids[data] = n
+			if len(heap_ids) > HEAP_CACHE_ENTRIES:
+				heap_ids.popitem(last=False)
+		return n
+
+	directory: dict[str, Any] = {"byteorder": sys.byteorder, "meta": dict(meta or {}), "tables": {}}
+	for name, records in tables.items():
+		columns: dict[str, array[int]] = {}
+		ids: list[Any] = [None] * len(records)
+		first = len(heap_offsets)
+		for row, record in enumerate(records):
+			for key, value in record.items():
+				column = columns.get(key)
+				if column is None:
+					column = columns[key] = array("I", [MISSING]) * len(records)
+				column[row] = intern(value)
+				if key == ID_KEY:
+					ids[row] = value
+		# The entry ending the last new entry of the table
+		if len(heap_offsets) > first:
+			heap_offsets.append(position)
+		table: dict[str, Any] = {"rows": len(records), "columns": {}}
+		for key, column in columns.items():
+			table["columns"][key] = _align(fp)
+			column.tofile(fp)
+		if ID_KEY in columns:
+			order = array("I", sorted(range(len(records)), key=lambda row: (ids[row], row)))
+			table["order"] = _align(fp)
+			order.tofile(fp)
+		position = fp.tell()
+		directory["tables"][name] = table
+	directory["heap_entries"] = len(heap_offsets) - 1
+	directory["heap_offsets"] = _align(fp)
+	heap_offsets.tofile(fp)
+	directory_offset = _align(fp)
+	fp.write(json.dumps(directory).encode("utf-8"))
+	fp.write(array("Q", [directory_offset]).tobytes())
+	fp.write(MAGIC)
+
+
+class ColumnarStore:
+	"""
+	Read-only view of a file written by write_store.
+
+	>>> import io, os, tempfile
+	>>> records = [{"id": "kb:b", "app": "WhatsApp", "to": ["x", "y"]}, {"id": "kb:a", "app": "WhatsApp", "size": 10}]
+	>>> with tempfile.NamedTemporaryFile(delete=False) as fp:
+	...     write_store(fp, {"messages": records, "empty": []}, {"nObjects": 2})
+	>>> store = ColumnarStore(fp.name)
+	>>> store.meta
+	{'nObjects': 2}
+	>>> messages = store.table("messages")
+	>>> len(messages), messages[0]["to"], messages[1]["size"], messages[-1].app
+	(2, ['x', 'y'], 10, 'WhatsApp')
+	>>> dict(messages[1])
+	{'id': 'kb:a', 'app': 'WhatsApp', 'size': 10}
+	>>> "size" in messages[0], messages[0].get("size", "-")
+	(False, '-')
+	>>> store.lookup("messages", "kb:b")["to"], store.lookup("messages", "kb:c"), store.lookup("calls", "kb:a")
+	(['x', 'y'], None, None)
+	>>> len(store.table("empty")), store.heap_entries
+	(0, 5)
+	>>> whatsapp = messages.select({"app": "WhatsApp"})
+	>>> len(whatsapp), [row.id for row in whatsapp], len(messages.select({"app": "WhatsApp", "size": 10})), len(messages.select({"from": "x"}))
+	(2, ['kb:b', 'kb:a'], 1, 0)
+	>>> messages.distinct("app"), messages.distinct("size"), messages.distinct("from")
+	(['WhatsApp'], [10], [])
+	>>> store.close()
+	>>> os.remove(fp.name)
+	"""
+
+	def __init__(self, path: str) -> None:
+		self.path = path
+		with open(path, "rb") as fp:
+			self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+		self._view = memoryview(self._mmap)
+		size = len(self._mmap)
+		if size < 24 or self._view[:8] != MAGIC or self._view[size - 8:] != MAGIC:
+			self.close()
+			raise ValueError("Not a columnar store: %s." % path)
+		directory_offset = self._view[size - 16:size - 8].cast("Q")[0]
+		directory = json.loads(bytes(self._view[directory_offset:size - 16]))
+		if directory["byteorder"] != sys.byteorder:
+			self.close()
+			raise ValueError("Columnar store written with a different byte order: %s." % path)
+		self.meta: dict[str, Any] = directory["meta"]
+		self.heap_entries: int = directory["heap_entries"]
+		self._heap_offsets = self._array(directory["heap_offsets"], self.heap_entries + 1, "Q")
+		self._tables: dict[str, Table] = {}
+		for name, table in directory["tables"].items():
+			rows = table["rows"]
+			columns = {key: self._array(offset, rows, "I") for key, offset in table["columns"].items()}
+			order = self._array(table["order"], rows, "I") if "order" in table else None
+			self._tables[name] = Table(self, rows, columns, order)
+
+	def _array(self, offset: int, length: int, typecode: Literal["I", "Q"]) -> "memoryview[int]":
+		itemsize = 8 if typecode == "Q" else 4
+		return self._view[offset:offset + length * itemsize].cast(typecode)
+
+	def value(self, n: int) -> Any:
+		return _decode(self._view[self._heap_offsets[n]:self._heap_offsets[n + 1]])
+
+	def table_names(self) -> list[str]:
+		return list(self._tables)
+
+	def table(self, name: str) -> "Table":
+		return self._tables[name]
+
+	def lookup(self, name: str, id: Any) -> Optional["Row"]:
+		table = self._tables.get(name)
+		if table is None:
+			return None
+		return table.lookup(id)
+
+	def close(self) -> None:
+		# The views on the mapping must be released before it is closed.
+		for table in getattr(self, "_tables", {}).values():
+			table.release()
+		for view in (getattr(self, "_heap_offsets", None), self._view):
+			if view is not None:
+				view.release()
+		self._mmap.close()
+
+
+class Table(Sequence["Row"]):
+	def __init__(self, store: ColumnarStore, rows: int, columns: dict[str, memoryview], order: Optional[memoryview]) -> None:
+		self._store = store
+		self._rows = rows
+		self._columns = columns
+		self._order = order
+
+	def __len__(self) -> int:
+		return self._rows
+
+	@overload
+	def __getitem__(self, index: int) -> "Row": ...
+
+	@overload
+	def __getitem__(self, index: slice) -> list["Row"]: ...
+
+	def __getitem__(self, index: Union[int, slice]) -> Union["Row", list["Row"]]:
+		if isinstance(index, slice):
+			return [Row(self, row) for row in range(*index.indices(self._rows))]
+		if index < 0:
+			index += self._rows
+		if not 0 <= index < self._rows:
+			raise IndexError("Row out of range.")
+		return Row(self, index)
+
+	def keys(self) -> list[str]:
+		return list(self._columns)
+
+	def get(self, row: int, key: str) -> Any:
+		n = self._columns[key][row]
+		if n == MISSING:
+			raise KeyError(key)
+		return self._store.value(n)
+
+	def has(self, row: int, key: str) -> bool:
+		column = self._columns.get(key)
+		return column is not None and column[row] != MISSING
+
+	def lookup(self, id: Any) -> Optional["Row"]:
+		"""
+		This method returns the first row with the given id, by binary search on the id order.
+		"""
+		if self._order is None:
+			return None
+		order = self._order
+		ids = self._columns[ID_KEY]
+		value = self._store.value
+		position = _bisect_left(self._rows, id, lambda i: value(ids[order[i]]))
+		if position < self._rows and value(ids[order[position]]) == id:
+			return Row(self, order[position])
+		return None
+
+	def select(self, values: Mapping[str, Any]) -> "Selection":
+		"""
+		This method returns the rows whose values are the given ones, in row order.  A value repeated across the rows is mostly a single heap entry, so the rows are tested by their entry numbers, each entry being decoded and compared once.
+		"""
+		rows: Iterable[int] = range(self._rows)
+		for key, value in values.items():
+			column = self._columns.get(key)
+			if column is None:
+				rows = ()
+				break
+			matches: dict[int, bool] = {MISSING: False}
+			def match(n: int, value: Any = value, matches: dict[int, bool] = matches) -> bool:
+				found = matches.get(n)
+				if found is None:
+					found = matches[n] = self._store.value(n) == value
+				return found
+			rows = [row for row in rows if match(column[row])]
+		return Selection(self, array("I", rows))
+
+	def distinct(self, key: str) -> list[Any]:
+		"""
+		This method returns the values of a column of strings or numbers, without repetitions, in order of appearance: each heap entry of the column is decoded once.
+		"""
+		column = self._columns.get(key)
+		if column is None:
+			return []
+		values: dict[Any, None] = {}
+		for n in dict.fromkeys(column):
+			if n != MISSING:
+				values.setdefault(self._store.value(n))
+		return list(values)
+
+	def release(self) -> None:
+		for column in self._columns.values():
+			column.release()
+		if self._order is not None:
+			self._order.release()
+
+
+class Selection(Sequence["Row"]):
+	"""
+	Rows of a Table, by row number (see Table.select).
+	"""
+
+	def __init__(self, table: Table, rows: "array[int]") -> None:
+		self._table = table
+		self._rows = rows
+
+	def __len__(self) -> int:
+		return len(self._rows)
+
+	@overload
+	def __getitem__(self, index: int) -> "Row": ...
+
+	@overload
+	def __getitem__(self, index: slice) -> list["Row"]: ...
+
+	def __getitem__(self, index: Union[int, slice]) -> Union["Row", list["Row"]]:
+		if isinstance(index, slice):
+			return [Row(self._table, row) for row in self._rows[index]]
+		return Row(self._table, self._rows[index])
+
+
+# bisect.bisect_left has a key parameter only since Python 3.10.
+def _bisect_left(length: int, id: Any, key: Callable[[int], Any]) -> int:
+	low, high = 0, length
+	while low < high:
+		middle = (low + high) // 2
+		if key(middle) < id:
+			low = middle + 1
+		else:
+			high = middle
+	return low
+
+
+class Row(Mapping[str, Any]):
+	"""
+	Read-only record of a Table, whose values are decoded on access.
+	"""
+	__slots__ = ("_table", "_row")
+
+	def __init__(self, table: RowSource, row: int) -> None:
+		self._table = table
+		self._row = row
+
+	def __getitem__(self, key: str) -> Any:
+		return self._table.get(self._row, key)
+
+	def __getattr__(self, key: str) -> Any:
+		# Only called for the names that are not methods or slots of the row.
+		if key.startswith("_"):
+			raise AttributeError(key)
+		try:
+			return self._table.get(self._row, key)
+		except KeyError:
+			raise AttributeError(key) from None
+
+	def __contains__(self, key: object) -> bool:
+		return isinstance(key, str) and self._table.has(self._row, key)
+
+	def __iter__(self) -> Iterator[str]:
+		return (key for key in self._table.keys() if self._table.has(self._row, key))
+
+	def __len__(self) -> int:
+		return sum(1 for _ in self)
+
+	def __repr__(self) -> str:
+		return "Row(%r)" % dict(self)
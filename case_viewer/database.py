@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+SQLite store of the artifact tables.
+
+It is the alternative of the columnar module: the records are inserted in the
+database in batches of one transaction each, the tables being written one
+after the other or side by side, e.g. while the case is processed for the
+records which are complete once processed, and the indexes are built once all
+the rows have been inserted.  Each table is
+an SQL table with a column per key of its records and a ``_row`` primary key
+giving the row order.  A string or a number is stored as such, anything else
+as a JSON blob, and a NULL stands for a key missing from the record.
+
+The reader has the interface of the ColumnarStore: the rows of a table are
+read by pages of consecutive rows, a few of which are kept in memory, and
+looked up by id through the index.  The rows whose columns have given values
+are selected by an SQL query as well, which uses the indexes of the columns,
+and read by pages the same way.
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Collection, Iterable, Iterator, Mapping, Optional, Sequence, Union, overload
+
+from .columnar import ID_KEY, Row, SupportsItems
+
+# Rows inserted in a transaction
+BATCH_SIZE = 10000
+
+# Rows read in a query, and number of the pages kept in memory by table
+PAGE_SIZE = 500
+PAGE_CACHE_SIZE = 8
+
+_ROW = "_row"
+_META = "_meta"
+
+
+def _quote(name: str) -> str:
+	return '"' + name.replace('"', '""') + '"'
+
+
+def _encode(value: Any) -> Any:
+	if isinstance(value, (str, int, float)) and not isinstance(value, bool):
+		return value
+	return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def _decode(value: Any) -> Any:
+	if isinstance(value, bytes):
+		return json.loads(value)
+	return value
+
+
+class TableWriter:
+	"""
+	Writer of the records of a table to the database.  The columns are the keys of the records, a column being added when a record has a new key.  The writer has the append method of a list of records, and can take its place while the records are built.
+	"""
+
+	def __init__(self, connection: sqlite3.Connection, name: str, batch_size: int = BATCH_SIZE) -> None:
+		self.name = name
+		self.rows = 0
+		self._connection = connection
+		self._batch_size = batch_size
+		self._columns: list[str] = []
+		self._batch: list[tuple[Any, ...]] = []
+		self._insert = ""
+		connection.execute("CREATE TABLE %s (%s INTEGER PRIMARY KEY)" % (_quote(name), _ROW))
+
+	def _add_columns(self, keys: Iterable[str]) -> None:
+		# The rows of the batch have the columns known so far.
+		self.flush()
+		for key in keys:
+			self._connection.execute("ALTER TABLE %s ADD COLUMN %s" % (_quote(self.name), _quote(key)))
+			self._columns.append(key)
+		self._insert = "INSERT INTO %s (%s) VALUES (%s)" % (_quote(self.name),
+			", ".join(_quote(column) for column in [_ROW] + self._columns), ", ".join("?" * (len(self._columns) + 1)))
+
+	def append(self, record: SupportsItems) -> None:
+		values = dict(record.items())
+		new_keys = [key for key in values if key not in self._columns]
+		if new_keys:
+			self._add_columns(new_keys)
+		self._batch.append((self.rows,) + tuple(_encode(values[column]) if column in values else None for column in self._columns))
+		self.rows += 1
+		if len(self._batch) >= self._batch_size:
+			self.flush()
+
+	def extend(self, records: Iterable[SupportsItems]) -> None:
+		for record in records:
+			self.append(record)
+
+	def __len__(self) -> int:
+		return self.rows
+
+	def flush(self) -> None:
+		if self._batch:
+			with self._connection:
+				self._connection.executemany(self._insert, self._batch)
+			self._batch.clear()
+
+	def columns(self) -> list[str]:
+		return list(self._columns)
+
+
+class DatabaseWriter:
+	"""
+	Writer of the tables of a new database.  The columns named in ``indexed``, and the id column, are indexed by close.
+	"""
+
+	def __init__(self, path: Union[str, Path], indexed: Collection[str] = (), batch_size: int = BATCH_SIZE) -> None:
+		self.path = str(path)
+		self._indexed = indexed
+		self._batch_size = batch_size
+		self._connection = sqlite3.connect(self.path)
+		# The database is written once, by a single process, and discarded
+		# when the writing does not complete.
+		self._connection.execute("PRAGMA journal_mode = OFF")
+		self._connection.execute("PRAGMA synchronous = OFF")
+		self._connection.execute("CREATE TABLE %s (key TEXT PRIMARY KEY, value TEXT)" % _META)
+		self._tables: dict[str, TableWriter] = {}
+
+	def table(self, name: str) -> TableWriter:
+		"""
+		This method returns the writer of a table, creating the table if needed.
+		"""
+		writer = self._tables.get(name)
+		if writer is None:
+			writer = self._tables[name] = TableWriter(self._connection, name, self._batch_size)
+		return writer
+
+	def close(self, meta: Optional[Mapping[str, Any]] = None) -> None:
+		"""
+		This method writes the last rows, the indexes and the metadata, and closes the database.
+		"""
+		for writer in self._tables.values():
+			writer.flush()
+		with self._connection:
+			for writer in self._tables.values():
+				for column in writer.columns():
+					if column == ID_KEY or column in self._indexed:
+						self._connection.execute("CREATE INDEX %s ON %s (%s)" % (_quote(writer.name + "." + column),
+							_quote(writer.name), _quote(column)))
+			self._connection.executemany("INSERT INTO %s VALUES (?, ?)" % _META, [
+				("meta", json.dumps(dict(meta or {}))),
+				("tables", json.dumps({name: writer.rows for name, writer in self._tables.items()}))])
+		self._connection.close()
+
+
+def write_database(path: Union[str, Path], tables: Mapping[str, Iterable[SupportsItems]], meta: Optional[Mapping[str, Any]] = None, indexed: Collection[str] = ()) -> None:
+	"""
+	This method writes the tables, lists of records with JSON-serialisable values, to a new database.
+	"""
+	database = DatabaseWriter(path, indexed)
+	for name, records in tables.items():
+		database.table(name).extend(records)
+	database.close(meta)
+
+
+class SqliteStore:
+	"""
+	Read-only view of a database written by DatabaseWriter.
+
+	>>> import os, tempfile
+	>>> path = os.path.join(tempfile.mkdtemp(), "case.sqlite")
+	>>> records = [{"id": 2, "app": "WhatsApp", "to": ["x", "y"]}, {"id": 1, "app": "WhatsApp", "size": 10}]
+	>>> write_database(path, {"messages": records, "empty": []}, {"nObjects": 2}, indexed=["app"])
+	>>> store = SqliteStore(path)
+	>>> store.meta
+	{'nObjects': 2}
+	>>> messages = store.table("messages")
+	>>> len(messages), messages[0]["to"], messages[1]["size"], messages[-1].app
+	(2, ['x', 'y'], 10, 'WhatsApp')
+	>>> dict(messages[1])
+	{'id': 1, 'app': 'WhatsApp', 'size': 10}
+	>>> "size" in messages[0], messages[0].get("size", "-")
+	(False, '-')
+	>>> store.lookup("messages", 2)["to"], store.lookup("messages", 3), store.lookup("calls", 1)
+	(['x', 'y'], None, None)
+	>>> [row.id for row in messages], len(store.table("empty"))
+	([2, 1], 0)
+	>>> whatsapp = messages.select({"app": "WhatsApp", "to": ["x", "y"]})
+	>>> len(whatsapp), [row.id for row in whatsapp], len(messages.select({"app": "Skype"})), len(messages.select({"from": "x"}))
+	(1, [2], 0, 0)
+	>>> messages.distinct("app"), messages.distinct("size"), messages.select({"id": 2}).distinct("size"), messages.distinct("from")
+	(['WhatsApp'], [10], [], [])
+	>>> store.close()
+	"""
+
+	def __init__(self, path: str) -> None:
+		self.path = path
+		# The store is opened by the thread processing the case and read by
+		# the GUI thread, one at a time.
+		self._connection = sqlite3.connect(Path(path).resolve().as_uri() + "?mode=ro", uri=True, check_same_thread=False)
+		try:
+			values = dict(self._connection.execute("SELECT key, value FROM %s" % _META).fetchall())
+			self.meta: dict[str, Any] = json.loads(values["meta"])
+			rows: dict[str, int] = json.loads(values["tables"])
+		except (sqlite3.DatabaseError, KeyError) as e:
+			self._connection.close()
+			raise ValueError("Not an artifact database: %s." % path) from e
+		self._tables = {name: SqlTable(self._connection, name, n) for name, n in rows.items()}
+
+	def table_names(self) -> list[str]:
+		return list(self._tables)
+
+	def table(self, name: str) -> "SqlTable":
+		return self._tables[name]
+
+	def lookup(self, name: str, id: Any) -> Optional[Row]:
+		table = self._tables.get(name)
+		if table is None:
+			return None
+		return table.lookup(id)
+
+	def close(self) -> None:
+		self._connection.close()
+
+
+class SqlTable(Sequence[Row]):
+	def __init__(self, connection: sqlite3.Connection, name: str, rows: int, where: str = "", parameters: tuple[Any, ...] = ()) -> None:
+		self._connection = connection
+		self._name = name
+		self._rows = rows
+		self._columns = [info[1] for info in connection.execute("PRAGMA table_info(%s)" % _quote(name)) if info[1] != _ROW]
+		self._positions = {column: n for n, column in enumerate(self._columns)}
+		self._select = "SELECT %s FROM %s" % (", ".join(_quote(column) for column in self._columns) or "NULL", _quote(name))
+		# Condition of the rows of a selection (see select), with its parameters
+		self._where = where
+		self._parameters = parameters
+		self._pages: dict[int, list[tuple[Any, ...]]] = {}
+
+	def __len__(self) -> int:
+		return self._rows
+
+	@overload
+	def __getitem__(self, index: int) -> Row: ...
+
+	@overload
+	def __getitem__(self, index: slice) -> list[Row]: ...
+
+	def __getitem__(self, index: Union[int, slice]) -> Union[Row, list[Row]]:
+		if isinstance(index, slice):
+			return [Row(self, row) for row in range(*index.indices(self._rows))]
+		if index < 0:
+			index += self._rows
+		if not 0 <= index < self._rows:
+			raise IndexError("Row out of range.")
+		return Row(self, index)
+
+	def __iter__(self) -> Iterator[Row]:
+		return (Row(self, row) for row in range(self._rows))
+
+	def _values(self, row: int) -> tuple[Any, ...]:
+		number, position = divmod(row, PAGE_SIZE)
+		values = self._pages.get(number)
+		if values is None:
+			if self._where:
+				values = self._connection.execute(self._select + " WHERE %s ORDER BY %s LIMIT ? OFFSET ?" % (self._where, _ROW),
+					self._parameters + (PAGE_SIZE, number * PAGE_SIZE)).fetchall()
+			else:
+				# The rows are numbered from 0, so the offset of a page is a
+				# bound of the primary key rather than a number of rows to
+				# skip, and the query costs the same for any page.
+				values = self._connection.execute(self._select + " WHERE %s >= ? ORDER BY %s LIMIT ?" % (_ROW, _ROW),
+					(number * PAGE_SIZE, PAGE_SIZE)).fetchall()
+			if len(self._pages) >= PAGE_CACHE_SIZE:
+				del self._pages[next(iter(self._pages))]
+			self._pages[number] = values
+		return values[position]
+
+	def keys(self) -> list[str]:
+		return list(self._columns)
+
+	def get(self, row: int, key: str) -> Any:
+		position = self._positions.get(key)
+		value = None if position is None else self._values(row)[position]
+		if value is None:
+			raise KeyError(key)
+		return _decode(value)
+
+	def has(self, row: int, key: str) -> bool:
+		position = self._positions.get(key)
+		return position is not None and self._values(row)[position] is not None
+
+	def select(self, values: Mapping[str, Any]) -> "SqlTable":
+		"""
+		This method returns the table of the rows whose columns have the given values, in row order, found through the indexes of the columns.  A column the table does not have matches no row.
+		"""
+		if any(column not in self._positions for column in values):
+			return SqlTable(self._connection, self._name, 0, "0")
+		conditions = [self._where] if self._where else []
+		conditions += ["%s = ?" % _quote(column) for column in values]
+		where = " AND ".join(conditions) or "1"
+		parameters = self._parameters + tuple(_encode(value) for value in values.values())
+		rows: int = self._connection.execute("SELECT COUNT(*) FROM %s WHERE %s" % (_quote(self._name), where), parameters).fetchone()[0]
+		return SqlTable(self._connection, self._name, rows, where, parameters)
+
+	def distinct(self, column: str) -> list[Any]:
+		"""
+		This method returns the values of a column, without repetitions, in order of appearance, grouped through the index of the column.
+		"""
+		if column not in self._positions:
+			return []
+		where = (self._where + " AND " if self._where else "") + "%s IS NOT NULL" % _quote(column)
+		return [_decode(value) for value, in self._connection.execute("SELECT %s FROM %s WHERE %s GROUP BY %s ORDER BY MIN(%s)" % (
+			_quote(column), _quote(self._name), where, _quote(column), _ROW), self._parameters)]
+
+	def lookup(self, id: Any) -> Optional[Row]:
+		"""
+		This method returns the first row with the given id, found through the index of the id column.
+		"""
+		if ID_KEY not in self._positions:
+			return None
+		found = self._connection.execute("SELECT %s FROM %s WHERE %s = ? ORDER BY %s LIMIT 1" % (_ROW, _quote(self._name), _quote(ID_KEY), _ROW), (id,)).fetchone()
+		if found is None:
+			return None
+		return Row(self, found[0])
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+Export of the artifact tables to CSV or JSON Lines files.
+
+Each table is written to a file named after it, with a row per record and a
+column per field of the record class.  A row is written as soon as its record
+is appended to the TableWriter of the table, so the tables whose records are
+complete once built can be exported while the case is processed, without
+being kept in memory.  The integer keys of the reference fields are written
+as the IRIs they stand for.
+"""
+
+import csv
+import json
+import os
+from types import TracebackType
+from typing import Any, Callable, Iterable, Mapping, Optional, TextIO, Type, Union
+
+from .records import Record
+
+FORMATS = ("csv", "jsonl")
+
+
+class TableWriter:
+	"""
+	Writer of the records of a table.  The file is created on the first record, so an empty table leaves no file.  The writer has the append method of a list of records, and can take its place while the records are built.
+
+	>>> import tempfile
+	>>> from .records import Artifact, field, reference
+	>>> class Call(Artifact):
+	...     to: list = field("uco-observable:to", "-")
+	...     fromId: int = reference("uco-observable:from")
+	>>> directory = tempfile.mkdtemp()
+	>>> iris = {1: "kb:call-1", 2: "kb:call-2", 3: "kb:phone-1"}
+	>>> with TableWriter(directory, "phoneCalls", "csv", iris.__getitem__) as calls:
+	...     calls.append(Call(id=1, to=["Bob", "Ann"], fromId=3))
+	...     calls.extend([Call(id=2)])
+	>>> print(open(calls.path).read(), end="")
+	id,to,fromId
+	kb:call-1,"[""Bob"", ""Ann""]",kb:phone-1
+	kb:call-2,-,
+	>>> with TableWriter(directory, "phoneCalls", "jsonl", iris.__getitem__) as calls:
+	...     calls.append(Call(id=1, to=["Bob", "Ann"], fromId=3))
+	>>> print(open(calls.path).read(), end="")
+	{"id": "kb:call-1", "to": ["Bob", "Ann"], "fromId": "kb:phone-1"}
+	>>> calls.rows, os.path.basename(calls.path)
+	(1, 'phoneCalls.jsonl')
+	>>> TableWriter(directory, "phoneCalls", "xml", iris.__getitem__)
+	Traceback (most recent call last):
+	...
+	ValueError: Unknown export format: xml.
+	"""
+
+	def __init__(self, directory: Union[str, "os.PathLike[str]"], name: str, format: str, iri: Callable[[int], str]) -> None:
+		if format not in FORMATS:
+			raise ValueError("Unknown export format: %s." % format)
+		self.path = os.path.join(directory, name + "." + format)
+		self.format = format
+		self.rows = 0
+		self._iri = iri
+		self._fp: Optional[TextIO] = None
+		self._csv: Optional["csv.DictWriter[str]"] = None
+
+	def _open(self, record: Record) -> TextIO:
+		self._fp = open(self.path, "w", encoding="utf-8", newline="")
+		if self.format == "csv":
+			self._csv = csv.DictWriter(self._fp, list(record.FIELDS), lineterminator="\n")
+			self._csv.writeheader()
+		return self._fp
+
+	def _iris(self, value: Any) -> Any:
+		if isinstance(value, int):
+			return self._iri(value) if value else ""
+		return [self._iri(key) for key in value]
+
+	def append(self, record: Record) -> None:
+		fp = self._fp or self._open(record)
+		values = dict(record.items())
+		for attribute in record.REFERENCES:
+			values[attribute] = self._iris(values[attribute])
+		if self._csv is not None:
+			self._csv.writerow({attribute: _cell(value) for attribute, value in values.items()})
+		else:
+			fp.write(json.dumps(values, ensure_ascii=False) + "\n")
+		self.rows += 1
+
+	def extend(self, records: Iterable[Record]) -> None:
+		for record in records:
+			self.append(record)
+
+	def close(self) -> None:
+		if self._fp is not None:
+			self._fp.close()
+			self._fp = None
+			self._csv = None
+
+	def __enter__(self) -> "TableWriter":
+		return self
+
+	def __exit__(self, exc_type: Optional[Type[BaseException]], exc_value: Optional[BaseException], traceback: Optional[TracebackType]) -> None:
+		self.close()
+
+
+def _cell(value: Any) -> Any:
+	# The lists of a record are written as JSON in a CSV cell.
+	if isinstance(value, (list, tuple, dict)):
+		return json.dumps(value, ensure_ascii=False)
+	return value
+
+
+def export_tables(directory: Union[str, "os.PathLike[str]"], tables: Mapping[str, Iterable[Record]], format: str, iri: Callable[[int], str]) -> dict[str, int]:
+	"""
+	This method writes each table to its file in the directory, and returns the number of rows written by table name.
+	"""
+	rows = {}
+	for name, records in tables.items():
+		with TableWriter(directory, name, format, iri) as writer:
+			writer.extend(records)
+		rows[name] = writer.rows
+	return rows
@@ -0,0 +1,871 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+Qt window of the viewer.
+
+This is the only module importing PyQt6: it is imported by main only when the
+window is opened, so the headless runs (--dry-run, --export) neither load Qt
+nor need it installed.  The artifact tables are read from the case_viewer
+module, whose lists are replaced by the tables of the snapshot once the case
+has been processed, hence read as attributes of the module.
+"""
+
+from collections import Counter
+from typing import Optional
+from PyQt6.QtWidgets import *
+from PyQt6.QtGui import *
+from PyQt6 import QtCore
+
+from .case_viewer import C_CYAN, C_BLACK, FILE_CATEGORIES, CaseSession, build_tree_data, \
+						number_with_dots, profile_stage
+
+
+# Item data of the tree nodes: the category key selects the table builder and
+# the detail renderers, the record id identifies the node (e.g. a chat thread).
+CATEGORY_ROLE = QtCore.Qt.ItemDataRole.UserRole
+RECORD_ROLE = QtCore.Qt.ItemDataRole.UserRole + 1
+
+
+class TableModel(QtCore.QAbstractTableModel):
+	# Number of rows added to the table each time the view asks for more
+	FETCH_SIZE = 500
+
+	def __init__(self, records, headers, fields):
+		super(TableModel, self).__init__()
+		# The rows are read on demand from the list of artifacts, which is
+		# never copied: the list can still grow while the case is loaded.
+		self._records = records
+		self._headers = headers  # Memorizziamo qui i nomi delle colonne
+		self._fields = fields    # field of the artifact shown in each column
+		self._rowCount = min(len(records), self.FETCH_SIZE)
+
+	def record(self, row):
+		return self._records[row]
+
+	def filtered(self, records):
+		# The model of other records, with the same columns
+		return TableModel(records, self._headers, self._fields)
+
+	def data(self, index, role):
+		if role == QtCore.Qt.ItemDataRole.DisplayRole:
+			# .row() indexes into the list of artifacts,
+			# .column() into the list of fields
+			return getattr(self._records[index.row()], self._fields[index.column()])
+
+	def rowCount(self, index):
+		# Only the rows fetched so far
+		return self._rowCount
+
+	def columnCount(self, index):
+		return len(self._fields)
+
+	def canFetchMore(self, index):
+		return self._rowCount < len(self._records)
+
+	def fetchMore(self, index):
+		nRows = min(len(self._records) - self._rowCount, self.FETCH_SIZE)
+		if nRows <= 0:
+			return
+		self.beginInsertRows(QtCore.QModelIndex(), self._rowCount, self._rowCount + nRows - 1)
+		self._rowCount += nRows
+		self.endInsertRows()
+
+	# QUESTO METODO CREA L'INTESTAZIONE FISSA
+	def headerData(self, section, orientation, role):
+		if role == QtCore.Qt.ItemDataRole.DisplayRole:
+			if orientation == QtCore.Qt.Orientation.Horizontal and section < len(self._headers):
+				# Restituisce il nome dalla nostra lista headers
+				return self._headers[section]
+		return None
+
+
+class TreeModel(QtCore.QAbstractItemModel):
+	# Number of chat threads added to the tree each time the view asks for more
+	FETCH_SIZE = 1000
+	# internalId of the chat thread nodes, the row is added to it
+	THREAD_NODE = 1 << 40
+
+	def __init__(self, session):
+		super(TreeModel, self).__init__()
+		self.session = session
+		self._nodes = []     # nodes of treeData, the internalId is the position
+		self._nodeIds = {}   # unique_id -> position in _nodes
+		self._children = {}  # parent_id -> positions of the children, in the order of treeData
+		self._threadCount = 0
+		self.update(session.treeData)
+
+	# The nodes are updated in place, so that the tree can be refreshed while the
+	# case is loaded without losing its expanded branches. The chat threads are
+	# not part of treeData: they are read from the chatThreads of the session when the "Chats"
+	# branch is expanded.
+	def update(self, data):
+		rows = Counter()  # parent_id -> siblings met so far
+		for value in data:
+			row = rows[value['parent_id']]
+			rows[value['parent_id']] += 1
+			n = self._nodeIds.get(value['unique_id'])
+			if n is None:
+				# A new category keeps the position it has in treeData
+				siblings = self._children.setdefault(value['parent_id'], [])
+				self.beginInsertRows(self.nodeIndex(value['parent_id']), row, row)
+				n = len(self._nodes)
+				self._nodes.append(dict(value, row=row))
+				self._nodeIds[value['unique_id']] = n
+				siblings.insert(row, n)
+				for sibling in siblings[row + 1:]:
+					self._nodes[sibling]['row'] += 1
+				self.endInsertRows()
+			elif self._nodes[n]['short_name'] != value['short_name']:
+				self._nodes[n]['short_name'] = value['short_name']
+				index = self.createIndex(self._nodes[n]['row'], 0, n)
+				self.dataChanged.emit(index, index)
+
+	def nodeIndex(self, unique_id):
+		n = self._nodeIds.get(unique_id)
+		if n is None:
+			return QtCore.QModelIndex()
+		return self.createIndex(self._nodes[n]['row'], 0, n)
+
+	def isChats(self, parent):
+		return parent.isValid() and parent.internalId() == self._nodeIds.get(':ChatMessages')
+
+	def index(self, row, column, parent=QtCore.QModelIndex()):
+		if not self.hasIndex(row, column, parent):
+			return QtCore.QModelIndex()
+		if self.isChats(parent):
+			return self.createIndex(row, column, self.THREAD_NODE + row)
+		return self.createIndex(row, column, self._children[self.parentId(parent)][row])
+
+	def parentId(self, index):
+		if not index.isValid():
+			return '0'
+		return self._nodes[index.internalId()]['unique_id']
+
+	def parent(self, index):
+		if not index.isValid():
+			return QtCore.QModelIndex()
+		if index.internalId() >= self.THREAD_NODE:
+			return self.nodeIndex(':ChatMessages')
+		return self.nodeIndex(self._nodes[index.internalId()]['parent_id'])
+
+	def rowCount(self, parent=QtCore.QModelIndex()):
+		if parent.column() > 0:
+			return 0
+		if self.isChats(parent):
+			return self._threadCount
+		if parent.isValid() and parent.internalId() >= self.THREAD_NODE:
+			return 0
+		return len(self._children.get(self.parentId(parent), []))
+
+	def columnCount(self, parent=QtCore.QModelIndex()):
+		return 1
+
+	def hasChildren(self, parent=QtCore.QModelIndex()):
+		if self.isChats(parent):
+			return len(self.session.table("chatThreads")) > 0
+		return self.rowCount(parent) > 0
+
+	def canFetchMore(self, parent):
+		return self.isChats(parent) and self._threadCount < len(self.session.table("chatThreads"))
+
+	def fetchMore(self, parent):
+		nThreads = min(len(self.session.table("chatThreads")) - self._threadCount, self.FETCH_SIZE)
+		if not self.isChats(parent) or nThreads <= 0:
+			return
+		self.beginInsertRows(parent, self._threadCount, self._threadCount + nThreads - 1)
+		self._threadCount += nThreads
+		self.endInsertRows()
+
+	def data(self, index, role):
+		if not index.isValid():
+			return None
+		if index.internalId() >= self.THREAD_NODE:
+			t = self.session.table("chatThreads")[index.row()]
+			if role == QtCore.Qt.ItemDataRole.DisplayRole:
+				return 'chat N. ' + str(index.row() + 1) + ' (' + number_with_dots(t.length) + ')'
+			if role == CATEGORY_ROLE:
+				return ':ChatThread'
+			if role == RECORD_ROLE:
+				return t.id
+			return None
+		node = self._nodes[index.internalId()]
+		if role == QtCore.Qt.ItemDataRole.DisplayRole:
+			return node['short_name']
+		if role == CATEGORY_ROLE:
+			return node.get('category', node['unique_id'])
+		if role == RECORD_ROLE:
+			return node['unique_id']
+		return None
+
+	def headerData(self, section, orientation, role):
+		if role == QtCore.Qt.ItemDataRole.DisplayRole and orientation == QtCore.Qt.Orientation.Horizontal:
+			return 'Cyber item'
+		return None
+
+
+class view(QWidget):
+	def __init__(self, session, worker=None, inputName=''):
+		super(view, self).__init__()
+		self.session = session
+		self.tree = QTreeView(self)
+		self.worker = worker
+		self.inputName = inputName
+
+		self.tree_cyber_item = ''
+		self.tree_category = ''
+		self.tree_record_id = ''
+
+		self.table = QTableView(self)
+		# ottengo l'header della  QTableView
+		header = self.table.horizontalHeader()
+
+
+		# tutte le colonne si divideranno equamente lo spazio disponibile
+		header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+		header.setVisible(True)
+		header.setStretchLastSection(True)
+
+		self.table.setVisible(True)
+		self.treeData = session.treeData
+		self.font = QFont("Helvetica", pointSize=12, weight=QFont.Weight.Medium)
+		self.textEdit = QTextEdit()
+		self.textEdit.setFont(self.font)
+		self.textEdit.setDocumentTitle("Details")
+		self.textEdit.setHtml('<h2>Here the details will be displayed</h2>')
+		self.modelTable = TableModel([], [], [])
+		self.table.setModel(self.modelTable)
+
+		# Category key of a tree node -> builder of the table of its artifacts
+		self.tableBuilders = {
+			':Accounts': self.buildDataContacts,
+			':Bluetooths': self.buildDataBluetooths,
+			':Calendars': self.buildDataCalendars,
+			':Calls': self.buildDataPhoneCalls,
+			':CellSites': self.buildDataCellSites,
+			':ChatThread': self.buildDataChatMessages,
+			':Cookies': self.buildDataCookies,
+			':EmailMessages': self.buildDataEmailMessages,
+			':Events': self.buildDataEvents,
+			':LocationDevice': self.buildDataLocationDevice,
+			':SearchedItems': self.buildDataSearchedItems,
+			':Sms': self.buildDataSms,
+			':SocialMediaActivities': self.buildDataSocialMediaActivities,
+			':WebBookmarks': self.buildDataWebBookmarks,
+			':WebHistories': self.buildDataWebHistories,
+			':WebSearchTerms': self.buildDataWebSearchTerm,
+			':WirelessNet': self.buildDataWirelessNet
+		}
+		for category in FILE_CATEGORIES:
+			self.tableBuilders[category] = self.buildDataFiles
+
+		# Category key of a tree node -> table and categorical field its
+		# artifacts can be filtered by
+		self.tableFilters = {
+			':CellSites': ("cell_sites", "cellSiteType"),
+			':Cookies': ("cookies", "cookieApp"),
+			':Events': ("events", "eventType"),
+			':Sms': ("smsMessages", "application"),
+			':SocialMediaActivities': ("social_media_activities", "activityType"),
+			':WebBookmarks': ("webBookmark", "application"),
+			':WebHistories': ("webURLHistory", "browserInformation")
+		}
+		self.filterBox = QComboBox(self)
+		self.filterBox.activated.connect(self.filter_table)
+		self.filterBox.hide()
+
+		# Category key of a tree node -> summary of all its artifacts
+		self.panelRenderers = {
+			':Accounts': self.gather_all_accounts,
+			':Bluetooths': self.gather_all_device_connection,
+			':Calendars': self.gather_all_calendars,
+			':Calls': self.gather_all_calls,
+			':CellSites': self.gather_all_cellsites,
+			':ChatThread': self.gather_all_chats,
+			':Cookies': self.gather_all_cookies,
+			':EmailMessages': lambda: self.select_single_hint("messages", "messages"),
+			':Events': self.gather_all_events,
+			':LocationDevice': self.gather_all_locations,
+			':SocialMediaActivities': self.gather_all_social_media_activities,
+			':WebBookmarks': self.gather_all_web_bookmarks,
+			':WebHistories': self.gather_all_web_histories,
+			':WebSearchTerms': self.gather_all_web_search_terms,
+			':WirelessNet': self.gather_all_wireless_nets,
+			':Images': lambda: self.select_single_hint("image", "images"),
+			':Audios': lambda: self.gather_all_files("Audios", self.session.table("filesAudio")),
+			':Videos': lambda: self.select_single_hint("video", "videos"),
+			':Texts': lambda: self.select_single_hint("text", "texts"),
+			':Archives': lambda: self.gather_all_files("Archives", self.session.table("filesArchive")),
+			':Databases': lambda: self.gather_all_files("Databases", self.session.table("filesDatabase")),
+			':Applications': lambda: self.gather_all_files("Applications", self.session.table("filesApplication")),
+			':Uncategorized': lambda: self.gather_all_files("Uncategorized", self.session.table("filesUncategorized"))
+		}
+
+		self.cancelButton = QPushButton('Cancel loading')
+		self.cancelButton.clicked.connect(self.cancel_ingest)
+		# Busy until the first progress report
+		self.progressBar = QProgressBar()
+		self.progressBar.setRange(0, 0)
+		self.progressBar.setTextVisible(True)
+
+		grid = QGridLayout()
+		grid.setSpacing(10)
+		# grid.addWidget(widget, riga, colonna, rowSpan, colSpan)
+		grid.addWidget(self.cancelButton, 0, 0, 1, 4)
+		grid.addWidget(self.progressBar, 0, 4, 1, 19)
+		grid.addWidget(self.tree, 1, 0, 10, 4)
+		grid.addWidget(self.table, 1, 4, 10, 7)
+		grid.addWidget(self.filterBox, 11, 4, 1, 7)
+		grid.addWidget(self.textEdit, 1, 14, 10, 9)
+
+		self.setLayout(grid)
+		self.model = TreeModel(self.session)
+		self.tree.setModel(self.model)
+		self.tree.clicked.connect(self.select_left_bar)
+		self.tree.collapseAll()
+		self.table.clicked.connect(self.select_main_panel)
+
+		if self.worker is None:
+			self.cancelButton.hide()
+			self.progressBar.hide()
+		else:
+			self.worker.progress.connect(self.ingest_progress)
+			self.worker.failed.connect(self.ingest_failed)
+			self.worker.finished.connect(self.ingest_finished)
+		self.update_title()
+
+	def update_title(self):
+		nObjects = 0 if self.worker is None else self.worker.nObjects
+		title = 'Cyber items view - ' + self.inputName + ' (n. Observables: ' + number_with_dots(nObjects) + ')'
+		if self.worker is not None and not self.worker.isFinished():
+			title += ' - loading ...'
+		elif self.worker is not None and self.worker.cancelled:
+			title += ' - cancelled'
+		self.setWindowTitle(title)
+
+	def refresh_tree(self):
+		build_tree_data(self.session)
+		with profile_stage("tree.update"):
+			self.model.update(self.treeData)
+
+	def ingest_progress(self, report):
+		fraction = report.fraction
+		if fraction is not None:
+			self.progressBar.setRange(0, 1000)
+			self.progressBar.setValue(int(fraction * 1000))
+		self.progressBar.setFormat(report.summary())
+		self.progressBar.setToolTip(str(report))
+		self.refresh_tree()
+		self.update_title()
+
+	def ingest_finished(self):
+		self.cancelButton.hide()
+		self.progressBar.hide()
+		self.refresh_tree()
+		self.update_title()
+
+	def ingest_failed(self, message):
+		QMessageBox.critical(self, "CASE viewer", "Load JSON file failed.\n\n" + message)
+		QApplication.exit(1)
+
+	def cancel_ingest(self):
+		self.worker.requestInterruption()
+		self.cancelButton.setEnabled(False)
+		self.cancelButton.setText('Cancelling ...')
+
+	def closeEvent(self, event):
+		if self.worker is not None and self.worker.isRunning():
+			self.worker.requestInterruption()
+			self.worker.wait()
+		super(view, self).closeEvent(event)
+
+	def buildTableData(self, category: str, idObject: str) -> Optional[TableModel]:
+		builder = self.tableBuilders.get(category)
+		if builder is None:
+			return None
+		return builder(idObject)
+
+	def buildDataChatMessages(self, idObject):
+		thread = self.session.lookup("chatThreads", idObject)
+		if thread is None:
+			print('Thread not found')
+			return None
+		return TableModel(self.session.thread_messages(thread), [" ● Date ● ", " ● Attachments ● "],
+			["sentTime", "attachedFiles"])
+
+	def buildDataContacts(self, idObject):
+		#"application", "displayName"
+		return TableModel(self.session.table("accounts"), [" ● Identifier ● ", " ● Phone ● "],
+			["accountIdentifier", "phoneAccount"])
+
+	def buildDataBluetooths(self, idObject):
+		return TableModel(self.session.table("bluetooths"), [" ● Address ● "], ["addressValue"])
+
+	def buildDataCalendars(self, idObject):
+		#"recurrence", "eventStatus"
+		return TableModel(self.session.table("calendars"), [" ● Subject ● ", " ● Start time ● ", " ● End time ● "],
+			["subject", "startTime", "endTime"])
+
+	def buildDataPhoneCalls(self, idObject):
+		#"duration"
+		return TableModel(self.session.table("phoneCalls"), [" ● From ● ", " ● To ● ", " ● Date ● "],
+			["from_", "to", "startTime"])
+
+	def buildDataCellSites(self, idObject):
+		#"cellSiteNetworkCode", "cellSiteIdentifier"
+		return TableModel(self.session.table("cell_sites"), [" ● MCC ● ", " ● LAC ● ", " ● Type ● "],
+			["cellSiteCountryCode", "cellSiteLocationAreaCode",
+			"cellSiteType"])
+
+	def buildDataWirelessNet(self, idObject: str) -> TableModel:
+		#"ssid"
+		return TableModel(self.session.table("wireless_net"), [" ● BSID ● "], ["baseStation"])
+
+	def buildDataSearchedItems(self, idObject):
+		#"searchSource", "searchLaunchedTime"
+		return TableModel(self.session.table("searched_items"), [" ● Value ● "], ["searchValue"])
+
+	def buildDataSocialMediaActivities(self, idObject):
+		#"body", "pageTitle", "observableCreatedTime",
+		#"authorIdentifier", "accountIdentifier", "authorName"
+		return TableModel(self.session.table("social_media_activities"), [" ● App ● ", " ● Type ● "],
+			["application", "activityType"])
+
+	def buildDataEvents(self, idObject):
+		#"eventText"
+		return TableModel(self.session.table("events"), [" ● Date ● ", " ● Type ● "],
+			["observableCreatedTime", "eventType"])
+
+	def buildDataCookies(self, idObject):
+		#"cookiePath", "observableCreatedTime", "expirationTime"
+		return TableModel(self.session.table("cookies"), [" ● Name ● ", " ● Application ● "],
+			["cookieName", "cookieApp"])
+
+	def buildDataEmailMessages(self, idObject):
+		#"subject"
+		return TableModel(self.session.table("emailMessages"), [" ● From ● ", " ● To ● ", " ● Date ● "],
+			["from_", "to", "sentTime"])
+
+	def buildDataFiles(self, idObject):
+		return TableModel(self.session.table(FILE_CATEGORIES[idObject]), [" ● Name ● ", " ● Size ● "],
+			["fileName", "fileSize"])
+
+	def buildDataSms(self, idObject):
+		#"messageText", "application", "allocationStatus"
+		return TableModel(self.session.table("smsMessages"), [" ● From ● ", " ● To ● ", " ● Date ● "],
+			["from_", "to", "sentTime"])
+
+	def buildDataWebBookmarks(self, idObject):
+		#"bookmarkPath", "observableCreatedTime"
+		return TableModel(self.session.table("webBookmark"), [" ● Url ● ", " ● App ● "],
+			["urlTargeted", "application"])
+
+	def buildDataWebHistories(self, idObject):
+		#"title", "lastVisited"
+		return TableModel(self.session.table("webURLHistory"), [" ● Url ● ", " ● App ● "],
+			["url", "browserInformation"])
+
+	def buildDataWebSearchTerm(self, idObject):
+		return TableModel(self.session.table("webSearchTerm"), [" ● Web search term ● "], ["searchTerm"])
+
+	def buildDataLocationDevice(self, idObject):
+		#"mappedByStartDate"
+		return TableModel(self.session.table("relationMappedBy"), [" ● Latitude ● ", " ● Longitude ● "],
+			["mappedByLatitude", "mappedByLongitude"])
+
+	def select_left_bar(self, index):
+		self.tree_cyber_item = index.data(QtCore.Qt.ItemDataRole.DisplayRole)
+		self.tree_category = index.data(CATEGORY_ROLE)
+		self.tree_record_id = index.data(RECORD_ROLE)
+		if self.worker is not None and self.worker.isRunning() and self.worker.ingest.writers:
+			# The tables being written to the database cannot be read back
+			# before the processing ends.
+			self.modelTable = TableModel([], [], [])
+			self.table.setModel(self.modelTable)
+			self.textEdit.setHtml("<h3>The Artifacts are being written to the database, they are shown once the processing ends.</h3>")
+			self.filterBox.hide()
+			return
+		tModel = self.buildTableData(self.tree_category, self.tree_record_id)
+		if tModel is None:
+			tModel = TableModel([], [], [])
+		self.modelTable = tModel
+		self.update_filter()
+		renderer = self.panelRenderers.get(self.tree_category)
+		if renderer is not None:
+			self.textEdit.setHtml(renderer())
+
+		self.table.setModel(self.modelTable)
+
+	def update_filter(self):
+		# The values the artifacts of the tree node can be filtered by
+		self.filterBox.clear()
+		tableFilter = self.tableFilters.get(self.tree_category)
+		if tableFilter is None:
+			self.filterBox.hide()
+			return
+		name, field = tableFilter
+		self.filterBox.addItem("All")
+		self.filterBox.addItems(self.session.distinct(name, field))
+		self.filterBox.show()
+
+	def filter_table(self, index):
+		# The artifacts are selected by the code of the value, see CaseSession.select
+		tModel = self.buildTableData(self.tree_category, self.tree_record_id)
+		if tModel is None:
+			return
+		if index > 0:
+			name, field = self.tableFilters[self.tree_category]
+			tModel = tModel.filtered(self.session.select(name, **{field: self.filterBox.itemText(index)}))
+		self.modelTable = tModel
+		self.table.setModel(self.modelTable)
+
+	def select_single_hint(self, single, all):
+		return "<h3>Please, select single " + single + " from the main panel.</br/><br/>" + \
+			"Viewing all " + all + " will take too much time.</h3>"
+
+	def select_main_panel(self, item):
+		if item.isValid():
+			row = self.modelTable.record(item.row())
+			if self.tree_category == ':EmailMessages':
+				detail = "<strong>From</strong> " + str(row.from_) + "<br/>" + \
+				"<strong>To</strong> " + str(row.to) + "<br/>" + \
+				"<strong>Cc </strong> " + str(row.cc) + "<br/>" + \
+				"<strong>Bcc </strong> " + str(row.bcc) + "<br/>" + \
+				"<strong>Subject</strong> " + str(row.subject) + "<br/>" + \
+				"<strong>Sent time</strong> " + str(row.sentTime) + "<br/>" + \
+				"<strong>Body</strong> " + str(row.body) + "<hr/>"
+				self.textEdit.setHtml('<h2>Email</h2>' + detail)
+			elif self.tree_category == ':ChatThread':
+				to_participants = ""
+				for p in row.to:
+					to_participants = to_participants + p + "; "
+				detail = "<strong>From</strong> " + str(row.from_) + "<br/>" + \
+				"<strong>To</strong> " + str(to_participants) + "<br/>" + \
+				"<strong>Message</strong><br/>" + row.messageText + '<hr/>'
+				self.textEdit.setHtml('<h2>Chat message</h2>' + detail)
+			elif self.tree_category == ':Accounts':
+				detail = "<strong>Name</strong> " + row.displayName + "<br/>" + \
+				"<strong>Phone n.</strong> " + row.phoneAccount + "<br>" + \
+				"<strong>Identifier</strong> " + row.accountIdentifier
+				self.textEdit.setHtml('<h2>Account</h2>' + detail)
+			elif self.tree_category == ':Calendars':
+				detail = "<strong>Subject</strong> " + str(row.subject) + "<br/>" + \
+				"<strong>Start</strong> " + str(row.startTime) + "<br/>" + \
+				"<strong>End</strong> " + str(row.endTime) + "<br/>" + \
+				"<strong>Recurrence</strong> " + str(row.recurrence)
+				self.textEdit.setHtml('<h2>Calendar</h2>' + detail)
+			elif self.tree_category == ':Calls':
+				detail = "<strong>From</strong> " + str(row.from_) + "<br/>" + \
+				"<strong>To</strong> " + str(row.to) + "<br/>" + \
+				"<strong>Name</strong> " + row.name + "<br/>" + \
+				"<strong>Start time</strong> " + str(row.startTime) + "<br/>" + \
+				"<strong>Duration (s.)</strong> " + str(row.duration)
+				self.textEdit.setHtml('<h2>Call</h2>' + detail)
+			elif self.tree_category == ':CellSites':
+				detail = "<strong>Country code</strong> " + str(row.cellSiteCountryCode) + "<br/>" + \
+				"<strong>Identifier</strong> " + str(row.cellSiteIdentifier) + "<br/>" + \
+				"<strong>Network code</strong> " + str(row.cellSiteNetworkCode) + "<br/>" + \
+				"<strong>Location area code </strong> " + str(row.cellSiteLocationAreaCode) + "<br/>" + \
+				"<strong>Site type </strong> " + str(row.cellSiteType)
+				self.textEdit.setHtml('<h2>Cell site</h2>' + detail)
+			elif self.tree_category == ':Cookies':
+				detail = "<strong>Name</strong> " + str(row.cookieName) + "<br/>" + \
+				"<strong>Path</strong> " + str(row.cookiePath) + "<br/>" + \
+				"<strong>Application </strong> " + str(row.cookieApp) + "<br/>" + \
+				"<strong>Crreated time </strong> " + str(row.accessedTime) + "<br/>" + \
+				"<strong>Expiration time </strong> " + str(row.expirationTime) + "<hr/>"
+				self.textEdit.setHtml('<h2>Cookies</h2>' + detail)
+			elif self.tree_category == ':Bluetooths':
+				detail = "<strong>Address</strong> " + str(row.addressValue) + "<hr/>"
+				self.textEdit.setHtml('<h2>Device connection (bluetooth)</h2>' + detail)
+			elif self.tree_category == ':Events':
+				detail = "<strong>Type</strong> " + str(row.eventType) + "<br/>" + \
+				"<strong>Text</strong> " + str(row.eventText) + "<br/>" + \
+				"<strong>Created time</strong> " + str(row.observableCreatedTime) + "<hr/>"
+				self.textEdit.setHtml('<h2>Events</h2>' + detail)
+			elif self.tree_category == ':Images':
+				detail = self.gather_data_file(row)
+				self.textEdit.setHtml('<h2>Image</h2>' + detail)
+			elif self.tree_category == ':Audios':
+				detail = self.gather_data_file(row)
+				self.textEdit.setHtml('<h2>Audio</h2>' + detail)
+			elif self.tree_category == ':Texts':
+				detail = self.gather_data_file(row)
+				self.textEdit.setHtml('<h2>Text</h2>' + detail)
+			elif self.tree_category == ':Videos':
+				detail = self.gather_data_file(row)
+				self.textEdit.setHtml('<h2>Video</h2>' + detail)
+			elif self.tree_category == ':Archives':
+				detail = self.gather_data_file(row)
+				self.textEdit.setHtml('<h2>Archive</h2>' + detail)
+			elif self.tree_category == ':Databases':
+				detail = self.gather_data_file(row)
+				self.textEdit.setHtml('<h2>Database</h2>' + detail)
+			elif self.tree_category == ':Applications':
+				detail = self.gather_data_file(row)
+				self.textEdit.setHtml('<h2>Application</h2>' + detail)
+			elif self.tree_category == ':Uncategorized':
+				detail = self.gather_data_file(row)
+				self.textEdit.setHtml('<h2>Uncategorized</h2>' + detail)
+			elif self.tree_category == ':LocationDevice':
+				item = row
+				detail = "<strong>Start date</strong> " + str(item.mappedByStartDate) + "<br/>" + \
+				"<strong>Latitude</strong> " + str(item.mappedByLatitude) + "<br/>" + \
+				"<strong>Longitude</strong> " + str(item.mappedByLongitude) + "<hr/>"
+				self.textEdit.setHtml('<h2>Location device</h2>' + detail)
+			elif self.tree_category == ':SocialMediaActivities':
+				item = row
+				detail = "<strong>Body</strong> " + str(item.body) + "<br/>" + \
+				"<strong>Title</strong> " + str(item.pageTitle) + "<br/>" + \
+				"<strong>Date</strong> " + str(item.observableCreatedTime) + "<br/>"
+				"<strong>ApplicationName</strong> " + str(item.application) + "<br/>"
+				"<strong>Author ID</strong> " + str(item.authorIdentifier) + "<br/>"
+				"<strong>Account ID</strong> " + str(item.authorName) + "<br/>"
+				"<strong>Name</strong> " + str(item.application) + "<br/>"
+				"<strong>Type</strong> " + str(item.activityType)
+				self.textEdit.setHtml('<h2>Social media activity</h2>' + detail)
+			elif self.tree_category == ':WebBookmarks':
+				detail = "<strong>Url</strong> " + str(row.urlTargeted) + "<br/>" + \
+				"<strong>Path</strong> " + str(row.bookmarkPath) + "<br/>" + \
+				"<strong>Application</strong> " + str(row.application) + "<br/>" + \
+				"<strong>Created time</strong> " + str(row.observableCreatedTime) + "<hr/>"
+				self.textEdit.setHtml('<h2>Web Bookmark</h2>' + detail)
+			elif self.tree_category == ':WebHistories':
+				detail = "<strong>Url</strong> " + str(row.url) + "<br/>" + \
+				"<strong>Title</strong> " + str(row.title) + "<br/>" + \
+				"<strong>Browser</strong> " + str(row.browserInformation) + "<br/>" + \
+				"<strong>Last visited</strong> " + str(row.lastVisited) + "<hr/>"
+				self.textEdit.setHtml('<h2>Web History</h2>' + detail)
+			elif self.tree_category == ':WebSearchTerms':
+				detail = "<strong>Web Search Term</strong> " + str(row.searchTerm) + "<hr/>"
+				self.textEdit.setHtml('<h2>Web Search Terms</h2>' + detail)
+			elif self.tree_category == ':WirelessNet':
+				detail = "<strong>SSID</strong> " + str(row.ssid) + "<br/>" + \
+				"<strong>Base Station</strong> " + str(row.baseStation) + "<hr/>"
+				self.textEdit.setHtml('<h2>Wireless Network Connection</h2>' + detail)
+			else:
+				self.textEdit.setHtml('<h2>Here the details of the cyber item will be displayed</h2>')
+				print("item selected is not an Email")
+
+	def gather_all_chats(self):
+		html_text="<h2>Chat messages</h2><br/>"
+		thread = self.session.lookup("chatThreads", self.tree_record_id)
+		if thread is None:
+			return html_text
+		for m in self.session.thread_messages(thread):
+			html_text += "<strong>From</strong> " + m.from_ + "<br/>" + \
+			"<strong>To</strong> " + " ".join(m.to) + "<br/>" + \
+			"<strong>Application</strong> " + m.application + "<br/>" + \
+			"<strong>Message</strong><br/>" + m.messageText + "<hr/>"
+		return html_text
+
+
+	def gather_all_accounts(self):
+		html_text="<h2>Accounts data</h2><br/>"
+		for a in self.session.table("accounts"):
+			html_text = html_text + \
+			"<strong>Identifier</strong> " + a.accountIdentifier + "<br/>" + \
+			"<strong>Phone number</strong> " + a.phoneAccount + "<br/>" + \
+			"<strong>Application</strong> " + a.application + "<br/>" + \
+			"<strong>Display name</strong> " + a.displayName + "<hr/>"
+		return html_text
+
+	def gather_all_calendars(self):
+		html_text="<h2>Calendars data</h2><br/>"
+		for c in self.session.table("calendars"):
+			html_text = html_text + \
+			"<strong>Subject</strong> " + str(c.subject) + "<br/>" + \
+			"<strong>Start</strong> " + str(c.startTime) + "<br/>" + \
+			"<strong>End</strong> " + str(c.endTime) + "<br/>" + \
+			"<strong>Recurrence</strong> " + str(c.recurrence) + "<hr/>"
+		return html_text
+
+	def gather_all_calls(self):
+		html_text="<h2>Calls data</h2><br/>"
+		for a in self.session.table("phoneCalls"):
+			html_text = html_text + \
+			"<strong>From</strong> " + str(a.from_) + "<br/>" + \
+			"<strong>To</strong> " + str(a.to) + "<br/>" + \
+			"<strong>Name</strong> " + a.name + "<br/>" + \
+			"<strong>Start time</strong> " + str(a.startTime) + "<br/>" + \
+			"<strong>Duration (s.)</strong> " + str(a.duration) + "<hr/>"
+		return html_text
+
+	def gather_all_cellsites(self):
+		html_text="<h2>Cellsites data</h2><br/>"
+		for a in self.session.table("cell_sites"):
+			html_text = html_text + \
+			"<strong>Country code</strong> " + str(a.cellSiteCountryCode) + "<br/>" + \
+				"<strong>Identifier</strong> " + str(a.cellSiteIdentifier) + "<br/>" + \
+				"<strong>Network code</strong> " + str(a.cellSiteNetworkCode) + "<br/>" + \
+				"<strong>Location area code </strong> " + str(a.cellSiteLocationAreaCode) + "<br/>" + \
+				"<strong>Site type </strong> " + str(a.cellSiteType) + "<hr/>"
+		return html_text
+
+	def gather_all_cookies(self):
+		html_text="<h2>Cookies data</h2><br/>"
+		for item in self.session.table("cookies"):
+			html_text = html_text + \
+			"<strong>Name</strong> " + str(item.cookieName) + "<br/>" + \
+			"<strong>Path</strong> " + str(item.cookiePath) + "<br/>" + \
+			"<strong>Application </strong> " + str(item.cookieApp) + "<br/>" + \
+			"<strong>Crreated time </strong> " + str(item.accessedTime) + "<br/>" + \
+			"<strong>Expiration time </strong> " + str(item.expirationTime) + "<hr/>"
+		return html_text
+
+	def gather_all_device_connection(self):
+		html_text="<h2>Device connection data</h2><br/>"
+		for item in self.session.table("bluetooths"):
+			html_text = html_text + \
+			"<strong>Address</strong> " + str(item.addressValue) + "<hr/>"
+		return html_text
+
+	def gather_all_emails(self):
+		html_text="<h2>Email data</h2><br/>"
+		for item in self.session.table("emailMessages"):
+			html_text = html_text + \
+			"<strong>From</strong> " + str(item.from_) + "<br/>" + \
+			"<strong>To</strong> " + str(item.to) + "<br/>" + \
+			"<strong>Cc</strong> " + str(item.cc) + "<br/>" + \
+			"<strong>Bcc</strong> " + str(item.bcc) + "<br/>" + \
+			"<strong>Subject</strong> " + str(item.subject) + "<br/>" + \
+			"<strong>Sent time</strong> " + str(item.sentTime) + "<br/>" + \
+			"<strong>Body</strong> " + str(item.body) + "<hr/>"
+		return html_text
+
+	def gather_all_events(self):
+		html_text="<h2>Events data</h2><br/>"
+		for item in self.session.table("events"):
+			html_text = html_text + \
+			"<strong>Tipo</strong> " + str(item.eventType) + "<br/>" + \
+			"<strong>Text</strong> " + str(item.eventText) + "<br/>" + \
+			"<strong>Created time</strong> " + str(item.observableCreatedTime) + "<hr/>"
+		return html_text
+
+	def gather_all_files(self, type, arrayFiles):
+		html_text="<h2>" + type + " data</h2><br/>"
+		for item in arrayFiles:
+			html_text = html_text + \
+			"<strong>Name</strong> " + str(item.fileName) + "<br/>" + \
+			"<strong>Path</strong> " + str(item.filePath) + "<br/>" + \
+			"<strong>Size</strong> " + str(item.fileSize) + "<hr/>"
+		return html_text
+
+	def gather_all_locations(self):
+		html_text="<h2>Location device data</h2><br/>"
+		for item in self.session.table("relationMappedBy"):
+			html_text = html_text + \
+			"<strong>Start date</strong> " + str(item.mappedByStartDate) + "<br/>" + \
+			"<strong>Latitude</strong> " + str(item.mappedByLatitude) + "<br/>" + \
+			"<strong>Longitude</strong> " + str(item.mappedByLongitude) + "<hr/>"
+		return html_text
+
+	def gather_data_file(self, row):
+		detail = "<strong>Name</strong> " + str(row.fileName) + "<br/>" + \
+		"<strong>Path</strong> " + str(row.filePath) + "<br/>" + \
+		"<strong>Size</strong> " + str(row.fileSize) + "<hr/>"
+		return(detail)
+
+	def gather_all_social_media_activities(self):
+		html_text="<h2>Social Media Activities data</h2><br/>"
+		for item in self.session.table("social_media_activities"):
+			html_text = html_text + \
+			"<strong>Body</strong> " + str(item.body) + "<br/>" + \
+			"<strong>Title</strong> " + str(item.pageTitle) + "<br/>" + \
+			"<strong>Date</strong> " + str(item.observableCreatedTime) + "<br/>" + \
+			"<strong>ApplicationName</strong> " + str(item.application) + "<br/>" + \
+			"<strong>Author ID</strong> " + str(item.authorIdentifier) + "<br/>" + \
+			"<strong>Account ID</strong> " + str(item.authorName) + "<br/>" + \
+			"<strong>Name</strong> " + str(item.application) + "<br/>" + \
+			"<strong>Type</strong> " + str(item.activityType) + "<hr/>"
+		return html_text
+
+	def gather_all_web_histories(self):
+		html_text="<h2>Web History data</h2><br/>"
+		for item in self.session.table("webURLHistory"):
+			html_text = html_text + \
+			"<strong>Url</strong> " + str(item.url) + "<br/>" + \
+			"<strong>Title</strong> " + str(item.title) + "<br/>" + \
+			"<strong>Browser</strong> " + str(item.browserInformation) + "<br/>" + \
+			"<strong>Last visited</strong> " + str(item.lastVisited) + "<hr/>"
+		return html_text
+
+	def gather_all_web_bookmarks(self):
+		html_text="<h2>Web Bookmark data</h2><br/>"
+		for item in self.session.table("webBookmark"):
+			html_text = html_text + \
+			"<strong>Url</strong> " + str(item.urlTargeted) + "<br/>" + \
+			"<strong>Path</strong> " + str(item.bookmarkPath) + "<br/>" + \
+			"<strong>Application</strong> " + str(item.application) + "<br/>" + \
+			"<strong>Created time</strong> " + str(item.observableCreatedTime) + "<hr/>"
+		return html_text
+
+	def gather_all_web_search_terms(self):
+		html_text="<h2>Web Search Terms data</h2><br/>"
+		for item in self.session.table("webSearchTerm"):
+			html_text = html_text + \
+			"<strong>Search term</strong> " + str(item.searchTerm) + "<hr/>"
+		return html_text
+
+	def gather_all_wireless_nets(self) -> str:
+		html_text="<h2>Wireless Network connections</h2><br/>"
+		for item in self.session.table("wireless_net"):
+			html_text = html_text + \
+			"<strong>SSID</strong> " + str(item.ssid) + "<br/>" + \
+			"<strong>Base station</strong> " + str(item.baseStation) + "<hr/>"
+		return html_text
+
+
+class IngestWorker(QtCore.QThread):
+	# ProgressReport of the processing, emitted every CaseIngest.PROGRESS_INTERVAL seconds
+	progress = QtCore.pyqtSignal(object)
+	failed = QtCore.pyqtSignal(str)
+
+	def __init__(self, session, f, stream, inputName=''):
+		super(IngestWorker, self).__init__()
+		self.session = session
+		self.ingest = session.ingest(f, stream, inputName)
+
+	@property
+	def nObjects(self):
+		return self.ingest.nObjects
+
+	@property
+	def cancelled(self):
+		return self.ingest.cancelled
+
+	def run(self):
+		try:
+			self.session.run(self.ingest, self.progress.emit, self.isInterruptionRequested)
+		except Exception as e:
+			print(C_CYAN + "ERROR: in Loading the JSON structure! \n\n" + C_BLACK + "\n\n")
+			print (e)
+			self.failed.emit(str(e))
+
+
+def run_viewer(f, stream, inputName, cacheDir, cacheSize, storage="columnar", jobs=1) -> int:
+	app = QApplication([])
+
+#--- Set the UI layout, the observables are processed in background
+	# The processes of --jobs are spawned by the worker thread, see parallel.
+	session = CaseSession(cacheDir, cacheSize, storage, jobs)
+	worker = IngestWorker(session, f, stream, inputName)
+	build_tree_data(session)
+	_view = view(session, worker=worker, inputName=inputName)
+	_view.setGeometry(50, 50, 1400, 800)
+	_view.show()
+	worker.start()
+	return app.exec()
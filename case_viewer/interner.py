@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+Integer codes of the strings repeated across the CASE objects.
+
+Each @id met while a case is processed is given a dense integer, in order of
+appearance, and the records refer to each other by those integers: an integer
+takes less memory than the IRI it stands for, it is shared by all the
+references to the same object, and it is hashed and compared in constant
+time.  The IRIs are kept once, in the interner, for display and export.
+
+The values of the categorical fields (application names, MIME tags, message
+and event types) are coded the same way, by a Categories dictionary per field.
+"""
+
+import threading
+from itertools import islice
+from typing import Iterable, Iterator, Optional, Sequence, Union, overload
+
+
+class IdInterner:
+	"""
+	Table of the IRIs by integer key.  The key 0 is never assigned, so a key is always true and a missing reference can be told apart by its falsiness.
+
+	>>> ids = IdInterner()
+	>>> ids.intern("kb:thread-1"), ids.intern("kb:msg-1"), ids.intern("kb:thread-1")
+	(1, 2, 1)
+	>>> ids.iri(2), ids.get("kb:msg-1"), ids.get("kb:msg-2")
+	('kb:msg-1', 2, None)
+	>>> len(ids), list(ids.rows())
+	(2, [{'iri': 'kb:thread-1'}, {'iri': 'kb:msg-1'}])
+	>>> ids.iri(0)
+	Traceback (most recent call last):
+	...
+	KeyError: 0
+	"""
+
+	def __init__(self) -> None:
+		self._keys: dict[str, int] = {}
+		self._iris: list[str] = [""]
+
+	def intern(self, iri: str) -> int:
+		"""
+		This method returns the key of an IRI, assigning the next one if the IRI is new.
+		"""
+		key = self._keys.get(iri)
+		if key is None:
+			key = self._keys[iri] = len(self._iris)
+			self._iris.append(iri)
+		return key
+
+	def get(self, iri: str) -> Optional[int]:
+		return self._keys.get(iri)
+
+	def iri(self, key: int) -> str:
+		if not 0 < key < len(self._iris):
+			raise KeyError(key)
+		return self._iris[key]
+
+	def __len__(self) -> int:
+		return len(self._iris) - 1
+
+	def clear(self) -> None:
+		self._keys.clear()
+		del self._iris[1:]
+
+	def iris(self) -> list[str]:
+		"""
+		This method returns the IRIs in key order, starting from the key 1.
+		"""
+		return self._iris[1:]
+
+	def merge(self, iris: Iterable[str]) -> list[int]:
+		"""
+		This method interns the IRIs of another interner, given in key order, and returns the list mapping the keys of the other interner to the keys of this one.
+
+		>>> ids, other = IdInterner(), IdInterner()
+		>>> ids.intern("kb:a"), other.intern("kb:b"), other.intern("kb:a")
+		(1, 1, 2)
+		>>> ids.merge(other.iris()), ids.iris()
+		([0, 2, 1], ['kb:a', 'kb:b'])
+		"""
+		return [0] + [self.intern(iri) for iri in iris]
+
+	def rows(self) -> "IriRows":
+		"""
+		This method returns the IRIs as a table of records with an ``iri`` field, in key order starting from 1, built on access.
+		"""
+		return IriRows(self._iris)
+
+
+class IriRows(Sequence[dict[str, str]]):
+	def __init__(self, iris: list[str]) -> None:
+		self._iris = iris
+
+	def __len__(self) -> int:
+		return len(self._iris) - 1
+
+	@overload
+	def __getitem__(self, index: int) -> dict[str, str]: ...
+
+	@overload
+	def __getitem__(self, index: slice) -> list[dict[str, str]]: ...
+
+	def __getitem__(self, index: Union[int, slice]) -> Union[dict[str, str], list[dict[str, str]]]:
+		if isinstance(index, slice):
+			return [self[i] for i in range(*index.indices(len(self)))]
+		if index < 0:
+			index += len(self)
+		if not 0 <= index < len(self):
+			raise IndexError("Row out of range.")
+		return {"iri": self._iris[index + 1]}
+
+	def __iter__(self) -> Iterator[dict[str, str]]:
+		return ({"iri": iri} for iri in islice(self._iris, 1, None))
+
+
+class Categories:
+	"""
+	Dictionary of the values of a categorical field, coded by integers in order of appearance.  The code of a value is the same int object for all the records having it.  The dictionary is shared by the sessions processing cases in different threads, so a new value is coded under a lock.
+
+	>>> types = Categories()
+	>>> types.code("CHAT Message"), types.code("SMS/Native Message"), types.code("CHAT Message")
+	(0, 1, 0)
+	>>> types.value(1), types.get("CHAT Message"), types.get("MMS"), len(types)
+	('SMS/Native Message', 0, None, 2)
+	>>> types.values()
+	['CHAT Message', 'SMS/Native Message']
+	>>> types.clear()
+	>>> types.code("SMS/Native Message"), len(types)
+	(0, 1)
+	"""
+
+	def __init__(self) -> None:
+		self._codes: dict[str, int] = {}
+		self._values: list[str] = []
+		self._lock = threading.Lock()
+
+	def code(self, value: str) -> int:
+		"""
+		This method returns the code of a value, assigning the next one if the value is new.
+		"""
+		code = self._codes.get(value)
+		if code is None:
+			with self._lock:
+				code = self._codes.get(value)
+				if code is None:
+					self._values.append(value)
+					code = self._codes[value] = len(self._values) - 1
+		return code
+
+	def get(self, value: str) -> Optional[int]:
+		return self._codes.get(value)
+
+	def value(self, code: int) -> str:
+		return self._values[code]
+
+	def values(self) -> list[str]:
+		return list(self._values)
+
+	def clear(self) -> None:
+		"""
+		This method empties the dictionary: the codes given so far are no longer valid.
+		"""
+		with self._lock:
+			self._codes.clear()
+			self._values.clear()
+
+	def __len__(self) -> int:
+		return len(self._values)
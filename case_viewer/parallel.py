@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+Parallel decoding of the CASE objects of a JSON-LD file.
+
+The ``uco-core:object`` (or ``@graph``) array is split in chunks of
+consecutive objects, which are decoded by a pool of processes.  The file is
+mapped in memory and its bytes are scanned once, from the start of the array,
+for the brackets outside the strings: the depth of the brackets tells where
+each object of the array ends, and a chunk ends with the first object ending
+after its size.  A process is given the byte range of a chunk, reads it from
+the file and decodes its objects, checking their syntax and the separators
+between them, so the document is never decoded as a whole and the chunks are
+mapped in the order of the document.
+
+The processes are spawned rather than forked from the calling process: the
+chunks can be mapped from any thread of a process running other threads, e.g.
+from the worker thread of a GUI, and the processes are children of the calling
+process, whose resource usage accounts for them once they end.  The function
+applied to the objects is given to the processes by reference, so it must be
+defined at the top level of a module, and it is applied in the processes only,
+never in the calling process.
+"""
+
+import json
+import mmap
+import multiprocessing
+import re
+from collections import deque
+from multiprocessing.context import BaseContext
+from typing import Any, Callable, Iterator, TypeVar, Union
+
+from .stream import CASE_OBJECT_KEYS
+
+# Chunks of each process, so that a process finishing early takes the
+# chunks of the others, and largest size of a chunk in bytes.
+CHUNKS_PER_JOB = 4
+MAX_CHUNK_SIZE = 32 << 20
+
+# Chunks decoded or waiting for a process, by process: the results are
+# merged in order, so the chunks decoded ahead of the first one wait in
+# memory.
+CHUNKS_IN_FLIGHT = 2
+
+T = TypeVar("T")
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r"[ \t\n\r]*")
+_byte_whitespace = re.compile(rb"[ \t\n\r]*")
+# The bytes up to the next bracket outside the strings, the bracket included.
+_bracket = re.compile(rb'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*([\[\]{}])', re.DOTALL)
+_string = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_scalar = re.compile(rb"[^,}\]\s]*")
+
+_OPENING = b"[{"
+
+
+def _skip(text: Union[str, bytes, mmap.mmap], pos: int) -> int:
+	match = _whitespace.match(text, pos) if isinstance(text, str) else _byte_whitespace.match(text, pos)
+	assert match is not None
+	return match.end()
+
+
+def _expect(text: Union[str, bytes, mmap.mmap], pos: int, chars: str) -> int:
+	pos = _skip(text, pos)
+	char = text[pos:pos + 1]
+	if isinstance(char, bytes):
+		char = char.decode("utf-8", "replace")
+	if char == "" or char not in chars:
+		raise ValueError("Expected one of %r, found %r." % (tuple(chars), char or "end of file"))
+	return pos + 1
+
+
+def _value_end(buffer: Union[bytes, mmap.mmap], pos: int) -> int:
+	# The end of the JSON value starting at pos, whose syntax is not checked
+	char = buffer[pos:pos + 1]
+	if char and char in _OPENING:
+		depth = 0
+		while True:
+			match = _bracket.match(buffer, pos)
+			if match is None:
+				raise ValueError("Expected one of (',', '}'), found 'end of file'.")
+			pos = match.end()
+			depth += 1 if buffer[pos - 1] in _OPENING else -1
+			if depth == 0:
+				return pos
+	match = (_string if char == b'"' else _scalar).match(buffer, pos)
+	if match is None:
+		raise ValueError("Unterminated string.")
+	return match.end()
+
+
+def _array_start(buffer: Union[bytes, mmap.mmap]) -> int:
+	# The position of the first object of the object array, after the keys
+	# and values preceding the array, whose syntax is checked.
+	pos = _expect(buffer, 0, "{")
+	pos = _skip(buffer, pos)
+	while buffer[pos:pos + 1] != b"}":
+		end = _value_end(buffer, pos)
+		key = json.loads(buffer[pos:end])
+		pos = _expect(buffer, end, ":")
+		pos = _skip(buffer, pos)
+		if key in CASE_OBJECT_KEYS:
+			return _skip(buffer, _expect(buffer, pos, "["))
+		end = _value_end(buffer, pos)
+		json.loads(buffer[pos:end])
+		pos = _expect(buffer, end, ",}")
+		if buffer[pos - 1:pos] == b"}":
+			break
+		pos = _skip(buffer, pos)
+	raise ValueError("Neither key uco-core:object nor @graph have been found.")
+
+
+def _check_end(text: str, pos: int) -> None:
+	# The keys and values following the object array
+	pos = _expect(text, pos, ",}")
+	while text[pos - 1] == ",":
+		_, pos = _decoder.raw_decode(text, _skip(text, pos))
+		pos = _expect(text, pos, ":")
+		_, pos = _decoder.raw_decode(text, _skip(text, pos))
+		pos = _expect(text, pos, ",}")
+	if _skip(text, pos) != len(text):
+		raise ValueError("Extra data after the JSON document.")
+
+
+def chunk_spans(buffer: Union[bytes, mmap.mmap], start: int, size: int) -> Iterator[tuple[int, int]]:
+	"""
+	This method yields the byte ranges of the chunks of the array of objects starting at ``start``, found by the depth of the brackets outside the strings: a chunk ends after the first object ending ``size`` bytes or more after its start, the next one starts with the separator, and the last one ends after the closing bracket of the array.
+
+	>>> data = b'[{"a": [{"b": "}"}, {"b": 2}]}, {"a": "[\\\\"]"}, {"a": [{"b": 3}]},\\n {"a": []}]'
+	>>> [data[start:stop] for start, stop in chunk_spans(data, 1, 20)]
+	[b'{"a": [{"b": "}"}, {"b": 2}]}', b', {"a": "[\\\\"]"}, {"a": [{"b": 3}]}', b',\\n {"a": []}]']
+	>>> list(chunk_spans(data, 1, len(data))) == [(1, len(data))]
+	True
+	>>> list(chunk_spans(b'[{"a": "]"}', 1, 4))
+	Traceback (most recent call last):
+	...
+	ValueError: Expected one of (',', ']'), found 'end of file'.
+	"""
+	first = pos = last = start
+	depth = 0
+	while True:
+		match = _bracket.match(buffer, pos)
+		if match is None:
+			raise ValueError("Expected one of (',', ']'), found 'end of file'.")
+		pos = match.end()
+		if buffer[pos - 1] in _OPENING:
+			# An object of the array starts after the chunk has reached its size.
+			if depth == 0 and last - first >= size:
+				yield first, last
+				first = last
+			depth += 1
+		else:
+			depth -= 1
+			if depth == 0:
+				last = pos
+			elif depth < 0:
+				yield first, pos
+				return
+
+
+def _decode(text: str, first: bool, function: Callable[[list[dict[str, Any]]], T]) -> T:
+	# The objects of a chunk, which but the first starts with the separator
+	# and the last ends with the closing bracket of the array; a chunk other
+	# than the first starts after an object, where a missing separator is
+	# reported as the serial decoding does.
+	pos = 0 if first else _expect(text, 0, ",]")
+	objects: list[dict[str, Any]] = []
+	while True:
+		obj, pos = _decoder.raw_decode(text, _skip(text, pos))
+		if not isinstance(obj, dict):
+			raise TypeError("Unexpected type for an element of the object array: %r." % type(obj))
+		objects.append(obj)
+		pos = _skip(text, pos)
+		if pos == len(text):
+			break
+		pos = _expect(text, pos, ",]")
+		if text[pos - 1] == "]":
+			break
+	return function(objects)
+
+
+def _decode_span(path: str, start: int, stop: int, first: bool, function: Callable[[list[dict[str, Any]]], T]) -> T:
+	# Run by a process of the pool: the chunk is read from the file.
+	with open(path, "rb") as fp:
+		fp.seek(start)
+		text = fp.read(stop - start).decode("utf-8")
+	return _decode(text, first, function)
+
+
+def pool_context() -> BaseContext:
+	"""
+	This method returns the context of the processes of the pool, spawned on every system.
+	"""
+	return multiprocessing.get_context("spawn")
+
+
+def map_file(path: str, function: Callable[[list[dict[str, Any]]], T], jobs: int, chunk_size: int = 0) -> list[T]:
+	"""
+	This method applies the function to the lists of the consecutive objects of the ``uco-core:object`` (or ``@graph``) array of the JSON-LD file, decoded by ``jobs`` processes, and returns the results in the order of the document.  The whole document is checked, as by ``json.load``.  By default, each process decodes CHUNKS_PER_JOB chunks of at most MAX_CHUNK_SIZE bytes.
+
+	>>> import os, tempfile
+	>>> def case(text):
+	...     fd, path = tempfile.mkstemp(suffix=".json")
+	...     with os.fdopen(fd, "w", encoding="utf-8") as fp:
+	...         _ = fp.write(text)
+	...     return path
+	>>> path = case('{"@context": {"kb": "x"}, "@graph": [{"@id": "kb:a", "x": [{"y": "]"}, {"y": 2}]}, {"@id": "kb:b"}, {"@id": "kb:c"}], "z": 1}')
+	>>> map_file(path, len, 1, chunk_size=1 << 20)
+	[3]
+	>>> map_file(path, len, 2, chunk_size=1)
+	[1, 1, 1]
+	>>> map_file(case('{"@graph": []}'), len, 2)
+	[]
+	>>> map_file(case('{"@graph": [{"@id": "kb:a"} {"@id": "kb:b"}]}'), len, 2)
+	Traceback (most recent call last):
+	...
+	ValueError: Expected one of (',', ']'), found '{'.
+	>>> map_file(case('{"@context": {}}'), len, 2)
+	Traceback (most recent call last):
+	...
+	ValueError: Neither key uco-core:object nor @graph have been found.
+	>>> map_file(case('{"@graph": [{"@id": "kb:a"}], "z": 1} x'), len, 2)
+	Traceback (most recent call last):
+	...
+	ValueError: Extra data after the JSON document.
+	"""
+	return [result for _, result in imap_file(path, function, jobs, chunk_size)]
+
+
+def imap_file(path: str, function: Callable[[list[dict[str, Any]]], T], jobs: int, chunk_size: int = 0) -> Iterator[tuple[int, T]]:
+	"""
+	This method yields the results of map_file one at a time, in order, each with the position in the file of the end of its chunk.  At most CHUNKS_IN_FLIGHT chunks by process are decoded ahead of the one yielded, and the processes are stopped when the iteration is.
+	"""
+	with open(path, "rb") as fp:
+		try:
+			buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+		except ValueError:
+			# An empty file cannot be mapped.
+			raise ValueError("Expected one of ('{',), found 'end of file'.") from None
+	with buffer:
+		start = _array_start(buffer)
+		if buffer[start:start + 1] == b"]":
+			_check_end(buffer[start + 1:].decode("utf-8"), 0)
+			return
+		size = chunk_size or max(1, min(MAX_CHUNK_SIZE, (len(buffer) - start) // (jobs * CHUNKS_PER_JOB)))
+		end = start
+		if jobs <= 1:
+			for begin, end in chunk_spans(buffer, start, size):
+				yield end, _decode(buffer[begin:end].decode("utf-8"), begin == start, function)
+		else:
+			with pool_context().Pool(jobs) as pool:
+				pending: deque[tuple[int, Any]] = deque()
+				for begin, stop in chunk_spans(buffer, start, size):
+					pending.append((stop, pool.apply_async(_decode_span, (path, begin, stop, begin == start, function))))
+					if len(pending) >= jobs * CHUNKS_IN_FLIGHT:
+						end, result = pending.popleft()
+						yield end, result.get()
+				while pending:
+					end, result = pending.popleft()
+					yield end, result.get()
+		_check_end(buffer[end:].decode("utf-8"), 0)
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+Profile of the processing of a case file, by stage.
+
+A stage is a part of the processing, e.g. the loading of the JSON document or
+the resolution of the references, or the processor of a facet type, timed each
+time it runs: the profile holds the number of its runs, their wall time and
+the CPU time of the thread running them.  The times of a stage include those of
+the stages it runs.  The memory is profiled as well: the peak resident set
+size of the process and, through tracemalloc, the lines of code holding the
+most memory when the snapshot is taken.
+
+The profile is written as a JSON report, and summarised as a table.
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, Mapping, Optional, TypeVar
+
+# Lines of code listed as the top allocators
+TOP_ALLOCATORS = 10
+
+# Groups of the stages: the steps of the processing, and the processors of
+# the facet types and of the kinds of relationship.
+STAGE = "stage"
+PROCESSOR = "processor"
+
+T = TypeVar("T")
+
+
+class StageStats:
+	__slots__ = ("group", "calls", "wall", "cpu")
+
+	def __init__(self, group: str, calls: int = 0, wall: float = 0.0, cpu: float = 0.0) -> None:
+		self.group = group
+		self.calls = calls
+		self.wall = wall  # seconds
+		self.cpu = cpu  # seconds of the thread running the stage
+
+	def __getstate__(self) -> tuple[str, int, float, float]:
+		return (self.group, self.calls, self.wall, self.cpu)
+
+	def __setstate__(self, state: tuple[str, int, float, float]) -> None:
+		self.group, self.calls, self.wall, self.cpu = state
+
+
+def peak_rss(children: bool = False) -> Optional[int]:
+	"""
+	This method returns the peak resident set size, in bytes, of the process or of the largest of its terminated child processes, None where it is not known (Windows).
+	"""
+	try:
+		import resource
+	except ImportError:
+		return None
+	usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+	# In kilobytes, but on macOS
+	return int(usage) if sys.platform == "darwin" else int(usage) * 1024
+
+
+def _megabytes(n: Optional[int]) -> str:
+	return "-" if n is None else "%.1f MB" % (n / (1 << 20))
+
+
+class Profiler:
+	"""
+	Profile of the stages of a processing.  The memory allocations are traced from start to stop, if ``memory``.
+
+	>>> ticks = iter(range(100))
+	>>> profiler = Profiler(memory=False, clock=lambda: float(next(ticks)), cpu_clock=lambda: 0.5)
+	>>> with profiler.stage("json.load"):
+	...     pass
+	>>> double = profiler.wrap("uco-observable:CallFacet", lambda n: 2 * n)
+	>>> double(1) + double(2)
+	6
+	>>> [n for n in profiler.iterate("stream", [1, 2])]
+	[1, 2]
+	>>> report = profiler.report()
+	>>> [(s["name"], s["group"], s["calls"], s["wall"], s["cpu"]) for s in report["stages"]]
+	[('stream', 'stage', 3, 3.0, 0.0), ('json.load', 'stage', 1, 1.0, 0.0), ('uco-observable:CallFacet', 'processor', 2, 2.0, 0.0)]
+	>>> print(format_summary(report).splitlines()[1])
+	stream                                                  3        3.000        0.000
+	"""
+
+	def __init__(self, memory: bool = True, clock: Callable[[], float] = time.perf_counter, cpu_clock: Callable[[], float] = time.thread_time) -> None:
+		self.memory = memory
+		self._clock = clock
+		self._cpu_clock = cpu_clock
+		self._stats: dict[str, StageStats] = {}
+		self._snapshot: Optional[tracemalloc.Snapshot] = None
+		self._traced: Optional[tuple[int, int]] = None
+
+	def start(self) -> None:
+		if self.memory:
+			tracemalloc.start()
+
+	def stop(self) -> None:
+		if self.memory and tracemalloc.is_tracing():
+			if self._snapshot is None:
+				self.snapshot()
+			tracemalloc.stop()
+
+	def _add(self, name: str, group: str, wall: float, cpu: float) -> None:
+		stats = self._stats.get(name)
+		if stats is None:
+			stats = self._stats[name] = StageStats(group)
+		stats.calls += 1
+		stats.wall += wall
+		stats.cpu += cpu
+
+	@contextmanager
+	def stage(self, name: str, group: str = STAGE) -> Iterator[None]:
+		"""
+		This method times the code run in the context as a run of the stage.
+		"""
+		wall, cpu = self._clock(), self._cpu_clock()
+		try:
+			yield
+		finally:
+			self._add(name, group, self._clock() - wall, self._cpu_clock() - cpu)
+
+	def wrap(self, name: str, function: Callable[..., T], group: str = PROCESSOR) -> Callable[..., T]:
+		"""
+		This method returns the function, whose calls are timed as runs of the stage.
+		"""
+		def timed(*args: Any, **kwargs: Any) -> T:
+			wall, cpu = self._clock(), self._cpu_clock()
+			try:
+				return function(*args, **kwargs)
+			finally:
+				self._add(name, group, self._clock() - wall, self._cpu_clock() - cpu)
+		return timed
+
+	def iterate(self, name: str, iterable: Iterable[T], group: str = STAGE) -> Iterator[T]:
+		"""
+		This method yields the items of the iterable, the making of each item being timed as a run of the stage, e.g. the decoding of the objects read one at a time.
+		"""
+		iterator = iter(iterable)
+		while True:
+			wall, cpu = self._clock(), self._cpu_clock()
+			try:
+				item = next(iterator)
+			except StopIteration:
+				return
+			finally:
+				self._add(name, group, self._clock() - wall, self._cpu_clock() - cpu)
+			yield item
+
+	def stats(self) -> dict[str, StageStats]:
+		return self._stats
+
+	def add(self, stats: Mapping[str, StageStats]) -> None:
+		"""
+		This method adds the stats of another profiler to the profile, e.g. those of a child process.
+		"""
+		for name, other in stats.items():
+			mine = self._stats.get(name)
+			if mine is None:
+				mine = self._stats[name] = StageStats(other.group)
+			mine.calls += other.calls
+			mine.wall += other.wall
+			mine.cpu += other.cpu
+
+	def snapshot(self) -> None:
+		"""
+		This method takes the snapshot of the traced memory whose top allocators are reported, replacing the previous one: it is taken by stop when no snapshot has been taken.
+		"""
+		if not (self.memory and tracemalloc.is_tracing()):
+			return
+		self._snapshot = tracemalloc.take_snapshot()
+		self._traced = tracemalloc.get_traced_memory()
+
+	def top_allocators(self) -> list[dict[str, Any]]:
+		# The traces of the snapshot are grouped once the tracing is stopped,
+		# as the allocations of the grouping itself would be traced, at ten
+		# times the cost.
+		if self._snapshot is None:
+			return []
+		allocators = []
+		for statistic in self._snapshot.statistics("lineno"):
+			frame = statistic.traceback[0]
+			if frame.filename == tracemalloc.__file__:
+				continue
+			allocators.append({"location": "%s:%d" % (frame.filename, frame.lineno), "size": statistic.size, "count": statistic.count})
+			if len(allocators) == TOP_ALLOCATORS:
+				break
+		return allocators
+
+	def report(self) -> dict[str, Any]:
+		"""
+		This method returns the profile as a JSON-serialisable dictionary: the stages, by group and then by decreasing wall time, and the memory in bytes.
+		"""
+		groups = [STAGE, PROCESSOR]
+		stages = sorted(self._stats.items(), key=lambda item: (groups.index(item[1].group) if item[1].group in groups else len(groups), -item[1].wall))
+		return {
+			"stages": [{"name": name, "group": stats.group, "calls": stats.calls, "wall": round(stats.wall, 6),
+				"cpu": round(stats.cpu, 6)} for name, stats in stages],
+			"memory": {
+				"peak_rss": peak_rss(),
+				"peak_rss_children": peak_rss(children=True) or None,
+				"traced_current": None if self._traced is None else self._traced[0],
+				"traced_peak": None if self._traced is None else self._traced[1],
+				"top_allocators": self.top_allocators()}}
+
+	def write(self, path: str) -> dict[str, Any]:
+		"""
+		This method writes the JSON report to the file, and returns it.
+		"""
+		report = self.report()
+		with open(path, "w", encoding="utf-8") as f:
+			json.dump(report, f, indent=2)
+		return report
+
+
+def format_summary(report: Mapping[str, Any]) -> str:
+	"""
+	This method returns the summary of a report of Profiler as a table of the stages followed by the memory.
+
+	>>> report = {"stages": [{"name": "process_references", "group": "stage", "calls": 1, "wall": 0.25, "cpu": 0.2}],
+	...     "memory": {"peak_rss": 3 << 20, "peak_rss_children": None, "traced_current": 1 << 20, "traced_peak": 2 << 20,
+	...         "top_allocators": [{"location": "records.py:40", "size": 1 << 20, "count": 1000}]}}
+	>>> print(format_summary(report))
+	Stage                                               Calls       Wall s        CPU s
+	process_references                                      1        0.250        0.200
+	<BLANKLINE>
+	Peak RSS 3.0 MB, traced peak 2.0 MB, traced at the snapshot 1.0 MB
+	Top allocators at the snapshot:
+	      1.0 MB        1.000 blocks  records.py:40
+	"""
+	lines = ["%-48s %8s %12s %12s" % ("Stage", "Calls", "Wall s", "CPU s")]
+	group = None
+	for stage in report["stages"]:
+		if group is not None and stage["group"] != group:
+			lines.append("")
+		group = stage["group"]
+		lines.append("%-48s %8d %12.3f %12.3f" % (stage["name"], stage["calls"], stage["wall"], stage["cpu"]))
+	memory = report["memory"]
+	lines.append("")
+	line = "Peak RSS " + _megabytes(memory["peak_rss"])
+	if memory["peak_rss_children"]:
+		line += ", of the child processes " + _megabytes(memory["peak_rss_children"])
+	if memory["traced_peak"] is not None:
+		line += ", traced peak " + _megabytes(memory["traced_peak"]) + ", traced at the snapshot " + _megabytes(memory["traced_current"])
+	lines.append(line)
+	if memory["top_allocators"]:
+		lines.append("Top allocators at the snapshot:")
+		for allocator in memory["top_allocators"]:
+			lines.append("%12s %12s blocks  %s" % (_megabytes(allocator["size"]), "{:,}".format(allocator["count"]).replace(",", "."), allocator["location"]))
+	return "\n".join(lines)
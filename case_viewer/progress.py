@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+Progress of the processing of a case file.
+
+The processing loop asks the ProgressMeter whether a report is due, a clock
+reading, after each object, and makes a ProgressReport only when it is, at a
+fixed interval: the rates, the completion and the estimated time left are
+computed, and shown by the command line and the GUI, a few times a second
+whatever the number of objects.
+"""
+
+import time
+from typing import Callable, Mapping, Optional
+
+# Categories named in the summary of a report
+SUMMARY_CATEGORIES = 3
+
+
+def _number(n: int) -> str:
+	return "{:,}".format(n).replace(",", ".")
+
+
+def _duration(seconds: float) -> str:
+	minutes, seconds = divmod(int(seconds + 0.5), 60)
+	hours, minutes = divmod(minutes, 60)
+	if hours:
+		return "%d:%02d:%02d" % (hours, minutes, seconds)
+	return "%d:%02d" % (minutes, seconds)
+
+
+def category_name(category: str) -> str:
+	"""
+	This method returns the short name of a facet type or a kind of relationship, as counted by the processing.
+
+	>>> category_name("uco-observable:MessageFacet"), category_name("Attached_To")
+	('Message', 'Attached_To')
+	"""
+	name = category.rsplit(":", 1)[-1]
+	if name.endswith("Facet") and name != "Facet":
+		name = name[:-len("Facet")]
+	return name
+
+
+class ProgressReport:
+	"""
+	Progress of the processing at a given time.  The position is the part of the file read, in bytes, or the number of objects processed when the objects have been loaded first; it is out of total, 0 if unknown.
+
+	>>> report = ProgressReport(25000, 5 << 20, 20 << 20, 10.0, {"uco-observable:MessageFacet": 15000, "uco-observable:FileFacet": 6000, "Attached_To": 3000, "uco-observable:CallFacet": 1000})
+	>>> report.objectsRate, report.bytesRate, report.fraction, report.eta
+	(2500.0, 524288.0, 0.25, 30.0)
+	>>> print(report)
+	25.000 objects (2.500/s), 5.0 of 20.0 MB (25%, 0.5 MB/s), 0:10 elapsed, ETA 0:30 - Message 15.000, File 6.000, Attached_To 3.000
+	>>> print(ProgressReport(40, 40, 0, 2.0, {}))
+	40 objects (20/s), 0:02 elapsed
+	"""
+
+	def __init__(self, objects: int, position: int, total: int, elapsed: float, categories: Mapping[str, int], bytes: bool = True) -> None:
+		self.objects = objects
+		self.position = position
+		self.total = total
+		self.elapsed = elapsed
+		self.categories = dict(categories)
+		self.bytes = bytes  # false if the position is a number of objects
+		self.objectsRate = objects / elapsed if elapsed > 0 else 0.0
+		self.bytesRate = position / elapsed if elapsed > 0 and bytes else 0.0
+
+	@property
+	def fraction(self) -> Optional[float]:
+		if self.total <= 0:
+			return None
+		return min(self.position / self.total, 1.0)
+
+	@property
+	def eta(self) -> Optional[float]:
+		"""
+		This method returns the estimated time left, in seconds, from the average rate of progress so far.
+		"""
+		if self.total <= 0 or self.position <= 0:
+			return None
+		return self.elapsed * (self.total - self.position) / self.position
+
+	def summary(self) -> str:
+		"""
+		This method returns the completion and the estimated time left, or the number of objects processed when the total is unknown.
+		"""
+		fraction, eta = self.fraction, self.eta
+		if fraction is None or eta is None:
+			return _number(self.objects) + " objects"
+		return "%d%%, ETA %s" % (fraction * 100, _duration(eta))
+
+	def __str__(self) -> str:
+		parts = ["%s objects (%s/s)" % (_number(self.objects), _number(int(self.objectsRate)))]
+		if self.total > 0 and self.bytes:
+			parts.append("%.1f of %.1f MB (%d%%, %.1f MB/s)" % (self.position / (1 << 20), self.total / (1 << 20),
+				(self.fraction or 0) * 100, self.bytesRate / (1 << 20)))
+		elif self.total > 0:
+			parts.append("%d%%" % ((self.fraction or 0) * 100))
+		parts.append(_duration(self.elapsed) + " elapsed")
+		eta = self.eta
+		if eta is not None:
+			parts.append("ETA " + _duration(eta))
+		line = ", ".join(parts)
+		top = sorted(self.categories.items(), key=lambda item: -item[1])[:SUMMARY_CATEGORIES]
+		if top:
+			line += " - " + ", ".join(category_name(category) + " " + _number(n) for category, n in top)
+		return line
+
+
+class ProgressMeter:
+	"""
+	Timer of the progress reports, one every ``interval`` seconds at most.
+
+	>>> now = [0.0]
+	>>> meter = ProgressMeter(1000, interval=0.5, clock=lambda: now[0])
+	>>> meter.due()
+	False
+	>>> now[0] = 0.6
+	>>> meter.due()
+	True
+	>>> report = meter.report(120, 300, {})
+	>>> meter.due(), report.elapsed, report.fraction
+	(False, 0.6, 0.3)
+	"""
+
+	def __init__(self, total: int = 0, interval: float = 0.5, clock: Callable[[], float] = time.monotonic, bytes: bool = True) -> None:
+		self.total = total  # size of the file, or number of the objects if not bytes
+		self.interval = interval
+		self.bytes = bytes
+		self._clock = clock
+		self._start = clock()
+		self._next = self._start + interval
+
+	def due(self) -> bool:
+		return self._clock() >= self._next
+
+	def report(self, objects: int, position: int, categories: Mapping[str, int]) -> ProgressReport:
+		"""
+		This method returns the report of the progress, and restarts the interval to the next one.
+		"""
+		now = self._clock()
+		self._next = now + self.interval
+		return ProgressReport(objects, position, self.total, now - self._start, categories, self.bytes)
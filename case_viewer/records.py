@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+Record classes of the artifacts extracted from a CASE file.
+
+A record class is declared by its fields, each one bound to the CASE property
+it is read from and to a default value:
+
+	class Bluetooth(Artifact):
+		addressValue: str = field("uco-observable:addressValue")
+
+The fields become the ``__slots__`` of the class, so a record has no
+per-instance dictionary: it takes a fraction of the memory of a dict with the
+same keys, and its values are read as attributes.  The attribute of a field
+is the local name of its property, ``id`` for ``@id`` and ``from_`` for
+``uco-observable:from``.  The objects are identified by the integer keys of
+the interner module: the ``id`` field holds the key of the record, and the
+``...Id`` fields hold the keys of the objects whose label is shown in the
+field of the same name.  The fields holding keys are declared by
+``reference``, and listed in the REFERENCES of the class.  The records of the
+CASE objects derive from Artifact, which declares their ``id`` field.
+
+The fields declared by ``category`` instead of ``field`` take their values
+among a few repeated strings, such as application names or MIME tags: the
+record holds the code of its value in the Categories dictionary of the field,
+and the value is decoded when the attribute is read.  The dictionaries are
+shared by all the records of a class, and emptied by clear_categories.  The
+records are filtered on such a field by its code (see Record.where): the code
+of the value is looked up once, and the records are tested by comparing ints.
+"""
+
+from operator import attrgetter
+from typing import Any, Callable, ClassVar, Iterator, Mapping, Optional, Sequence, Union, overload
+
+from .interner import Categories
+
+
+class Field:
+	__slots__ = ("key", "default")
+
+	def __init__(self, key: str, default: Any) -> None:
+		self.key = key
+		self.default = default
+
+
+def field(key: str, default: Any = "") -> Any:
+	"""
+	This method declares a field of a Record class, read from the CASE property ``key``.
+	"""
+	return Field(key, default)
+
+
+class Reference(Field):
+	"""
+	Field holding the integer key of an object, or a sequence of keys.
+	"""
+	__slots__ = ()
+
+
+def reference(key: str, default: Any = 0) -> Any:
+	"""
+	This method declares a field of a Record class holding the keys of the objects the CASE property ``key`` refers to.
+	"""
+	return Reference(key, default)
+
+
+class Category(Field):
+	"""
+	Field storing the code of its value, in a slot named after the attribute with a leading underscore.
+	"""
+	__slots__ = ("slot", "categories")
+
+	def __init__(self, key: str, default: str) -> None:
+		super().__init__(key, default)
+		self.slot = ""
+		self.categories = Categories()
+
+	def __set_name__(self, owner: type, attribute: str) -> None:
+		self.slot = "_" + attribute
+
+	@overload
+	def __get__(self, record: None, owner: type) -> "Category": ...
+
+	@overload
+	def __get__(self, record: object, owner: type) -> str: ...
+
+	def __get__(self, record: Optional[object], owner: type) -> Union["Category", str]:
+		if record is None:
+			return self
+		return self.categories.value(getattr(record, self.slot))
+
+	def __set__(self, record: object, value: str) -> None:
+		setattr(record, self.slot, self.categories.code(value))
+
+
+def category(key: str, default: str = "") -> Any:
+	"""
+	This method declares a categorical field of a Record class, read from the CASE property ``key``.
+	"""
+	return Category(key, default)
+
+
+class RecordMeta(type):
+	"""
+	Metaclass turning the fields declared in the body of a Record class into its slots.
+	"""
+
+	def __new__(mcs, name: str, bases: tuple[type, ...], namespace: dict[str, Any]) -> "RecordMeta":
+		fields: dict[str, Field] = {}
+		for base in bases:
+			fields.update(getattr(base, "_fields", {}))
+		slots = []
+		for attribute, value in list(namespace.items()):
+			if isinstance(value, Category):
+				# The field stays as the descriptor coding the values of its slot.
+				fields[attribute] = value
+				slots.append("_" + attribute)
+			elif isinstance(value, Field):
+				# A slot cannot have a class attribute with the same name.
+				del namespace[attribute]
+				fields[attribute] = value
+				slots.append(attribute)
+		namespace["__slots__"] = tuple(slots)
+		namespace["_fields"] = fields
+		namespace["FIELDS"] = {attribute: f.key for attribute, f in fields.items()}
+		namespace["REFERENCES"] = tuple(attribute for attribute, f in fields.items() if isinstance(f, Reference))
+		return super().__new__(mcs, name, bases, namespace)
+
+
+class Record(metaclass=RecordMeta):
+	"""
+	Base class of the artifact records.  The values are given by keyword, the fields not given take their default.
+
+	>>> class Cookie(Record):
+	...     id: str = field("@id")
+	...     cookieName: str = field("uco-observable:cookieName")
+	...     cookieApp: str = field("uco-observable:cookieApp", "-")
+	>>> c = Cookie(id="kb:cookie", cookieName="session")
+	>>> c.cookieName, c.cookieApp
+	('session', '-')
+	>>> c.cookieApp = "Chrome"
+	>>> c
+	Cookie(id='kb:cookie', cookieName='session', cookieApp='Chrome')
+	>>> dict(c)
+	{'id': 'kb:cookie', 'cookieName': 'session', 'cookieApp': 'Chrome'}
+	>>> Cookie.FIELDS["cookieName"], hasattr(c, "__dict__"), Cookie.REFERENCES
+	('uco-observable:cookieName', False, ())
+	>>> Cookie(id="kb:cookie", name="session")
+	Traceback (most recent call last):
+	...
+	TypeError: Cookie has no field 'name'.
+
+	>>> class Event(Record):
+	...     eventType: str = category("uco-observable:eventType")
+	>>> events = [Event(eventType=t) for t in ("Boot", "Shutdown", "Boot")]
+	>>> [e.eventType for e in events], [e.code("eventType") for e in events]
+	(['Boot', 'Shutdown', 'Boot'], [0, 1, 0])
+	>>> Event.categories("eventType").values(), dict(events[1])
+	(['Boot', 'Shutdown'], {'eventType': 'Shutdown'})
+
+	The records are pickled by the values of their fields, so the categorical values are coded again by the process reading them.
+
+	>>> events[1].__getstate__()
+	('Shutdown',)
+	>>> restored = Event.__new__(Event)
+	>>> restored.__setstate__(("Reboot",))
+	>>> restored.eventType, restored.code("eventType")
+	('Reboot', 2)
+	"""
+	__slots__ = ()
+
+	# CASE property of each field, by attribute name, in declaration order
+	FIELDS: ClassVar[dict[str, str]] = {}
+	# Fields holding the keys of other objects (see reference)
+	REFERENCES: ClassVar[tuple[str, ...]] = ()
+	_fields: ClassVar[dict[str, Field]] = {}
+
+	def __init__(self, **values: Any) -> None:
+		for attribute, f in self._fields.items():
+			setattr(self, attribute, values.pop(attribute, f.default))
+		for attribute in values:
+			raise TypeError("%s has no field %r." % (type(self).__name__, attribute))
+
+	def keys(self) -> Iterator[str]:
+		return iter(self.FIELDS)
+
+	def __getstate__(self) -> tuple[Any, ...]:
+		return tuple(getattr(self, attribute) for attribute in self.FIELDS)
+
+	def __setstate__(self, state: tuple[Any, ...]) -> None:
+		for attribute, value in zip(self.FIELDS, state):
+			setattr(self, attribute, value)
+
+	@classmethod
+	def categories(cls, attribute: str) -> Categories:
+		"""
+		This method returns the dictionary of the values of a categorical field.
+		"""
+		return cls._category(attribute).categories
+
+	@classmethod
+	def _category(cls, attribute: str) -> Category:
+		f = cls._fields[attribute]
+		if not isinstance(f, Category):
+			raise TypeError("%s.%s is not a categorical field." % (cls.__name__, attribute))
+		return f
+
+	@classmethod
+	def where(cls, values: Mapping[str, Any]) -> Callable[["Record"], bool]:
+		"""
+		This method returns the test of the records of the class whose fields have the given values.  A categorical value is compared by its code, looked up once: a value without a code is held by no record.
+
+		>>> class Event(Record):
+		...     eventType: str = category("uco-observable:eventType")
+		...     eventText: str = field("uco-observable:eventText")
+		>>> events = [Event(eventType=t, eventText=x) for t, x in (("Boot", "a"), ("Shutdown", "b"), ("Boot", "b"))]
+		>>> [e.eventText for e in filter(Event.where({"eventType": "Boot"}), events)]
+		['a', 'b']
+		>>> len(list(filter(Event.where({"eventType": "Boot", "eventText": "b"}), events))), len(list(filter(Event.where({"eventType": "Reboot"}), events)))
+		(1, 0)
+		>>> Event.where({"eventName": "Boot"})
+		Traceback (most recent call last):
+		...
+		TypeError: Event has no field 'eventName'.
+		"""
+		slots, expected = [], []
+		for attribute, value in values.items():
+			f = cls._fields.get(attribute)
+			if f is None:
+				raise TypeError("%s has no field %r." % (cls.__name__, attribute))
+			if isinstance(f, Category):
+				code = f.categories.get(value)
+				if code is None:
+					return lambda record: False
+				slots.append(f.slot)
+				expected.append(code)
+			else:
+				slots.append(attribute)
+				expected.append(value)
+		if not slots:
+			return lambda record: True
+		# attrgetter returns a value for one slot, a tuple for several.
+		get = attrgetter(*slots)
+		target = expected[0] if len(slots) == 1 else tuple(expected)
+		return lambda record: bool(get(record) == target)
+
+	def code(self, attribute: str) -> int:
+		"""
+		This method returns the code of the value of a categorical field, to compare or group the records without decoding it.
+		"""
+		code: int = getattr(self, self._category(attribute).slot)
+		return code
+
+	def items(self) -> Iterator[tuple[str, Any]]:
+		return ((attribute, getattr(self, attribute)) for attribute in self.FIELDS)
+
+	def __getitem__(self, attribute: str) -> Any:
+		if attribute not in self.FIELDS:
+			raise KeyError(attribute)
+		return getattr(self, attribute)
+
+	def __eq__(self, other: object) -> bool:
+		if type(other) is not type(self):
+			return NotImplemented
+		return all(getattr(self, a) == getattr(other, a) for a in self.FIELDS)
+
+	__hash__ = None  # type: ignore[assignment]
+
+	def __repr__(self) -> str:
+		return "%s(%s)" % (type(self).__name__, ", ".join("%s=%r" % item for item in self.items()))
+
+
+def clear_categories() -> None:
+	"""
+	This method empties the dictionaries of the categorical fields of all the Record classes, once their records have been released: the codes held by the records are no longer valid.
+
+	>>> class Call(Record):
+	...     application: str = category("uco-observable:application")
+	>>> Call(application="Skype").code("application"), Call(application="WhatsApp").code("application")
+	(0, 1)
+	>>> clear_categories()
+	>>> Call.categories("application").values(), Call(application="WhatsApp").code("application")
+	([], 0)
+	"""
+	classes = [Record]
+	while classes:
+		cls = classes.pop()
+		classes.extend(cls.__subclasses__())
+		for f in cls._fields.values():
+			if isinstance(f, Category):
+				f.categories.clear()
+
+
+class Artifact(Record):
+	"""
+	Record of a CASE object, identified by its @id.
+	"""
+	id: int = reference("@id")
+
+
+#--- Artifacts
+
+class ChatMessage(Artifact):
+	messageText: str = field("uco-observable:messageText")
+	applicationId: int = reference("uco-observable:application")
+	application: str = category("uco-observable:application", "-")
+	sentTime: str = field("uco-observable:sentTime")
+	fromId: int = reference("uco-observable:from")
+	from_: str = field("uco-observable:from", "-")
+	toId: Sequence[int] = reference("uco-observable:to", ())
+	to: Union[str, list[str]] = field("uco-observable:to", "-")
+	attachedFiles: str = field("uco-observable:attachedFiles")
+	messageType: str = category("uco-observable:messageType", "CHAT Message")
+
+
+class SmsMessage(Artifact):
+	messageText: str = field("uco-observable:messageText")
+	application: str = category("uco-observable:application", "Native")
+	sentTime: str = field("uco-observable:sentTime")
+	fromId: int = reference("uco-observable:from")
+	from_: str = field("uco-observable:from", "-")
+	toId: Sequence[int] = reference("uco-observable:to", ())
+	to: Union[str, list[str]] = field("uco-observable:to")
+	messageType: str = category("uco-observable:messageType", "SMS/Native Message")
+
+
+class ChatThread(Artifact):
+	length: Union[int, str] = field("co:size", "-")
+	messages: Sequence[int] = reference("co:element", ())
+	participants: Sequence[int] = reference("uco-observable:participant", ())
+
+
+class Account(Artifact):
+	accountIdentifier: str = field("uco-observable:accountIdentifier")
+	phoneAccount: str = field("uco-observable:phoneNumber")
+	application: str = category("uco-observable:application")
+	displayName: str = field("uco-observable:displayName")
+
+
+class EmailAddress(Artifact):
+	addressValue: str = field("uco-observable:addressValue")
+
+
+class EmailAccount(Artifact):
+	addressId: int = reference("uco-observable:emailAddress")
+	addressValue: str = field("uco-observable:addressValue", "-")
+
+
+class EmailMessage(Artifact):
+	fromId: int = reference("uco-observable:from")
+	from_: str = field("uco-observable:from")
+	toId: Sequence[int] = reference("uco-observable:to", ())
+	to: str = field("uco-observable:to")
+	ccId: Sequence[int] = reference("uco-observable:cc", ())
+	cc: str = field("uco-observable:cc")
+	bccId: Sequence[int] = reference("uco-observable:bcc", ())
+	bcc: str = field("uco-observable:bcc")
+	sentTime: str = field("uco-observable:sentTime")
+	body: str = field("uco-observable:body")
+	subject: str = field("uco-observable:subject")
+
+
+class Bluetooth(Artifact):
+	addressValue: str = field("uco-observable:addressValue")
+
+
+class CellSite(Artifact):
+	cellSiteCountryCode: str = field("uco-observable:cellSiteCountryCode")
+	cellSiteIdentifier: str = field("uco-observable:cellSiteIdentifier")
+	cellSiteNetworkCode: str = field("uco-observable:cellSiteNetworkCode")
+	cellSiteLocationAreaCode: str = field("uco-observable:cellSiteLocationAreaCode")
+	cellSiteType: str = category("uco-observable:cellSiteType")
+
+
+class Event(Artifact):
+	observableCreatedTime: str = field("uco-observable:observableCreatedTime")
+	eventType: str = category("uco-observable:eventType")
+	eventText: str = field("uco-observable:eventText")
+
+
+class SearchedItem(Artifact):
+	searchSource: str = field("drafting:searchSource")
+	searchLaunchedTime: str = field("drafting:searchLaunchedTime")
+	searchValue: str = field("drafting:searchValue")
+
+
+class SocialMediaActivity(Artifact):
+	body: str = field("uco-observable:body")
+	pageTitle: str = field("uco-observable:pageTitle")
+	observableCreatedTime: str = field("uco-observable:observableCreatedTime")
+	application: str = category("uco-observable:application")
+	authorIdentifier: str = field("drafting:authorIdentifier")
+	accountIdentifier: str = field("uco-observable:accountIdentifier")
+	authorName: str = field("drafting:authorName")
+	activityType: str = category("@type")
+
+
+class WirelessNet(Artifact):
+	ssid: str = field("uco-observable:ssid")
+	baseStation: str = field("uco-observable:baseStation")
+
+
+class Cookie(Artifact):
+	cookieAppId: int = reference("uco-observable:application")
+	cookieApp: str = category("uco-observable:application", "-")
+	cookieName: str = field("uco-observable:cookieName")
+	cookiePath: str = field("uco-observable:cookiePath")
+	observableCreatedTime: str = field("uco-observable:observableCreatedTime")
+	accessedTime: str = field("uco-observable:accessedTime")
+	expirationTime: str = field("uco-observable:expirationTime")
+
+
+class Coordinate(Artifact):
+	latitude: str = field("uco-location:latitude")
+	longitude: str = field("uco-location:longitude")
+	altitude: str = field("uco-location:altitude")
+
+
+class Application(Artifact):
+	name: str = field("uco-core:name")
+
+
+class Call(Artifact):
+	from_: str = field("uco-observable:from", "-")
+	to: str = field("uco-observable:to", "-")
+	name: str = category("uco-observable:application", "-")
+	startTime: str = field("uco-observable:startTime")
+	duration: Union[int, str] = field("uco-observable:duration", "-")
+
+
+class Calendar(Artifact):
+	subject: str = field("uco-observable:subject")
+	startTime: str = field("uco-observable:startTime")
+	endTime: str = field("uco-observable:endTime")
+	recurrence: str = field("uco-observable:recurrence")
+	eventStatus: str = field("uco-observable:eventStatus")
+
+
+class File(Artifact):
+	tag: str = category("uco-observable:mimeType")
+	fileName: str = field("uco-observable:fileName")
+	filePath: str = field("uco-observable:filePath")
+	fileSize: Union[int, str] = field("uco-observable:sizeInBytes", "-")
+
+
+class URL(Artifact):
+	url: str = field("uco-observable:fullValue")
+
+
+class WebBookmark(Artifact):
+	application: str = category("uco-observable:application")
+	urlTargeted: str = field("uco-observable:urlTargeted")
+	bookmarkPath: str = field("uco-observable:bookmarkPath")
+	observableCreatedTime: str = field("uco-observable:observableCreatedTime")
+
+
+class WebHistory(Artifact):
+	browserInformation: str = category("uco-observable:browserInformation")
+	url: str = field("uco-observable:url", "-")
+	title: str = field("uco-observable:pageTitle")
+	lastVisited: str = field("uco-observable:lastVisit")
+
+
+class WebSearchTerm(Artifact):
+	searchTerm: str = field("uco-observable:keywordSearchTerm")
+
+
+#--- Relationships
+
+class Attachment(Record):
+	attachmentSource: int = reference("uco-core:source")
+	attachmentTarget: int = reference("uco-core:target")
+
+
+class ConnectedTo(Record):
+	source: int = reference("uco-core:source")
+	target: int = reference("uco-core:target")
+	startTime: str = field("uco-observable:startTime")
+	endTime: str = field("uco-observable:endTime")
+
+
+class MappedBy(Record):
+	mappedByLatitude: str = field("uco-location:latitude")
+	mappedByLongitude: str = field("uco-location:longitude")
+	mappedByStartDate: str = field("uco-observable:startTime")
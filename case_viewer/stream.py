@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+Incremental reader for CASE JSON-LD files.
+
+The whole document is never materialised: only the objects of the top-level
+``uco-core:object`` or ``@graph`` array are decoded, one at a time, so the
+peak memory depends on the size of the largest object and not on the size of
+the file.
+"""
+
+import json
+from typing import Any, Iterator, TextIO
+
+from .lib import JSONLD
+
+# Keys of the top-level array holding the CASE objects, in order of preference.
+CASE_OBJECT_KEYS = ("uco-core:object", "@graph")
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+_WHITESPACE = " \t\n\r"
+
+_decoder = json.JSONDecoder()
+
+
+class _Buffer:
+	"""
+	Sliding window over a text stream, refilled on demand.
+	"""
+
+	def __init__(self, fp: TextIO, chunk_size: int) -> None:
+		self.fp = fp
+		self.chunk_size = chunk_size
+		self.text = ""
+		self.pos = 0
+		self.eof = False
+
+	def fill(self) -> None:
+		if self.eof:
+			return
+		pending = len(self.text) - self.pos
+		# Read at least as much as is still pending, so that a value larger
+		# than the chunk size is re-scanned a logarithmic number of times.
+		data = self.fp.read(max(self.chunk_size, pending))
+		if not data:
+			self.eof = True
+		self.text = self.text[self.pos:] + data
+		self.pos = 0
+
+	def peek(self) -> str:
+		while True:
+			while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+				self.pos += 1
+			if self.pos < len(self.text):
+				return self.text[self.pos]
+			if self.eof:
+				return ""
+			self.fill()
+
+	def expect(self, chars: str) -> str:
+		char = self.peek()
+		if char == "" or char not in chars:
+			raise ValueError("Expected one of %r, found %r." % (tuple(chars), char or "end of file"))
+		self.pos += 1
+		return char
+
+	def decode(self) -> Any:
+		self.peek()
+		while True:
+			try:
+				value, end = _decoder.raw_decode(self.text, self.pos)
+			except json.JSONDecodeError:
+				if self.eof:
+					raise
+				self.fill()
+				continue
+			# A number at the very end of the window might be truncated.
+			if end == len(self.text) and not self.eof:
+				self.fill()
+				continue
+			self.pos = end
+			return value
+
+
+def get_case_objects(document: dict[str, JSONLD]) -> list[JSONLD]:
+	"""
+	This method returns the ``uco-core:object`` (or ``@graph``) array of a JSON-LD document loaded as a whole.
+
+	>>> get_case_objects({"@graph": [{"@id": "kb:a"}]})
+	[{'@id': 'kb:a'}]
+	>>> get_case_objects({"@context": {}})
+	Traceback (most recent call last):
+	...
+	ValueError: Neither key uco-core:object nor @graph have been found.
+	"""
+	for key in CASE_OBJECT_KEYS:
+		if key in document:
+			objects = document[key]
+			if not isinstance(objects, list):
+				raise TypeError("Unexpected type for property %r: %r." % (key, type(objects)))
+			return objects
+	raise ValueError("Neither key uco-core:object nor @graph have been found.")
+
+
+def iter_case_objects(fp: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[dict[str, JSONLD]]:
+	"""
+	This method yields the objects of the ``uco-core:object`` (or ``@graph``) array of the JSON-LD document read from ``fp``, one at a time.  The rest of the document is parsed and discarded, so syntax errors anywhere in the file are still reported.
+
+	>>> import io
+	>>> doc = io.StringIO('{"@context": {"kb": "http://example.org/kb/"}, "@graph": [{"@id": "kb:a"}, {"@id": "kb:b", "ex:n": 10}]}')
+	>>> [o["@id"] for o in iter_case_objects(doc, chunk_size=4)]
+	['kb:a', 'kb:b']
+	>>> doc = io.StringIO('{"uco-core:object": [{"ex:n": 12345}], "ex:after": [1, 2]}')
+	>>> list(iter_case_objects(doc, chunk_size=3))
+	[{'ex:n': 12345}]
+	>>> list(iter_case_objects(io.StringIO('{"@graph": []}')))
+	[]
+	>>> list(iter_case_objects(io.StringIO('{"@context": {}}')))
+	Traceback (most recent call last):
+	...
+	ValueError: Neither key uco-core:object nor @graph have been found.
+	>>> list(iter_case_objects(io.StringIO('{"@graph": [{"@id": "kb:a"} {"@id": "kb:b"}]}')))
+	Traceback (most recent call last):
+	...
+	ValueError: Expected one of (',', ']'), found '{'.
+	"""
+	buffer = _Buffer(fp, chunk_size)
+	found = False
+	buffer.expect("{")
+	if buffer.peek() == "}":
+		buffer.pos += 1
+	else:
+		while True:
+			key = buffer.decode()
+			buffer.expect(":")
+			if key in CASE_OBJECT_KEYS and not found:
+				found = True
+				buffer.expect("[")
+				if buffer.peek() == "]":
+					buffer.pos += 1
+				else:
+					while True:
+						obj = buffer.decode()
+						if not isinstance(obj, dict):
+							raise TypeError("Unexpected type for an element of %r: %r." % (key, type(obj)))
+						yield obj
+						if buffer.expect(",]") == "]":
+							break
+			else:
+				buffer.decode()
+			if buffer.expect(",}") == "}":
+				break
+	if buffer.peek() != "":
+		raise ValueError("Extra data after the JSON document.")
+	if not found:
+		raise ValueError("Neither key uco-core:object nor @graph have been found.")